@@ -1,30 +1,138 @@
 # /my_career_portal/app.py
-from flask import Flask, render_template, request, jsonify, send_from_directory, url_for
+from flask import Flask, render_template, request, jsonify, send_from_directory, send_file, url_for, Response, stream_with_context
 import os
-import uuid 
-from dotenv import load_dotenv
+import io
+import json
+import time
+from env_logic import load_env
 
 # Load .env file once at the very beginning for all subsequent imports and app config
-load_dotenv() 
+load_env()
 
 # Import refactored logic
-from resume_builder_logic import generate_resume_pdf_from_data, generate_ai_summary_for_resume
-from higher_education_fetcher_logic import search_colleges_globally_api
-from career_ai_chatbot_logic import get_chatbot_answer_from_question, initialize_chatbot_components_globally
+from resume_builder_logic import generate_ai_summary_cached, generate_ai_summaries_batch, get_ai_summary_stats, SummaryBatchTooLarge, normalize_resume_payload, sweep_generated_resumes, \
+    render_resume_pdf_bytes_cached, render_resume_pdf_file, content_addressed_resume_path, \
+    find_rendered_resume_file, remember_rendered_resume_file
+from resume_job_queue_logic import resume_job_queue, ResumeJobQueueFull
+from resume_batch_logic import iter_batch_zip_stream, render_batch_to_directory, RESUME_BATCH_MAX_ITEMS
+from higher_education_fetcher_logic import search_colleges_cached, iter_college_search_events
+from career_ai_chatbot_logic import get_chatbot_answer_from_question, initialize_chatbot_components_globally, \
+    preload_embedding_model, get_chatbot_readiness, stream_chatbot_answer_events
+from chat_session_logic import session_id_from_request, get_session_answer, stream_session_answer_events, \
+    get_session_info, clear_session, is_valid_session_id
+from cache_logic import get_all_cache_stats, get_all_single_flight_stats
+from http_client_logic import get_http_client_stats
+from metrics_logic import counter, histogram, render_prometheus, start_request_timings, current_request_timings, SERVER_TIMING_ENABLED
+from rate_limit_logic import check_client_limit, client_id, rate_limited_body, retry_after_header
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'generated_resumes')
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# --- Resume delivery ---
+# "inline": render in memory and return the PDF in the build response (one request, no disk).
+# "file": write to UPLOAD_FOLDER and return a download URL; a throttled sweeper bounds the folder.
+RESUME_DELIVERY_MODE = os.getenv("RESUME_DELIVERY_MODE", "inline")
+RESUME_FILE_MAX_AGE_SECONDS = float(os.getenv("RESUME_FILE_MAX_AGE_SECONDS", str(24 * 3600)))
+RESUME_DIR_MAX_BYTES = int(os.getenv("RESUME_DIR_MAX_BYTES", str(500 * 1024 * 1024)))
+RESUME_SWEEP_INTERVAL_SECONDS = float(os.getenv("RESUME_SWEEP_INTERVAL_SECONDS", "300"))
+_last_resume_sweep = 0.0
+
+def _maybe_sweep_generated_resumes():
+    global _last_resume_sweep
+    now = time.monotonic()
+    if now - _last_resume_sweep < RESUME_SWEEP_INTERVAL_SECONDS:
+        return
+    _last_resume_sweep = now
+    try:
+        sweep_generated_resumes(app.config['UPLOAD_FOLDER'], RESUME_FILE_MAX_AGE_SECONDS, RESUME_DIR_MAX_BYTES)
+    except Exception as e:
+        app.logger.warning(f"Resume sweeper failed: {e}")
+
+# Browser/proxy freshness for education search responses (server-side cache TTL is separate)
+EDU_SEARCH_BROWSER_MAX_AGE = int(os.getenv("EDU_SEARCH_BROWSER_MAX_AGE", "300"))
+
 # --- Chatbot Initialization ---
 # This flag tracks if the chatbot has been initialized for the current app instance/worker.
 _chatbot_app_initialized_flag = False
 
+# CHATBOT_PRELOAD=1 loads the embedding model when this module is imported. Under gunicorn with
+# preload_app (see gunicorn.conf.py) that happens once in the master and workers share the weights;
+# the rest of the chatbot is then initialized per worker in post_fork via warm_up_chatbot_for_worker().
+CHATBOT_PRELOAD = os.getenv("CHATBOT_PRELOAD", "0") == "1"
+
+def warm_up_chatbot_for_worker():
+    global _chatbot_app_initialized_flag
+    if _chatbot_app_initialized_flag:
+        return True
+    app.logger.info("Flask App: Warming up chatbot components for this worker...")
+    if initialize_chatbot_components_globally():
+        _chatbot_app_initialized_flag = True
+        app.logger.info("Flask App: Chatbot components warmed up for this worker.")
+    else:
+        app.logger.error("Flask App: Chatbot warm-up FAILED; will retry on first chat request.")
+    return _chatbot_app_initialized_flag
+
+if CHATBOT_PRELOAD:
+    try:
+        preload_embedding_model()
+    except Exception as e:
+        app.logger.error(f"Flask App: Embedding model preload failed; falling back to lazy loading: {e}", exc_info=True)
+
+# --- Request Metrics ---
+# Registered before the chatbot hook so first-request initialization shows up in the request's timings.
+HTTP_REQUEST_DURATION = histogram("http_request_duration_seconds", "Flask request latency (streamed bodies: until the first byte).", ("endpoint", "method", "status"))
+HTTP_REQUESTS = counter("http_requests", "Flask requests served.", ("endpoint", "method", "status"))
+
+@app.before_request
+def start_request_metrics():
+    start_request_timings()
+
+@app.after_request
+def record_request_metrics(response):
+    timings = current_request_timings()
+    if timings is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched" # Route templates, not raw paths: bounded label values
+    elapsed = time.perf_counter() - timings.started
+    HTTP_REQUEST_DURATION.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    if SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = timings.server_timing_header()
+    return response
+
+# --- Per-client rate limits (rate_limit_logic) ---
+# Endpoint -> limit group. Runs before chatbot initialization, so rejected requests cost nothing.
+RATE_LIMITED_ENDPOINTS = {
+    'api_search_education': 'search',
+    'api_chat': 'chat', 'api_chat_stream': 'chat',
+    'api_generate_summary': 'ai_summary', 'api_generate_summaries_batch': 'ai_summary',
+    'api_build_resume': 'resume', 'api_build_resumes_batch': 'resume',
+}
+
+@app.before_request
+def enforce_rate_limits():
+    group = RATE_LIMITED_ENDPOINTS.get(request.endpoint)
+    if group is None:
+        return None
+    cost = 1
+    if request.endpoint == 'api_generate_summaries_batch': # One model call per item
+        data = request.get_json(silent=True)
+        items = data.get('items') if isinstance(data, dict) else data
+        cost = len(items) if isinstance(items, list) and items else 1
+    retry_after = check_client_limit(group, client_id(request.remote_addr, request.headers.get('X-Forwarded-For')), cost)
+    if retry_after:
+        app.logger.warning(f"Rate limit: {request.remote_addr} over the '{group}' limit on {request.path}; retry in {retry_after:.1f}s")
+        response = jsonify(rate_limited_body(retry_after))
+        response.headers['Retry-After'] = retry_after_header(retry_after)
+        return response, 429
+    return None
+
 @app.before_request
 def ensure_chatbot_is_initialized_for_app():
     global _chatbot_app_initialized_flag
     # Only run initialization for relevant endpoints to avoid unnecessary overhead
-    if request.endpoint in ['api_chat', 'career_chatbot']:
+    if request.endpoint in ['api_chat', 'api_chat_stream', 'career_chatbot']:
         if not _chatbot_app_initialized_flag:
             app.logger.info("Flask App: Initializing chatbot components before first relevant request...")
             if initialize_chatbot_components_globally():
@@ -63,18 +171,40 @@ def api_generate_summary():
         if not keywords and not experience_highlights:
             return jsonify({"error": "Keywords or experience highlights are required for AI summary."}), 400
 
-        summary = generate_ai_summary_for_resume(keywords, experience_highlights)
+        summary, cache_hit = generate_ai_summary_cached(keywords, experience_highlights)
         
         # Returning 200 OK even for AI-side "errors" allows the frontend to display the message.
         # For a pure API, a 4xx/5xx might be more semantically correct if the AI fails to generate usable content.
         if "Error" in summary or "Could not generate" in summary or "disabled" in summary or "blocked" in summary.lower():
              app.logger.warning(f"AI Summary generation issue: {summary}")
              return jsonify({"summary": summary, "ai_message": summary}), 200 
-        return jsonify({"summary": summary})
+        response = jsonify({"summary": summary})
+        response.headers['X-Summary-Cache'] = 'hit' if cache_hit else 'miss'
+        return response
     except Exception as e:
         app.logger.error(f"Error in /api/generate_summary: {e}", exc_info=True)
         return jsonify({"error": f"An internal server error occurred generating summary: {str(e)}"}), 500
 
+@app.route('/api/generate_summaries_batch', methods=['POST'])
+def api_generate_summaries_batch():
+    """Body: {"items": [{"keywords": [...], "experience_highlights": "..."}, ...]}; results come back in order."""
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('items') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return jsonify({"error": "Provide a non-empty list of {keywords, experience_highlights} items."}), 400
+        if len(items) > RESUME_BATCH_MAX_ITEMS:
+            return jsonify({"error": f"Batch too large: {len(items)} items (maximum {RESUME_BATCH_MAX_ITEMS})."}), 413
+        app.logger.info(f"AI Summary batch request: {len(items)} items")
+        return jsonify({"results": generate_ai_summaries_batch(items)})
+    except SummaryBatchTooLarge as e:
+        app.logger.warning(f"AI Summary batch rejected: {e}")
+        return jsonify({"error": f"Batch too large: {e.uncached} new summaries, at most {e.capacity} can be generated "
+                                 f"per request right now. Split the batch and retry.", "max_new_summaries": e.capacity}), 413
+    except Exception as e:
+        app.logger.error(f"Error in /api/generate_summaries_batch: {e}", exc_info=True)
+        return jsonify({"error": f"An internal server error occurred generating summaries: {str(e)}"}), 500
+
 @app.route('/api/build_resume', methods=['POST'])
 def api_build_resume():
     try:
@@ -85,45 +215,60 @@ def api_build_resume():
         
         app.logger.info(f"Resume build request for: {data.get('name', 'N/A')}")
 
-        # --- Data Transformations ---
-        # This section adapts frontend data to the backend PDF generator's expected format.
-        # Ideal future improvement: Align frontend data structure with backend, or use Pydantic models
-        # for explicit validation and transformation.
+        # Async mode (?async=1 or {"async": true}): enqueue and let the client poll the status URL
+        async_mode = request.args.get('async') == '1' or bool(data.pop('async', False))
 
-        # 1. Project stack: frontend sends 'stack_str', PDF func needs 'stack' (list)
-        if 'projects' in data and isinstance(data['projects'], list):
-            for proj in data['projects']:
-                if 'stack_str' in proj and isinstance(proj['stack_str'], str):
-                    proj['stack'] = [s.strip() for s in proj['stack_str'].split(',') if s.strip()]
-        
-        # 2. Skills: frontend sends 'skills_input' (comma-separated string), PDF func needs 'skills' (list)
-        if 'skills_input' in data and isinstance(data['skills_input'], str):
-            data['skills'] = [s.strip() for s in data['skills_input'].split(',') if s.strip()]
-        elif 'skills' not in data: # Ensure skills key exists even if empty
-            data['skills'] = []
-
-        # 3. Experience/Project descriptions: Frontend JS should already send these as lists of strings.
-        #    The resume_builder_logic.py's PDF function expects `description` as a list of bullet points.
-        #    No transformation here if frontend handles it.
-
-        # 4. Achievements: PDF function expects `description_str` (newline-separated string).
-        #    Frontend JS might send description_list or description_str.
-        if 'achievements' in data and isinstance(data['achievements'], list):
-            for ach in data['achievements']:
-                if 'description_list' in ach and isinstance(ach['description_list'], list): # If JS sent a list
-                    ach['description_str'] = "\n".join(ach['description_list'])
-                # If 'description_str' is already a string from frontend, it's fine.
-
-        unique_id = uuid.uuid4().hex[:8]
-        pdf_filename_base = f"resume_{data.get('name', 'user').replace(' ', '_').replace('.', '')}_{unique_id}.pdf"
-        output_pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], pdf_filename_base)
-
-        generated_file_path = generate_resume_pdf_from_data(data, output_pdf_path)
+        # Delivery (?delivery=inline|file); async jobs always write files for later download
+        delivery_mode = request.args.get('delivery', RESUME_DELIVERY_MODE)
+
+        # Adapt frontend data to the backend PDF generator's expected format
+        normalize_resume_payload(data)
+
+        if delivery_mode == 'inline' and not async_mode:
+            pdf_bytes, cache_hit = render_resume_pdf_bytes_cached(data)
+            if not pdf_bytes:
+                app.logger.error("Failed to render resume PDF in memory.")
+                return jsonify({"error": "Failed to generate resume PDF. Check server logs for details."}), 500
+            app.logger.info(f"Resume PDF {'served from render cache' if cache_hit else 'rendered in memory'} ({len(pdf_bytes)} bytes).")
+            safe_name = data.get('name', 'user').replace(' ', '_').replace('.', '')
+            response = send_file(io.BytesIO(pdf_bytes), mimetype='application/pdf', as_attachment=True,
+                                 download_name=f"resume_{safe_name}.pdf")
+            response.headers['X-Resume-Cache'] = 'hit' if cache_hit else 'miss'
+            return response
+
+        _maybe_sweep_generated_resumes()
+        # Same normalized payload -> same file name, so identical requests reuse the rendered PDF
+        output_pdf_path = content_addressed_resume_path(data, app.config['UPLOAD_FOLDER'])
+        existing_path = find_rendered_resume_file(output_pdf_path)
+        if existing_path:
+            app.logger.info(f"Resume PDF reused from render cache: {os.path.basename(existing_path)}")
+            download_url = url_for('download_resume', filename=os.path.basename(existing_path), _external=True)
+            if async_mode: # Same 202 and job shape as a new job; polling the status URL answers "done" right away
+                job_id = resume_job_queue.record_finished(existing_path)
+                status_url = url_for('api_build_resume_status', job_id=job_id, _external=True)
+                return jsonify({"job_id": job_id, "status": "done", "status_url": status_url,
+                                "download_url": download_url, "cached": True}), 202
+            return jsonify({"download_url": download_url, "message": "Resume PDF generated successfully.", "cached": True})
+
+        if async_mode:
+            try:
+                job_id = resume_job_queue.submit(data, output_pdf_path)
+            except ResumeJobQueueFull as e:
+                app.logger.warning(f"Resume build rejected: {e}")
+                response = jsonify({"error": "Resume builder is busy. Please retry shortly."})
+                response.headers['Retry-After'] = '5'
+                return response, 429
+            app.logger.info(f"Resume build job {job_id} queued for: {data.get('name', 'N/A')}")
+            status_url = url_for('api_build_resume_status', job_id=job_id, _external=True)
+            return jsonify({"job_id": job_id, "status": "queued", "status_url": status_url, "cached": False}), 202
+
+        generated_file_path = render_resume_pdf_file(data, output_pdf_path)
 
         if generated_file_path and os.path.exists(generated_file_path):
+            remember_rendered_resume_file(generated_file_path)
             download_url = url_for('download_resume', filename=os.path.basename(generated_file_path), _external=True)
             app.logger.info(f"Resume PDF generated: {os.path.basename(generated_file_path)}")
-            return jsonify({"download_url": download_url, "message": "Resume PDF generated successfully."})
+            return jsonify({"download_url": download_url, "message": "Resume PDF generated successfully.", "cached": False})
         else:
             app.logger.error(f"Failed to generate or locate resume PDF. Expected at: {output_pdf_path}")
             return jsonify({"error": "Failed to generate resume PDF. Check server logs for details."}), 500
@@ -132,6 +277,66 @@ def api_build_resume():
         app.logger.error(f"Error in /api/build_resume: {e}", exc_info=True)
         return jsonify({"error": f"An internal server error occurred building resume: {str(e)}"}), 500
 
+@app.route('/api/build_resume/<job_id>', methods=['GET'])
+def api_build_resume_status(job_id):
+    job = resume_job_queue.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired resume job."}), 404
+    payload = {"job_id": job_id, "status": job["status"]}
+    if job["status"] == "done":
+        payload["download_url"] = url_for('download_resume', filename=os.path.basename(job["output_path"]), _external=True)
+        payload["message"] = "Resume PDF generated successfully."
+    elif job["status"] == "failed":
+        payload["error"] = job["error"]
+    return jsonify(payload)
+
+@app.route('/api/build_resumes_batch', methods=['POST'])
+def api_build_resumes_batch():
+    """
+    Renders many resumes in parallel. Body: a JSON array of payloads, {"resumes": [...]}, or
+    JSON Lines (raw body or an uploaded 'file'). ?output=zip (default) streams one ZIP with a
+    manifest.json; ?output=files writes individual PDFs and returns their download URLs.
+    """
+    try:
+        upload = request.files.get('file')
+        if upload is not None or request.mimetype in ('application/x-ndjson', 'application/jsonl', 'text/plain'):
+            raw = (upload.read() if upload is not None else request.get_data()).decode('utf-8')
+            payloads = []
+            for line in raw.splitlines():
+                if line.strip():
+                    try:
+                        payloads.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        payloads.append(None) # Reported as a failed item rather than failing the batch
+        else:
+            body = request.get_json(silent=True)
+            payloads = body.get('resumes') if isinstance(body, dict) else body
+        if not isinstance(payloads, list) or not payloads:
+            return jsonify({"error": "Provide a non-empty list of resume payloads (JSON array, {\"resumes\": [...]}, or JSON Lines)."}), 400
+        if len(payloads) > RESUME_BATCH_MAX_ITEMS:
+            return jsonify({"error": f"Batch too large: {len(payloads)} resumes (maximum {RESUME_BATCH_MAX_ITEMS})."}), 413
+
+        output_mode = request.args.get('output', 'zip')
+        app.logger.info(f"Resume batch request: {len(payloads)} resumes, output={output_mode}")
+        if output_mode == 'files':
+            _maybe_sweep_generated_resumes()
+            items = render_batch_to_directory(payloads, app.config['UPLOAD_FOLDER'])
+            for item in items:
+                path = item.pop('path', None)
+                if item['ok'] and path:
+                    item['download_url'] = url_for('download_resume', filename=os.path.basename(path), _external=True)
+            succeeded = sum(1 for item in items if item['ok'])
+            return jsonify({"total": len(items), "succeeded": succeeded, "failed": len(items) - succeeded, "items": items})
+        if output_mode != 'zip':
+            return jsonify({"error": "output must be 'zip' or 'files'."}), 400
+
+        response = Response(stream_with_context(iter_batch_zip_stream(payloads)), mimetype='application/zip')
+        response.headers['Content-Disposition'] = f'attachment; filename="resumes_batch_{int(time.time())}.zip"'
+        return response
+    except Exception as e:
+        app.logger.error(f"Error in /api/build_resumes_batch: {e}", exc_info=True)
+        return jsonify({"error": f"An internal server error occurred building resumes: {str(e)}"}), 500
+
 @app.route('/downloads/resumes/<filename>')
 def download_resume(filename):
     app.logger.info(f"Download request for resume: {filename}")
@@ -150,13 +355,67 @@ def api_search_education():
              app.logger.warning("Education search is too broad. No country, course, or specific degree specified. Returning empty.")
              return jsonify([]), 200 # Return empty list with 200 OK
 
-        results = search_colleges_globally_api(country, course_type, degree_level)
+        # ?stream=ndjson|sse sends bare Places results first, then each institution's enrichment as it lands.
+        stream_format = request.args.get('stream', '').lower()
+        if stream_format in ('ndjson', 'sse'):
+            page_token = request.args.get('pageToken') or None
+            events = iter_college_search_events(country, course_type, degree_level, page_token)
+            return _event_stream_response(events, stream_format, "An internal server error occurred searching education")
+
+        results = search_colleges_cached(country, course_type, degree_level)
         app.logger.info(f"Edu Fetcher API returned {len(results)} institutions.")
-        return jsonify(results)
+        response = jsonify(results)
+        # Identical queries return identical bodies while cached, so let browsers/proxies revalidate via ETag
+        response.add_etag()
+        response.cache_control.public = True
+        response.cache_control.max_age = EDU_SEARCH_BROWSER_MAX_AGE
+        return response.make_conditional(request)
     except Exception as e:
         app.logger.error(f"Error in /api/search_education: {e}", exc_info=True)
         return jsonify({"error": f"An internal server error occurred searching education: {str(e)}"}), 500
 
+def _event_stream_response(events, stream_format, error_prefix):
+    """Serializes dict events (each with a 'type') as NDJSON lines or Server-Sent Events."""
+    def encode(event):
+        payload = json.dumps(event)
+        return f"event: {event['type']}\ndata: {payload}\n\n" if stream_format == 'sse' else payload + "\n"
+
+    def generate():
+        try:
+            for event in events:
+                yield encode(event)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            app.logger.error(f"Error while streaming {request.path}: {e}", exc_info=True)
+            yield encode({"type": "error", "error": f"{error_prefix}: {str(e)}"})
+
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no' # Stop nginx from buffering the stream
+    return response
+
+@app.route('/api/chatbot/ready', methods=['GET'])
+def api_chatbot_ready():
+    # Readiness probe: 200 once this worker's chatbot is warm, 503 until then
+    readiness = get_chatbot_readiness()
+    return jsonify(readiness), (200 if readiness["ready"] else 503)
+
+@app.route('/api/cache_stats', methods=['GET'])
+def api_cache_stats():
+    # Per-worker hit/miss/eviction counters for every cache layer
+    return jsonify({"pid": os.getpid(), "caches": get_all_cache_stats(), "single_flight": get_all_single_flight_stats()})
+
+@app.route('/api/upstream_stats', methods=['GET'])
+def api_upstream_stats():
+    # Per-worker, per-host request/latency/error counters and circuit breaker state
+    return jsonify({"pid": os.getpid(), "hosts": get_http_client_stats(), "ai_summary": get_ai_summary_stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus scrape endpoint: stage/upstream/request histograms plus cache and circuit collectors (this worker only)
+    return Response(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
     global _chatbot_app_initialized_flag
@@ -177,16 +436,55 @@ def api_chat():
             app.logger.warning("No message received for chatbot API.")
             return jsonify({"error": "No message provided"}), 400
 
+        try:
+            session_id = session_id_from_request(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         app.logger.info(f"Chat API received user message: '{user_message}'")
-        bot_response_text = get_chatbot_answer_from_question(user_message)
+        if session_id:
+            bot_response_text = get_session_answer(session_id, user_message)
+        else:
+            bot_response_text = get_chatbot_answer_from_question(user_message)
         app.logger.info(f"Chat API sending response (first 100 chars): '{bot_response_text[:100]}...'")
+        if session_id:
+            return jsonify({"response": bot_response_text, "session_id": session_id})
         return jsonify({"response": bot_response_text})
     except Exception as e:
         app.logger.error(f"Error in /api/chat: {e}", exc_info=True)
         return jsonify({"error": f"An internal server error occurred in chat: {str(e)}"}), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def api_chat_stream():
+    # Token streaming: SSE by default, ?format=ndjson for newline-delimited JSON
+    data = request.get_json(silent=True) or {}
+    user_message = data.get('message')
+    if not user_message:
+        app.logger.warning("No message received for chatbot streaming API.")
+        return jsonify({"error": "No message provided"}), 400
+    try:
+        session_id = session_id_from_request(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    stream_format = 'ndjson' if request.args.get('format', '').lower() == 'ndjson' else 'sse'
+    app.logger.info(f"Chat stream API received user message: '{user_message}'")
+    events = stream_session_answer_events(session_id, user_message) if session_id else stream_chatbot_answer_events(user_message)
+    return _event_stream_response(events, stream_format, "An internal server error occurred in chat")
+
+@app.route('/api/chat/session/<session_id>', methods=['GET', 'DELETE'])
+def api_chat_session(session_id):
+    # GET: history size of a session; DELETE: forget it (the next message starts fresh)
+    if not is_valid_session_id(session_id):
+        return jsonify({"error": "Invalid session_id."}), 400
+    if request.method == 'DELETE':
+        clear_session(session_id)
+        return jsonify({"session_id": session_id, "cleared": True})
+    return jsonify(get_session_info(session_id))
+
 if __name__ == '__main__':
     # For development, debug=True is fine.
     # For production, set debug=False.
     # The @app.before_request handles chatbot initialization per worker if using Gunicorn/uWSGI.
+    if CHATBOT_PRELOAD:
+        warm_up_chatbot_for_worker()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,183 @@
+# /my_career_portal/asgi_app.py
+"""
+Async serving mode. The I/O-bound endpoints (/api/search_education, /api/chat and
+/api/generate_summary) run as native async handlers, so a slow Google/Wikipedia/Unsplash/Gemini
+call holds a coroutine instead of a worker thread. Every other route (pages, resume builds,
+streams, stats) is served by the regular Flask app through a WSGI adapter.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8000 --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker -w 2 asgi_app:app
+
+Needs the optional packages starlette, httpx and an ASGI server (uvicorn); a2wsgi is used for
+the Flask bridge when installed.
+"""
+import asyncio
+import contextlib
+import os
+import time
+from urllib.parse import parse_qs
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from werkzeug.http import generate_etag, parse_etags
+
+import app as flask_module
+from higher_education_fetcher_logic import async_search_colleges_cached
+from career_ai_chatbot_logic import aget_chatbot_answer_from_question
+from chat_session_logic import aget_session_answer, session_id_from_request
+from resume_builder_logic import agenerate_ai_summary_cached
+from http_client_logic import async_http_client
+from metrics_logic import start_request_timings, SERVER_TIMING_ENABLED
+from rate_limit_logic import acheck_client_limit, client_id, rate_limited_body, retry_after_header
+
+flask_app = flask_module.app
+logger = flask_app.logger
+
+# Thread pool of the WSGI bridge = how many sync Flask requests this process serves at once
+ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "16"))
+try:
+    from a2wsgi import WSGIMiddleware
+    flask_asgi = WSGIMiddleware(flask_app, workers=ASGI_WSGI_THREADS)
+except ImportError:
+    from starlette.middleware.wsgi import WSGIMiddleware
+    flask_asgi = WSGIMiddleware(flask_app)
+
+_chatbot_init_lock = asyncio.Lock()
+
+async def _ensure_chatbot_initialized() -> bool:
+    if flask_module._chatbot_app_initialized_flag:
+        return True
+    async with _chatbot_init_lock: # One initialization per process, off the event loop
+        return await asyncio.to_thread(flask_module.warm_up_chatbot_for_worker)
+
+def _observe(endpoint: str, method: str, timings, response: Response) -> Response:
+    """Same request metrics and Server-Timing header as the Flask after_request hook."""
+    elapsed = time.perf_counter() - timings.started
+    flask_module.HTTP_REQUEST_DURATION.observe(elapsed, endpoint=endpoint, method=method, status=response.status_code)
+    flask_module.HTTP_REQUESTS.inc(endpoint=endpoint, method=method, status=response.status_code)
+    if SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = timings.server_timing_header()
+    return response
+
+async def _rate_limited(request: Request, group: str):
+    """A 429 response when the client is over its `group` limit (same body as the Flask hook), else None."""
+    remote_addr = request.client.host if request.client else None
+    retry_after = await acheck_client_limit(group, client_id(remote_addr, request.headers.get('x-forwarded-for')))
+    if not retry_after:
+        return None
+    logger.warning(f"Rate limit: {remote_addr} over the '{group}' limit on {request.url.path}; retry in {retry_after:.1f}s")
+    return JSONResponse(rate_limited_body(retry_after), status_code=429, headers={"Retry-After": retry_after_header(retry_after)})
+
+class SearchEducationEndpoint:
+    """GET /api/search_education. Streaming (?stream=...) and non-GET requests go to the Flask route."""
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if scope["method"] != "GET" or query.get("stream"):
+            await flask_asgi(scope, receive, send)
+            return
+        timings = start_request_timings()
+        response = _observe('/api/search_education', "GET", timings, await self.handle(Request(scope, receive)))
+        await response(scope, receive, send)
+
+    async def handle(self, request: Request) -> Response:
+        rejected = await _rate_limited(request, 'search')
+        if rejected is not None:
+            return rejected
+        try:
+            country = request.query_params.get('country', '')
+            course_type = request.query_params.get('fieldOfStudy', '')
+            degree_level = request.query_params.get('degreeLevel')
+            logger.info(f"Education search (async): Country='{country}', Course='{course_type}', Degree='{degree_level}'")
+            if not course_type and not country and (not degree_level or degree_level == "Any"):
+                logger.warning("Education search is too broad. No country, course, or specific degree specified. Returning empty.")
+                return JSONResponse([])
+
+            results = await async_search_colleges_cached(country, course_type, degree_level)
+            logger.info(f"Edu Fetcher API returned {len(results)} institutions.")
+            body = flask_app.json.response(results).get_data() # Same bytes (and ETag) as the Flask route
+            etag = generate_etag(body)
+            headers = {"ETag": f'"{etag}"', "Cache-Control": f"public, max-age={flask_module.EDU_SEARCH_BROWSER_MAX_AGE}"}
+            if parse_etags(request.headers.get("if-none-match")).contains(etag):
+                return Response(status_code=304, headers=headers)
+            return Response(body, media_type="application/json", headers=headers)
+        except Exception as e:
+            logger.error(f"Error in /api/search_education (async): {e}", exc_info=True)
+            return JSONResponse({"error": f"An internal server error occurred searching education: {str(e)}"}, status_code=500)
+
+async def api_chat(request: Request) -> Response:
+    timings = start_request_timings()
+    return _observe('/api/chat', "POST", timings, await _api_chat(request))
+
+async def _api_chat(request: Request) -> Response:
+    rejected = await _rate_limited(request, 'chat')
+    if rejected is not None:
+        return rejected
+    if not await _ensure_chatbot_initialized():
+        logger.critical("Chatbot initialization FAILED in /api/chat (async). Service unavailable.")
+        return JSONResponse({"error": "Chatbot service is currently unavailable. Please try again later."}, status_code=503)
+    try:
+        data = await request.json()
+        user_message = data.get('message')
+        if not user_message:
+            logger.warning("No message received for chatbot API.")
+            return JSONResponse({"error": "No message provided"}, status_code=400)
+        try:
+            session_id = session_id_from_request(data)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        logger.info(f"Chat API (async) received user message: '{user_message}'")
+        if session_id:
+            bot_response_text = await aget_session_answer(session_id, user_message)
+        else:
+            bot_response_text = await aget_chatbot_answer_from_question(user_message)
+        logger.info(f"Chat API sending response (first 100 chars): '{bot_response_text[:100]}...'")
+        if session_id:
+            return JSONResponse({"response": bot_response_text, "session_id": session_id})
+        return JSONResponse({"response": bot_response_text})
+    except Exception as e:
+        logger.error(f"Error in /api/chat (async): {e}", exc_info=True)
+        return JSONResponse({"error": f"An internal server error occurred in chat: {str(e)}"}, status_code=500)
+
+async def api_generate_summary(request: Request) -> Response:
+    timings = start_request_timings()
+    return _observe('/api/generate_summary', "POST", timings, await _api_generate_summary(request))
+
+async def _api_generate_summary(request: Request) -> Response:
+    rejected = await _rate_limited(request, 'ai_summary')
+    if rejected is not None:
+        return rejected
+    try:
+        data = await request.json()
+        keywords = data.get('keywords', [])
+        experience_highlights = data.get('experience_highlights', "")
+        logger.info(f"AI Summary request (async): Keywords='{keywords}', Highlights='{experience_highlights}'")
+        if not keywords and not experience_highlights:
+            return JSONResponse({"error": "Keywords or experience highlights are required for AI summary."}, status_code=400)
+
+        summary, cache_hit = await agenerate_ai_summary_cached(keywords, experience_highlights)
+        if "Error" in summary or "Could not generate" in summary or "disabled" in summary or "blocked" in summary.lower():
+            logger.warning(f"AI Summary generation issue: {summary}")
+            return JSONResponse({"summary": summary, "ai_message": summary})
+        return JSONResponse({"summary": summary}, headers={"X-Summary-Cache": "hit" if cache_hit else "miss"})
+    except Exception as e:
+        logger.error(f"Error in /api/generate_summary (async): {e}", exc_info=True)
+        return JSONResponse({"error": f"An internal server error occurred generating summary: {str(e)}"}, status_code=500)
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    if flask_module.CHATBOT_PRELOAD:
+        await _ensure_chatbot_initialized()
+    yield
+    await async_http_client.aclose()
+
+app = Starlette(
+    routes=[
+        Route('/api/search_education', SearchEducationEndpoint()),
+        Route('/api/chat', api_chat, methods=['POST']),
+        Route('/api/generate_summary', api_generate_summary, methods=['POST']),
+        Mount('/', app=flask_asgi), # Everything else: the Flask app, unchanged
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,115 @@
+# /my_career_portal/benchmarks/bench_async_serving.py
+"""
+Load test of /api/search_education at a fixed concurrency against stubbed upstreams, comparing
+the two serving modes under the same server (uvicorn, one process):
+
+    wsgi   every request goes through the Flask app on a bounded thread pool (ASGI_WSGI_THREADS)
+    asgi   asgi_app.app, where the search endpoint is a native async handler
+
+Every request uses a unique query so the result caches never answer it. Server CPU time per
+request is reported too: once the server process is CPU-bound, neither mode can go faster.
+
+    python benchmarks/bench_async_serving.py --requests 1000 --concurrency 200 --latency 0.1
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_upstreams import StubConfig, StubUpstreams  # noqa: E402
+from bench_edu_enrichment import percentile  # noqa: E402
+
+MODES = {"wsgi": "asgi_app:flask_asgi", "asgi": "asgi_app:app"}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK") # utime + stime
+
+
+def start_server(mode, stub, threads):
+    port = _free_port()
+    env = dict(os.environ, GOOGLE_API_KEY="stub-key", UNSPLASH_ACCESS_KEY="stub-key", EDU_INDEX_PATH="",
+               EDU_CACHE_SQLITE_PATH="", CHATBOT_PRELOAD="0", ASGI_WSGI_THREADS=str(threads), RATE_LIMITS_ENABLED="0",
+               EDU_GOOGLE_PLACES_URL=stub.urls()["GOOGLE_PLACES_TEXTSEARCH_URL"],
+               EDU_WIKIPEDIA_SEARCH_URL=stub.urls()["WIKIPEDIA_SEARCH_URL"],
+               EDU_WIKIPEDIA_SUMMARY_URL=stub.urls()["WIKIPEDIA_SUMMARY_URL"],
+               EDU_UNSPLASH_URL=stub.urls()["UNSPLASH_RANDOM_PHOTO_URL"])
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", MODES[mode], "--port", str(port), "--log-level", "warning"],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(600):
+        try:
+            httpx.get(f"{base_url}/about", timeout=1.0)
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+async def load(base_url, requests, concurrency, tag):
+    latencies, errors = [], 0
+    queue = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        async def user():
+            nonlocal errors
+            for i in queue:
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/api/search_education", params={"country": "USA", "fieldOfStudy": f"Field {tag} {i}"})
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.1, help="Base stub latency per upstream call (s)")
+    parser.add_argument("--threads", type=int, default=16, help="WSGI bridge threads (ASGI_WSGI_THREADS)")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["wsgi", "asgi"])
+    args = parser.parse_args()
+
+    print(f"{args.requests} searches, concurrency {args.concurrency}, upstream latency {args.latency * 1000:.0f}ms, "
+          f"{args.threads} WSGI threads, {os.cpu_count()} CPUs")
+    with StubUpstreams(StubConfig(latency=args.latency)) as stub:
+        for mode in args.modes:
+            process, base_url = start_server(mode, stub, args.threads)
+            try:
+                asyncio.run(load(base_url, min(args.concurrency, 20), min(args.concurrency, 20), f"warm-{mode}"))
+                cpu_before = _cpu_seconds(process.pid)
+                elapsed, latencies, errors = asyncio.run(load(base_url, args.requests, args.concurrency, mode))
+                cpu_per_request = (_cpu_seconds(process.pid) - cpu_before) / args.requests
+            finally:
+                process.terminate()
+                process.wait()
+            print(f"{mode:5s} {args.requests / elapsed:7.1f} req/s  p50={percentile(latencies, 50) * 1000:8.1f}ms  "
+                  f"p95={percentile(latencies, 95) * 1000:8.1f}ms  p99={percentile(latencies, 99) * 1000:8.1f}ms  errors={errors}  "
+                  f"server CPU {cpu_per_request * 1000:.1f}ms/req")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# /my_career_portal/benchmarks/bench_chat_sessions.py
+"""
+Prompt tokens per turn over a long conversation, with fake models (no API key or network):
+
+    repaste   stateless /api/chat where the user pastes the previous exchange into each question
+    session   chat_session_logic: summary + recent turns within CHAT_HISTORY_TOKEN_BUDGET
+
+Also prints how many follow-ups were rewritten and how many compactions ran.
+
+    python benchmarks/bench_chat_sessions.py --turns 30 --summary-mode extractive
+"""
+import argparse
+import os
+import sys
+from typing import Any, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_upstreams import StubConfig  # noqa: E402
+from fake_llm import FakeChatLLM, install_fake_models  # noqa: E402
+
+FOLLOW_UPS = ["What about in Germany?", "And how long does that take?", "Is it worth it for someone like me?",
+              "What skills should I learn first for that?", "How do I explain that gap in an interview?"]
+
+
+class CountingChatLLM(FakeChatLLM):
+    prompt_tokens: list = []
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        self.prompt_tokens.append(len(prompt.split()) * 4 // 3)
+        return super()._call(prompt, stop, run_manager, **kwargs)
+
+
+def conversation(turns):
+    first = "I am a mechanical engineer with five years of experience and want to move into data science."
+    return [first] + [FOLLOW_UPS[i % len(FOLLOW_UPS)] for i in range(turns - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=800, help="CHAT_HISTORY_TOKEN_BUDGET")
+    parser.add_argument("--summary-mode", choices=["llm", "extractive"], default="llm")
+    args = parser.parse_args()
+
+    os.environ.update(CHAT_HISTORY_TOKEN_BUDGET=str(args.budget), CHAT_SUMMARY_MODE=args.summary_mode, CHATBOT_SEMANTIC_CACHE="0")
+    import career_ai_chatbot_logic as chatbot
+    import chat_session_logic as sessions
+
+    config = StubConfig(latency=0.0, jitter=0.0)
+    llm = CountingChatLLM(config=config, fallback_phrase=chatbot.FALLBACK_PHRASE)
+    install_fake_models(config, llm=llm)
+
+    questions = conversation(args.turns)
+    repaste, previous = [], ""
+    for question in questions:
+        llm.prompt_tokens.clear()
+        answer = chatbot.get_chatbot_answer_from_question(f"{previous}\n{question}".strip())
+        repaste.append(sum(llm.prompt_tokens))
+        previous = f"{previous}\nMe: {question}\nBot: {answer}".strip()
+
+    session_id, per_turn = sessions.new_session_id(), []
+    for question in questions:
+        llm.prompt_tokens.clear()
+        sessions.get_session_answer(session_id, question)
+        per_turn.append(sum(llm.prompt_tokens)) # Includes the summary call on turns that compact
+
+    print(f"{'turn':>4}  {'repaste':>8}  {'session':>8}")
+    for turn, (old, new) in enumerate(zip(repaste, per_turn), start=1):
+        print(f"{turn:4d}  {old:8d}  {new:8d}")
+    info = sessions.get_session_info(session_id)
+    print(f"session: {info['turns']} turns verbatim, {info['summarized_turns']} summarized, history {info['history_tokens']} tokens; "
+          f"rewrites {sum(sessions.QUERY_REWRITES.value(mode=mode) for mode in ('heuristic', 'llm'))}, "
+          f"compactions {sum(sessions.SESSION_COMPACTIONS.value(mode=mode) for mode in ('extractive', 'llm'))}")
+
+
+if __name__ == "__main__":
+    main()
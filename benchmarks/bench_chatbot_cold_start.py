@@ -0,0 +1,81 @@
+# /my_career_portal/benchmarks/bench_chatbot_cold_start.py
+"""
+Measures chatbot cold start and per-worker memory for N forked workers, with and without
+preloading the embedding model in the parent (what gunicorn preload_app does). Needs the
+chatbot dependencies installed and GOOGLE_API_KEY set (no LLM request is made). Linux only,
+since PSS comes from /proc/<pid>/smaps_rollup.
+
+    python benchmarks/bench_chatbot_cold_start.py --workers 4
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def memory_kb(pid, field):
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def run(workers, preload):
+    import career_ai_chatbot_logic as chatbot
+    parent_load = 0.0
+    if preload:
+        started = time.perf_counter()
+        chatbot.preload_embedding_model()
+        parent_load = time.perf_counter() - started
+        gc.freeze()
+
+    children = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # Worker: time its own init, report, then idle until measured
+            os.close(read_fd)
+            started = time.perf_counter()
+            ok = chatbot.initialize_chatbot_components_globally()
+            os.write(write_fd, json.dumps({"ok": ok, "init_seconds": time.perf_counter() - started}).encode())
+            os.close(write_fd)
+            time.sleep(30)
+            os._exit(0)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in children:
+        report = json.loads(os.read(read_fd, 4096).decode())
+        report.update({"rss_mb": memory_kb(pid, "Rss") / 1024, "pss_mb": memory_kb(pid, "Pss") / 1024})
+        results.append(report)
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+    return parent_load, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=["lazy", "preload", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["lazy", "preload"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        if len(modes) > 1 and mode == "preload":
+            # Each mode needs a pristine interpreter, so re-run this script for the second one
+            os.execv(sys.executable, [sys.executable, __file__, "--workers", str(args.workers), "--mode", "preload"])
+        parent_load, results = run(args.workers, preload=(mode == "preload"))
+        worst_init = max(r["init_seconds"] for r in results)
+        print(f"{mode:<8} parent-load={parent_load:.2f}s worst-worker-init={worst_init:.2f}s "
+              f"rss/worker={sum(r['rss_mb'] for r in results) / len(results):.0f}MB "
+              f"pss-total={sum(r['pss_mb'] for r in results):.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
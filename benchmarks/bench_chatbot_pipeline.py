@@ -0,0 +1,110 @@
+# /my_career_portal/benchmarks/bench_chatbot_pipeline.py
+"""
+Compares the legacy (RetrievalQA + refine + optional general call) and single-pass chatbot
+pipelines with a fake LLM and a fake retriever: LLM calls per question, approximate tokens
+and end-to-end latency. Needs the langchain packages the chatbot imports; no API key or
+network is used.
+
+    python benchmarks/bench_chatbot_pipeline.py --questions 50 --off-topic-ratio 0.3
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.chains import LLMChain, RetrievalQA  # noqa: E402
+from langchain_core.callbacks import CallbackManagerForRetrieverRun  # noqa: E402
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.language_models.llms import LLM  # noqa: E402
+from langchain_core.retrievers import BaseRetriever  # noqa: E402
+
+import career_ai_chatbot_logic as chatbot  # noqa: E402
+import rate_limit_logic  # noqa: E402
+
+OFF_TOPIC_MARKER = "[off-topic]"
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, round(len(text.split()) * 4 / 3))
+
+
+class CountingFakeLLM(LLM):
+    """Sleeps like a remote model and counts calls/tokens. Off-topic questions trigger the fallback phrase."""
+    base_latency: float = 0.3
+    latency_per_output_token: float = 0.002
+    stats: dict = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting-fake"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        answer = "Focus on building a portfolio, networking with practitioners and tailoring each application. " * 3
+        if OFF_TOPIC_MARKER in prompt and "Retrieved Context" in prompt:
+            answer = f"{chatbot.FALLBACK_PHRASE}\n{answer}"
+        self.stats["calls"] = self.stats.get("calls", 0) + 1
+        self.stats["prompt_tokens"] = self.stats.get("prompt_tokens", 0) + approx_tokens(prompt)
+        self.stats["completion_tokens"] = self.stats.get("completion_tokens", 0) + approx_tokens(answer)
+        time.sleep(self.base_latency + self.latency_per_output_token * approx_tokens(answer))
+        return answer
+
+
+class FakeRetriever(BaseRetriever):
+    latency: float = 0.01
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        time.sleep(self.latency)
+        return [Document(page_content=f"Career guidance passage {i}: practical advice on interviews, resumes and skills. " * 8)
+                for i in range(3)]
+
+
+def install_fakes(llm, retriever):
+    chatbot.SEMANTIC_CACHE_ENABLED = False  # Measure the pipeline itself, not the cache
+    rate_limit_logic.RATE_LIMITS_ENABLED = False  # Fakes have no quota to protect
+    chatbot.retriever_chatbot = retriever
+    chatbot.qa_chain_retriever_chatbot = RetrievalQA.from_chain_type(
+        llm=llm, chain_type="stuff", retriever=retriever, return_source_documents=True)
+    chatbot.llm_chain_general_chatbot = LLMChain(llm=llm, prompt=chatbot.GENERAL_PROMPT_CHATBOT)
+    chatbot.llm_chain_refine_chatbot = LLMChain(llm=llm, prompt=chatbot.REFINE_PROMPT_CHATBOT)
+    chatbot.llm_chain_single_pass_chatbot = LLMChain(llm=llm, prompt=chatbot.SINGLE_PASS_PROMPT_CHATBOT)
+    chatbot.is_chatbot_initialized_flag = True
+
+
+def run_mode(mode, questions, llm):
+    chatbot.PIPELINE_MODE = mode
+    llm.stats.clear()
+    latencies = []
+    for question in questions:
+        started = time.perf_counter()
+        chatbot.get_chatbot_answer_from_question(question)
+        latencies.append(time.perf_counter() - started)
+    n = len(questions)
+    ordered = sorted(latencies)
+    print(f"{mode:<7} llm-calls/q={llm.stats['calls'] / n:.2f}  prompt-tokens/q={llm.stats['prompt_tokens'] / n:.0f}  "
+          f"completion-tokens/q={llm.stats['completion_tokens'] / n:.0f}  p50={ordered[n // 2] * 1000:.0f}ms  "
+          f"p95={ordered[min(n - 1, int(n * 0.95))] * 1000:.0f}ms  mean={statistics.mean(latencies) * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--off-topic-ratio", type=float, default=0.3, help="Share of questions the context cannot answer")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    questions = [f"How do I prepare for interview round {i}?" + (f" {OFF_TOPIC_MARKER}" if rng.random() < args.off_topic_ratio else "")
+                 for i in range(args.questions)]
+    llm = CountingFakeLLM(base_latency=args.llm_latency)
+    install_fakes(llm, FakeRetriever())
+    for mode in ("legacy", "single"):
+        run_mode(mode, questions, llm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# /my_career_portal/benchmarks/bench_edu_enrichment.py
+"""
+Compares sequential vs concurrent institution enrichment in search_colleges_globally_api
+against a local stub server. Run from the repository root:
+
+    python benchmarks/bench_edu_enrichment.py --runs 20 --latency 0.15 --slow-ratio 0.05
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import higher_education_fetcher_logic as edu  # noqa: E402
+from stub_upstreams import StubConfig, StubUpstreams  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(label, runs, max_workers, deadline):
+    original = edu.enrich_colleges_concurrently
+    def patched(colleges, country, **_):
+        return original(colleges, country, max_workers=max_workers, deadline=deadline)
+    edu.enrich_colleges_concurrently = patched
+    try:
+        samples, partial = [], 0
+        for i in range(runs):
+            # Measure cold enrichment: warm caches would hide the fan-out entirely
+            edu.wikipedia_summary_cache.clear()
+            edu.unsplash_image_cache.clear()
+            started = time.perf_counter()
+            results = edu.search_colleges_globally_api("USA", f"Computer Science {i}", "master")
+            samples.append(time.perf_counter() - started)
+            partial += sum(1 for r in results if r["description"] == edu.WIKIPEDIA_TIMEOUT_FALLBACK)
+    finally:
+        edu.enrich_colleges_concurrently = original
+    print(f"{label:<12} p50={percentile(samples, 50)*1000:8.1f}ms  p99={percentile(samples, 99)*1000:8.1f}ms  "
+          f"mean={statistics.mean(samples)*1000:8.1f}ms  timed-out-lookups={partial}")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1, help="Base stub latency per upstream call (s)")
+    parser.add_argument("--jitter", type=float, default=0.03)
+    parser.add_argument("--slow-ratio", type=float, default=0.02, help="Fraction of calls hitting the slow tail")
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=edu.ENRICH_MAX_WORKERS)
+    parser.add_argument("--deadline", type=float, default=edu.ENRICH_DEADLINE_SECONDS)
+    args = parser.parse_args()
+
+    config = StubConfig(latency=args.latency, jitter=args.jitter, slow_ratio=args.slow_ratio, slow_latency=args.slow_latency)
+    edu.institution_index = None # Always exercise the Places + enrichment path
+    with StubUpstreams(config) as stub:
+        stub.point_fetcher_at_stub(edu)
+        sequential = run_mode("sequential", args.runs, max_workers=1, deadline=3600)
+        concurrent = run_mode("concurrent", args.runs, max_workers=args.workers, deadline=args.deadline)
+    print(f"p50 speedup: {percentile(sequential, 50) / percentile(concurrent, 50):.1f}x, "
+          f"p99 speedup: {percentile(sequential, 99) / percentile(concurrent, 99):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# /my_career_portal/benchmarks/bench_endpoints.py
+"""
+Offline end-to-end benchmark of the main API endpoints. Google Places, Wikipedia and Unsplash are
+local stub servers, Gemini/embeddings/vector store are in-process fakes (fake_llm.py), and each
+endpoint is load-tested at a fixed concurrency against its own fresh server process (the Flask
+app on werkzeug's threaded server), so caches and memory start cold every time.
+
+Reports throughput, p50/p95/p99 latency, errors (non-2xx/3xx and transport failures), degraded
+answers (200s carrying a model error message), server CPU per request and server memory
+(RSS before/after, peak). --json-out writes everything, with the git commit, for diffing:
+
+    python benchmarks/bench_endpoints.py --requests 300 --concurrency 16 --json-out bench-head.json
+    python benchmarks/bench_endpoints.py --endpoints search resume --latency 0.2 --upstream-error-ratio 0.02
+    python benchmarks/bench_endpoints.py --compare bench-base.json bench-head.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_upstreams import StubConfig, StubUpstreams  # noqa: E402
+from bench_edu_enrichment import percentile  # noqa: E402
+from bench_async_serving import _cpu_seconds, _free_port  # noqa: E402
+import bench_fixtures  # noqa: E402
+
+
+def _chat_degraded(response):
+    return response.json().get("response", "").startswith("Sorry,")
+
+
+def _summary_degraded(response):
+    return "ai_message" in response.json()
+
+
+ENDPOINTS = {
+    # name: (method, path, fixture, degraded) -- degraded(response) spots 200s that carry an error message
+    "search": ("GET", "/api/search_education", bench_fixtures.search_queries, None),
+    "chat": ("POST", "/api/chat", bench_fixtures.chat_messages, _chat_degraded),
+    "summary": ("POST", "/api/generate_summary", bench_fixtures.summary_requests, _summary_degraded),
+    "resume": ("POST", "/api/build_resume", bench_fixtures.resume_requests, None),
+}
+
+
+# --- Server process ---
+def serve(args):
+    """Child process: the Flask app with fake models, on werkzeug's threaded server."""
+    from werkzeug.serving import make_server
+    from fake_llm import install_fake_models
+    import app as flask_module
+
+    install_fake_models(StubConfig(latency=args.llm_latency, jitter=args.llm_jitter, slow_ratio=0.0,
+                                   error_ratio=args.llm_error_ratio, seed=args.seed))
+    make_server("127.0.0.1", args.port, flask_module.app, threaded=True).serve_forever()
+
+
+def _memory_mb(pid):
+    """(current RSS, peak RSS) of a process in MB, from /proc."""
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                key, kb = line.split()[:2]
+                values[key] = int(kb) / 1024
+    return values.get("VmRSS:", 0.0), values.get("VmHWM:", 0.0)
+
+
+def start_server(args, stub):
+    port = _free_port()
+    urls = stub.urls()
+    env = dict(os.environ, GOOGLE_API_KEY="stub-key", UNSPLASH_ACCESS_KEY="stub-key", EDU_INDEX_PATH="",
+               EDU_CACHE_SQLITE_PATH="", CHATBOT_SEMANTIC_CACHE_PATH="", CHATBOT_PRELOAD="0",
+               RESUME_DELIVERY_MODE="inline", AI_SUMMARY_MAX_RPM=str(args.summary_rpm), RATE_LIMITS_ENABLED="0",
+               EDU_GOOGLE_PLACES_URL=urls["GOOGLE_PLACES_TEXTSEARCH_URL"],
+               EDU_WIKIPEDIA_SEARCH_URL=urls["WIKIPEDIA_SEARCH_URL"],
+               EDU_WIKIPEDIA_SUMMARY_URL=urls["WIKIPEDIA_SUMMARY_URL"],
+               EDU_UNSPLASH_URL=urls["UNSPLASH_RANDOM_PHOTO_URL"])
+    command = [sys.executable, os.path.abspath(__file__), "serve", "--port", str(port), "--seed", str(args.seed),
+               "--llm-latency", str(args.llm_latency), "--llm-jitter", str(args.llm_jitter),
+               "--llm-error-ratio", str(args.llm_error_ratio)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(600):
+        if process.poll() is not None:
+            raise RuntimeError(f"benchmark server exited with code {process.returncode}")
+        try:
+            httpx.get(f"{base_url}/about", timeout=1.0)
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("benchmark server did not start")
+
+
+# --- Load generator ---
+async def load(base_url, method, path, payloads, concurrency, degraded=None):
+    """Sends every payload once, `concurrency` requests in flight; (elapsed, latencies, outcome counts)."""
+    latencies, statuses = [], {}
+    queue = iter(payloads)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300.0) as client:
+        async def user():
+            for payload in queue:
+                started = time.perf_counter()
+                try:
+                    if method == "GET":
+                        response = await client.get(path, params=payload)
+                    else:
+                        response = await client.post(path, json=payload)
+                    outcome = str(response.status_code)
+                    if degraded is not None and response.status_code == 200 and degraded(response):
+                        outcome = "200-degraded"
+                except httpx.HTTPError as e:
+                    outcome = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[outcome] = statuses.get(outcome, 0) + 1
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, statuses
+
+
+def run_endpoint(name, args, stub):
+    method, path, fixture, degraded = ENDPOINTS[name]
+    payloads = fixture(args.requests, seed=args.seed, repeat_ratio=args.repeat_ratio, tag="run")
+    warmup = fixture(args.warmup, seed=args.seed + 1000, tag="warm") if args.warmup else []
+    process, base_url = start_server(args, stub)
+    try:
+        if warmup:
+            asyncio.run(load(base_url, method, path, warmup, min(args.concurrency, len(warmup))))
+        rss_start, _ = _memory_mb(process.pid)
+        cpu_before = _cpu_seconds(process.pid)
+        elapsed, latencies, statuses = asyncio.run(load(base_url, method, path, payloads, args.concurrency, degraded))
+        cpu_per_request = (_cpu_seconds(process.pid) - cpu_before) / len(payloads)
+        rss_end, rss_peak = _memory_mb(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+    degraded_count = statuses.get("200-degraded", 0)
+    return {
+        "method": method, "path": path, "requests": len(payloads), "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3), "throughput_rps": round(len(payloads) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1), "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1), "max": round(max(latencies) * 1000, 1),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 1),
+        },
+        "errors": errors, "degraded": degraded_count, "statuses": dict(sorted(statuses.items())),
+        "server": {"cpu_ms_per_request": round(cpu_per_request * 1000, 2), "rss_mb_start": round(rss_start, 1),
+                   "rss_mb_end": round(rss_end, 1), "rss_mb_peak": round(rss_peak, 1)},
+    }
+
+
+def _git(*command):
+    try:
+        return subprocess.run(["git", *command], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(name, result):
+    latency, server = result["latency_ms"], result["server"]
+    print(f"{name:8s} {result['throughput_rps']:8.1f} req/s  p50={latency['p50']:8.1f}ms  p95={latency['p95']:8.1f}ms  "
+          f"p99={latency['p99']:8.1f}ms  errors={result['errors']:<4d} degraded={result['degraded']:<4d} cpu={server['cpu_ms_per_request']:.1f}ms/req  "
+          f"rss={server['rss_mb_start']:.0f}->{server['rss_mb_end']:.0f}MB (peak {server['rss_mb_peak']:.0f}MB)")
+
+
+# --- Comparison ---
+def compare(base_path, head_path):
+    """Per-endpoint change from one --json-out file to another (negative latency change = faster)."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+    print(f"base {base['meta'].get('git_commit') or base_path}  ->  head {head['meta'].get('git_commit') or head_path}")
+    def change(old, new):
+        return f"{(new - old) / old * 100:+7.1f}%" if old else "    n/a"
+    for name, new in head["results"].items():
+        old = base["results"].get(name)
+        if old is None:
+            print(f"{name:8s} (not in base)")
+            continue
+        print(f"{name:8s} throughput {change(old['throughput_rps'], new['throughput_rps'])}  "
+              + "  ".join(f"{p} {change(old['latency_ms'][p], new['latency_ms'][p])}" for p in ("p50", "p95", "p99"))
+              + f"  peak rss {change(old['server']['rss_mb_peak'], new['server']['rss_mb_peak'])}"
+              + f"  errors {old['errors']}->{new['errors']}  degraded {old.get('degraded', 0)}->{new.get('degraded', 0)}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        parser = argparse.ArgumentParser()
+        parser.add_argument("command")
+        parser.add_argument("--port", type=int, required=True)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--llm-latency", type=float, default=0.4)
+        parser.add_argument("--llm-jitter", type=float, default=0.1)
+        parser.add_argument("--llm-error-ratio", type=float, default=0.0)
+        serve(parser.parse_args())
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per endpoint (distinct payloads)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="Share of payloads repeating an earlier one (cache hits)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Base upstream HTTP latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.03)
+    parser.add_argument("--slow-ratio", type=float, default=0.0, help="Share of upstream calls hitting the slow tail")
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--upstream-error-ratio", type=float, default=0.0, help="Share of upstream calls answered with 503")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="Base fake model latency (s)")
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-error-ratio", type=float, default=0.0)
+    parser.add_argument("--summary-rpm", type=float, default=0, help="AI_SUMMARY_MAX_RPM for the server (0 = no pacing)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json-out", help="Write results and run metadata to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE_JSON", "HEAD_JSON"), help="Diff two --json-out files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    print(f"{args.requests} requests/endpoint, concurrency {args.concurrency}, upstream {args.latency * 1000:.0f}ms, "
+          f"model {args.llm_latency * 1000:.0f}ms, {os.cpu_count()} CPUs")
+    stub_config = StubConfig(latency=args.latency, jitter=args.jitter, slow_ratio=args.slow_ratio,
+                             slow_latency=args.slow_latency, error_ratio=args.upstream_error_ratio, seed=args.seed)
+    results = {}
+    with StubUpstreams(stub_config) as stub:
+        for name in args.endpoints:
+            results[name] = run_endpoint(name, args, stub)
+            print_result(name, results[name])
+
+    if args.json_out:
+        report = {
+            "meta": {"git_commit": _git("rev-parse", "HEAD"), "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+                     "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "python": platform.python_version(),
+                     "platform": platform.platform(), "cpus": os.cpu_count(), "args": vars(args)},
+            "results": results,
+        }
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# /my_career_portal/benchmarks/bench_fixtures.py
+"""
+Deterministic request payloads for the endpoint benchmarks: many distinct education searches,
+chat questions (some the knowledge base cannot answer), summary requests and resumes from a
+one-line profile up to 25+ entries per section. The same seed always yields the same payloads;
+`repeat_ratio` re-sends earlier payloads to exercise the caches.
+"""
+import random
+
+from fake_llm import OFF_TOPIC_MARKER
+
+COUNTRIES = ["USA", "UK", "Canada", "Germany", "India", "Australia", "France", "Japan", "Netherlands", "Singapore"]
+FIELDS = ["Computer Science", "Data Science", "Mechanical Engineering", "Economics", "Psychology", "Biology",
+          "Architecture", "Law", "Medicine", "Physics", "Finance", "Design", "Chemistry", "History", "Nursing"]
+DEGREES = ["Any", "bachelor", "master", "phd"]
+TOPICS = ["interviews", "resume gaps", "salary negotiation", "career change", "internships", "networking",
+          "portfolio projects", "remote work", "promotions", "certifications"]
+SKILLS = ["Python", "SQL", "React", "AWS", "Kubernetes", "Figma", "Excel", "Tableau", "Go", "Java", "Leadership", "Public speaking"]
+
+
+def _with_repeats(make, n, repeat_ratio, rng):
+    payloads = []
+    for i in range(n):
+        if payloads and rng.random() < repeat_ratio:
+            payloads.append(rng.choice(payloads))
+        else:
+            payloads.append(make(i))
+    return payloads
+
+
+def search_queries(n, seed=1, repeat_ratio=0.0, tag=""):
+    """GET /api/search_education params; distinct unless repeated."""
+    rng = random.Random(seed)
+    def make(i):
+        field = f"{rng.choice(FIELDS)} {tag}{i}".strip()
+        return {"country": rng.choice(COUNTRIES), "fieldOfStudy": field, "degreeLevel": rng.choice(DEGREES)}
+    return _with_repeats(make, n, repeat_ratio, rng)
+
+
+def chat_messages(n, seed=2, repeat_ratio=0.0, off_topic_ratio=0.2, tag=""):
+    """POST /api/chat bodies; off-topic ones make the fake model fall back to general knowledge."""
+    rng = random.Random(seed)
+    def make(i):
+        message = f"How should I approach {rng.choice(TOPICS)} as a {rng.choice(FIELDS).lower()} graduate? ({tag}{i})"
+        if rng.random() < off_topic_ratio:
+            message += f" {OFF_TOPIC_MARKER}"
+        return {"message": message}
+    return _with_repeats(make, n, repeat_ratio, rng)
+
+
+def summary_requests(n, seed=3, repeat_ratio=0.0, tag=""):
+    """POST /api/generate_summary bodies."""
+    rng = random.Random(seed)
+    def make(i):
+        return {"keywords": rng.sample(SKILLS, k=rng.randint(2, 6)),
+                "experience_highlights": f"{rng.randint(1, 15)} years in {rng.choice(FIELDS).lower()}, led project {tag}{i}"}
+    return _with_repeats(make, n, repeat_ratio, rng)
+
+
+def resume_payload(name, entries, bullets=4):
+    """A /api/build_resume body in the form the frontend sends (stack_str, skills_input, description_list)."""
+    return {
+        "name": name, "email": "candidate@example.com", "phone": "+1 555 0100",
+        "linkedin": "https://linkedin.com/in/example", "github": "https://github.com/example",
+        "summary": "Software engineer focused on data-intensive web services. " * 4,
+        "education": [{"degree": f"B.Sc. Computer Science {i}", "institution": f"Example University {i}",
+                       "year": "2016 - 2020", "details": "GPA 3.8, Dean's list."} for i in range(entries)],
+        "experience": [{"title": f"Engineer {i}", "company": f"Company {i}", "dates": "2020 - Present",
+                        "description": [f"Shipped feature {i}.{j} used by thousands of customers." for j in range(bullets)]}
+                       for i in range(entries)],
+        "projects": [{"title": f"Project {i}", "stack_str": "Python, Flask, SQLite",
+                      "description": [f"Built component {i}.{j}." for j in range(bullets)]} for i in range(entries)],
+        "skills_input": ", ".join(f"Skill {i}" for i in range(entries * 3)),
+        "certificates": [{"name": f"Certificate {i}", "issuer": "Example Academy", "date": "2023",
+                          "description": "https://example.com/cert"} for i in range(entries)],
+        "achievements": [{"title": f"Award {i}", "description_list": ["Recognized for impact.", "Led a team of five."]}
+                         for i in range(entries)],
+    }
+
+
+def resume_requests(n, seed=4, repeat_ratio=0.0, large_ratio=0.2, tag=""):
+    """POST /api/build_resume bodies: mostly typical (2-5 entries per section), some large (25-40)."""
+    rng = random.Random(seed)
+    def make(i):
+        entries = rng.randint(25, 40) if rng.random() < large_ratio else rng.randint(2, 5)
+        return resume_payload(f"Candidate {tag}{i}", entries, bullets=rng.randint(3, 6))
+    return _with_repeats(make, n, repeat_ratio, rng)
@@ -0,0 +1,80 @@
+# /my_career_portal/benchmarks/bench_institution_index.py
+"""
+Builds a synthetic institution catalog and measures load throughput and search latency,
+next to a Places text search against the local stub server for comparison.
+
+    python benchmarks/bench_institution_index.py --institutions 50000 --queries 500
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from institution_index_logic import InstitutionIndex  # noqa: E402
+from stub_upstreams import StubConfig, StubUpstreams  # noqa: E402
+
+COUNTRIES = ["USA", "UK", "Canada", "Germany", "India", "Australia", "France", "Japan", "Netherlands", "Singapore"]
+FIELDS = ["Computer Science", "Mechanical Engineering", "MBA", "Data Science", "Medicine", "Law", "Physics",
+          "Economics", "Architecture", "Electrical Engineering", "Psychology", "Biotechnology"]
+DEGREES = ["bachelor", "master", "phd", "diploma"]
+
+
+def synthetic_records(count, rng):
+    for i in range(count):
+        country = rng.choice(COUNTRIES)
+        yield {
+            "name": f"{rng.choice(['Northern', 'Royal', 'Pacific', 'Central', 'Technical', 'State'])} University {i}",
+            "address": f"{i} University Avenue, {country}", "country": country,
+            "fields": rng.sample(FIELDS, 3), "degree_levels": rng.sample(DEGREES, 2),
+            "rating": round(rng.uniform(3.0, 5.0), 1), "description": f"Synthetic institution {i}.",
+            "image_url": "http://stub.invalid/image.jpg",
+        }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--institutions", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--stub-latency", type=float, default=0.3, help="Simulated Places round trip (s)")
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = InstitutionIndex(os.path.join(tmp, "institutions.db"))
+        started = time.perf_counter()
+        index.upsert_many(synthetic_records(args.institutions, rng))
+        load_seconds = time.perf_counter() - started
+        print(f"load: {args.institutions} institutions in {load_seconds:.2f}s ({args.institutions / load_seconds:,.0f}/s)")
+
+        samples, hits = [], 0
+        for _ in range(args.queries):
+            started = time.perf_counter()
+            results = index.search(rng.choice(COUNTRIES), rng.choice(FIELDS), rng.choice(DEGREES + ["Any"]))
+            samples.append(time.perf_counter() - started)
+            hits += bool(results)
+        print(f"index search: p50={percentile(samples, 50)*1000:.2f}ms p99={percentile(samples, 99)*1000:.2f}ms "
+              f"mean={statistics.mean(samples)*1000:.2f}ms hit-rate={hits / args.queries:.0%}")
+
+    import higher_education_fetcher_logic as edu
+    with StubUpstreams(StubConfig(latency=args.stub_latency, jitter=args.stub_latency / 5)) as stub:
+        stub.point_fetcher_at_stub(edu)
+        places_samples = []
+        for _ in range(10):
+            started = time.perf_counter()
+            edu.search_google_places_api_edu(f"top {rng.choice(FIELDS)} universities", "stub-key")
+            places_samples.append(time.perf_counter() - started)
+        print(f"places (stub) search: p50={percentile(places_samples, 50)*1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# /my_career_portal/benchmarks/bench_resume_batch.py
+"""
+Batch rendering throughput (resumes/sec, and per worker process) for increasing pool sizes.
+
+    python benchmarks/bench_resume_batch.py --resumes 200 --workers 1 2 4
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_batch_logic import iter_batch_zip_stream, RESUME_BATCH_START_METHOD  # noqa: E402
+from bench_resume_render import sample_resume  # noqa: E402
+
+
+def run(resumes, workers, entries):
+    payloads = [dict(sample_resume(entries), name=f"Student {i}") for i in range(resumes)]
+    context = multiprocessing.get_context(RESUME_BATCH_START_METHOD)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        list(executor.map(abs, range(workers))) # Start the worker processes before timing
+        started = time.perf_counter()
+        zip_bytes = sum(len(chunk) for chunk in iter_batch_zip_stream(payloads, executor=executor))
+        elapsed = time.perf_counter() - started
+    return elapsed, zip_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume batch throughput benchmark.")
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--entries", type=int, default=3, help="Entries per resume section")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 2])
+    args = parser.parse_args()
+
+    print(f"{args.resumes} resumes, {args.entries} entries per section, {os.cpu_count()} CPUs")
+    for workers in args.workers:
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed, zip_bytes = run(args.resumes, workers, args.entries)
+        rate = args.resumes / elapsed
+        print(f"workers={workers:2d}: {elapsed:6.2f}s  {rate:7.1f} resumes/s  {rate / workers:6.2f} resumes/s per worker  "
+              f"zip {zip_bytes / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# /my_career_portal/benchmarks/bench_resume_render.py
+"""
+Per-render time and allocations of generate_resume_pdf_from_data for a typical and a large
+(20+ entries per section) resume, with the shared theme versus rebuilding it on every render
+(what the renderer did before themes were prebuilt).
+
+    python benchmarks/bench_resume_render.py --renders 50 --theme classic
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resume_theme_logic  # noqa: E402
+from resume_builder_logic import generate_resume_pdf_from_data, normalize_resume_payload  # noqa: E402
+
+
+def sample_resume(entries):
+    return normalize_resume_payload({
+        "name": "Jordan Example", "email": "jordan@example.com", "phone": "+1 555 0100",
+        "linkedin": "https://linkedin.com/in/example", "github": "https://github.com/example",
+        "summary": "Software engineer focused on data-intensive web services. " * 4,
+        "education": [{"degree": f"B.Sc. Computer Science {i}", "institution": f"Example University {i}",
+                       "year": "2016 - 2020", "details": "GPA 3.8, Dean's list."} for i in range(entries)],
+        "experience": [{"title": f"Engineer {i}", "company": f"Company {i}", "dates": "2020 - Present",
+                        "description": [f"Shipped feature {i}.{j} used by thousands of customers." for j in range(4)]}
+                       for i in range(entries)],
+        "projects": [{"title": f"Project {i}", "stack_str": "Python, Flask, SQLite",
+                      "description": [f"Built component {i}.{j}." for j in range(3)]} for i in range(entries)],
+        "skills_input": ", ".join(f"Skill {i}" for i in range(entries * 3)),
+        "certificates": [{"name": f"Certificate {i}", "issuer": "Example Academy", "date": "2023",
+                          "description": "https://example.com/cert"} for i in range(entries)],
+        "achievements": [{"title": f"Award {i}", "description_str": "Recognized for impact.\nLed a team of five."}
+                         for i in range(entries)],
+    })
+
+
+def render_once(data, theme, rebuild_theme):
+    if rebuild_theme:
+        resume_theme_logic._build_theme.cache_clear()
+    with contextlib.redirect_stdout(io.StringIO()): # Silence the per-render log line
+        generate_resume_pdf_from_data(data, io.BytesIO(), theme_name=theme)
+
+
+def measure(data, renders, theme, rebuild_theme):
+    # Timing and allocation tracing run separately so tracemalloc overhead does not skew the timings
+    timings, allocated = [], []
+    for _ in range(renders):
+        started = time.perf_counter()
+        render_once(data, theme, rebuild_theme)
+        timings.append(time.perf_counter() - started)
+    for _ in range(max(3, renders // 5)):
+        tracemalloc.start()
+        render_once(data, theme, rebuild_theme)
+        allocated.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return timings, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume render microbenchmark.")
+    parser.add_argument("--renders", type=int, default=30)
+    parser.add_argument("--theme", default="classic")
+    args = parser.parse_args()
+
+    for label, entries in (("typical", 3), ("large", 25)):
+        data = sample_resume(entries)
+        measure(data, 2, args.theme, rebuild_theme=False) # Warm imports and font metrics
+        for mode, rebuild in (("rebuilt theme", True), ("shared theme", False)):
+            timings, allocated = measure(data, args.renders, args.theme, rebuild)
+            print(f"{label:8s} ({entries:2d} entries) {mode:14s}: "
+                  f"median {statistics.median(timings) * 1000:7.2f}ms  "
+                  f"min {min(timings) * 1000:7.2f}ms  "
+                  f"peak alloc {statistics.median(allocated) / 1024:8.1f} KiB/render")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# /my_career_portal/benchmarks/bench_retrieval_quality.py
+"""
+Retrieval quality of plain vector search versus the hybrid retriever (BM25 + vector, RRF fusion,
+reranking, relevance threshold) on a small labeled question set (data/chatbot_retrieval_eval.json).
+
+    precision@k    relevant chunks / returned chunks, over answerable questions that got context
+    hit rate       answerable questions with at least one relevant chunk in the context
+    rejected       unanswerable questions that got no context at all (no refine call)
+    fallback rate  questions sent to the model with context that contains nothing relevant, so the
+                   model falls back to general knowledge (a wasted context/refine call)
+    legacy calls   LLM calls per question in the legacy pipeline: 1 without context, 2 with useful
+                   context, 3 when the refine call falls back
+
+Uses all-MiniLM-L6-v2 when sentence-transformers is installed, otherwise (or with --embeddings
+hashing) hashed bag-of-terms vectors: these only see shared words, not paraphrases, so the
+threshold that suits them is lower than the one that suits MiniLM.
+
+    python benchmarks/bench_retrieval_quality.py --thresholds 0.2 0.3 0.4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_retrieval_logic import build_hybrid_retriever_from_texts, tokenize  # noqa: E402
+
+EVAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "chatbot_retrieval_eval.json")
+
+
+class HashingEmbeddings:
+    """Stand-in when no embedding model is installed: hashed bag of the retriever's own terms (lexical only)."""
+    def __init__(self, dimensions=256):
+        self.dimensions = dimensions
+
+    def embed_query(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for term in tokenize(text):
+            vector[int(hashlib.md5(term.encode("utf-8")).hexdigest(), 16) % self.dimensions] += 1.0
+        return (vector / (np.linalg.norm(vector) or 1.0)).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def load_embeddings(kind):
+    if kind in ("auto", "minilm"):
+        try:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2"), "all-MiniLM-L6-v2"
+        except ImportError as e:
+            if kind == "minilm":
+                raise
+            print(f"sentence-transformers unavailable ({e}); using hashing embeddings")
+    return HashingEmbeddings(), "hashing-256"
+
+
+def vector_only(retriever, k):
+    """Top-k cosine over the same corpus embeddings: what as_retriever(k=3) returns."""
+    def search(question):
+        query = np.asarray(retriever.embeddings.embed_query(question), dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        return [doc for doc, _ in retriever.vectors.search(query, k)]
+    return search
+
+
+def hybrid(retriever, threshold):
+    def search(question):
+        return [doc for doc, relevance in retriever.score(question) if relevance >= threshold][:retriever.k]
+    return search
+
+
+def evaluate(search, questions, doc_ids):
+    returned = relevant_returned = hits = answerable = rejected = unanswerable = fallbacks = calls = 0
+    started = time.perf_counter()
+    for item in questions:
+        relevant = set(item["relevant"])
+        context = [doc_ids[doc] for doc in search(item["question"])]
+        useful = relevant.intersection(context)
+        if relevant:
+            answerable += 1
+            hits += bool(useful)
+            if context:
+                returned += len(context)
+                relevant_returned += len(useful)
+        else:
+            unanswerable += 1
+            rejected += not context
+        if context and not useful:
+            fallbacks += 1
+        calls += 1 if not context else (2 if useful else 3)
+    elapsed = time.perf_counter() - started
+    n = len(questions)
+    return {"precision": relevant_returned / returned if returned else 0.0, "hit_rate": hits / answerable,
+            "rejected": rejected / unanswerable if unanswerable else 0.0, "fallback_rate": fallbacks / n,
+            "legacy_calls": calls / n, "ms_per_query": elapsed / n * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval", default=EVAL_PATH)
+    parser.add_argument("--embeddings", choices=["auto", "minilm", "hashing"], default="auto")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.2, 0.3, 0.4])
+    args = parser.parse_args()
+
+    with open(args.eval, encoding="utf-8") as f:
+        data = json.load(f)
+    embeddings, embedding_name = load_embeddings(args.embeddings)
+    doc_ids = [doc["id"] for doc in data["documents"]]
+    retriever = build_hybrid_retriever_from_texts([doc["text"] for doc in data["documents"]], embeddings, k=args.k)
+    questions = data["questions"]
+    print(f"{len(doc_ids)} chunks, {sum(1 for q in questions if q['relevant'])} answerable + "
+          f"{sum(1 for q in questions if not q['relevant'])} unanswerable questions, k={args.k}, embeddings {embedding_name}")
+
+    modes = [("vector top-k", vector_only(retriever, args.k))]
+    modes += [(f"hybrid t={threshold:.2f}", hybrid(retriever, threshold)) for threshold in args.thresholds]
+    print(f"{'mode':<16} {'precision':>9} {'hit rate':>9} {'rejected':>9} {'fallback':>9} {'legacy calls':>13} {'ms/query':>9}")
+    for name, search in modes:
+        r = evaluate(search, questions, doc_ids)
+        print(f"{name:<16} {r['precision']:9.2f} {r['hit_rate']:9.2f} {r['rejected']:9.2f} {r['fallback_rate']:9.2f} "
+              f"{r['legacy_calls']:13.2f} {r['ms_per_query']:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
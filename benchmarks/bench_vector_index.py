@@ -0,0 +1,134 @@
+# /my_career_portal/benchmarks/bench_vector_index.py
+"""
+Compares the NumPy vector index (brute force and IVF) with Chroma on synthetic clustered
+384-d embeddings (MiniLM's size): recall@3 against exact search, query latency, startup time
+(import + open) and RSS growth. Each backend is measured in a fresh process. Chroma is skipped
+when chromadb is not installed.
+
+    python benchmarks/bench_vector_index.py --sizes 10000 100000 --queries 200
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIM = 384
+K = 3
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def synthetic_embeddings(count, queries, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(16, count // 200), DIM)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + rng.normal(scale=0.6, size=(count, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vectors = vectors[rng.integers(0, count, queries)] + rng.normal(scale=0.3, size=(queries, DIM)).astype(np.float32)
+    return vectors, query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors, query_vectors):
+    truth = []
+    for query in query_vectors:
+        scores = vectors @ query
+        truth.append(set(np.argpartition(-scores, K)[:K].tolist()))
+    return truth
+
+
+def _measure_child(backend, path, query_vectors, nprobe, results):
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    if backend == "chroma":
+        import chromadb
+        collection = chromadb.PersistentClient(path=path).get_collection("langchain")
+        search = lambda q: [int(i) for i in collection.query(query_embeddings=[q.tolist()], n_results=K)["ids"][0]]  # noqa: E731
+    else:
+        from vector_index_logic import NumpyVectorIndex
+        index = NumpyVectorIndex(path, nprobe=nprobe)
+        search = lambda q: [row for row, _ in index.search(q, K)]  # noqa: E731
+    startup = time.perf_counter() - started
+    latencies, found = [], []
+    for query in query_vectors:
+        query_started = time.perf_counter()
+        found.append(search(query))
+        latencies.append(time.perf_counter() - query_started)
+    results.put({"startup": startup, "latencies": latencies, "found": found, "rss_growth": _rss_mb() - rss_before})
+
+
+def measure(backend, path, query_vectors, nprobe=None):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_measure_child, args=(backend, path, query_vectors, nprobe, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def build_chroma(path, vectors):
+    import chromadb
+    collection = chromadb.PersistentClient(path=path).create_collection("langchain", metadata={"hnsw:space": "cosine"})
+    for start in range(0, len(vectors), 5000):
+        batch = vectors[start:start + 5000]
+        collection.add(ids=[str(i) for i in range(start, start + len(batch))], embeddings=batch.tolist(),
+                       documents=[f"chunk {i}" for i in range(start, start + len(batch))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy vector index vs Chroma benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    from vector_index_logic import build_vector_index
+    try:
+        import chromadb  # noqa: F401
+        have_chroma = True
+    except ImportError:
+        have_chroma = False
+        print("chromadb not installed: Chroma rows skipped.")
+
+    workdir = tempfile.mkdtemp(prefix="bench_vector_index_")
+    try:
+        for size in args.sizes:
+            vectors, query_vectors = synthetic_embeddings(size, args.queries)
+            truth = exact_top_k(vectors, query_vectors)
+            texts = [f"chunk {i}" for i in range(size)]
+            brute_path, ivf_path = os.path.join(workdir, f"brute_{size}"), os.path.join(workdir, f"ivf_{size}")
+            build_vector_index(brute_path, vectors, texts, ivf_lists=0)
+            build_started = time.perf_counter()
+            build_vector_index(ivf_path, vectors, texts, ivf_lists="auto")
+            print(f"\n{size} chunks (IVF build {time.perf_counter() - build_started:.1f}s)")
+
+            runs = [("numpy brute", "numpy", brute_path, None)]
+            runs += [(f"numpy ivf nprobe={n}", "numpy", ivf_path, n) for n in args.nprobe]
+            if have_chroma:
+                chroma_path = os.path.join(workdir, f"chroma_{size}")
+                build_chroma(chroma_path, vectors)
+                runs.append(("chroma (hnsw)", "chroma", chroma_path, None))
+
+            for label, backend, path, nprobe in runs:
+                result = measure(backend, path, query_vectors, nprobe)
+                recall = statistics.mean(len(truth[i] & set(found)) / K for i, found in enumerate(result["found"]))
+                latencies = sorted(result["latencies"])
+                print(f"  {label:22s} recall@3 {recall:.3f}  p50 {latencies[len(latencies) // 2] * 1000:7.3f}ms  "
+                      f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.3f}ms  "
+                      f"startup {result['startup'] * 1000:8.1f}ms  RSS +{result['rss_growth']:.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
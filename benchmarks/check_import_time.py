@@ -0,0 +1,70 @@
+# /my_career_portal/benchmarks/check_import_time.py
+"""
+Import-time budget for app.py: imports it in fresh interpreters under `python -X importtime`,
+prints the slowest modules, and exits non-zero if the best run exceeds the budget or if any
+heavy dependency (LLM SDKs, langchain, embeddings, vector stores, reportlab) got imported at
+module load instead of on first use of its feature. Suitable as a CI step.
+
+    python benchmarks/check_import_time.py --budget-ms 750 --runs 5
+    python benchmarks/check_import_time.py --module asgi_app
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    "google.generativeai", "langchain", "langchain_core", "langchain_community", "langchain_google_genai",
+    "sentence_transformers", "torch", "transformers", "chromadb", "reportlab", "numpy",
+]
+
+
+def import_profile(module):
+    """(cumulative microseconds per top-level import, heavy modules that were loaded) for one fresh import."""
+    code = f"import sys, json; import {module}; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    env = dict(os.environ, CHATBOT_PRELOAD="0") # Preloading loads the embedding model on purpose
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1: # The module itself and what it imports directly
+            timings[name.strip()] = timings.get(name.strip(), 0) + int(cumulative)
+    return timings, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "750")))
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters; the fastest run is compared to the budget")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_profile(args.module) for _ in range(args.runs)]
+    timings, heavy = min(runs, key=lambda run: run[0].get(args.module, 0))
+    total_ms = timings.get(args.module, 0) / 1000
+    print(f"import {args.module}: best {total_ms:.1f}ms of {args.runs} runs (budget {args.budget_ms:.0f}ms)")
+    for name, micros in sorted(timings.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {micros / 1000:8.1f}ms  {name}")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy modules imported at load time: {', '.join(heavy)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.1f}ms is over the {args.budget_ms:.0f}ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
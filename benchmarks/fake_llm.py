@@ -0,0 +1,121 @@
+# /my_career_portal/benchmarks/fake_llm.py
+"""
+Offline stand-ins for the model side of the app: a langchain LLM for the chatbot chains, a
+google.generativeai-style model for resume summaries, hashing embeddings and a retriever.
+Latency, jitter, slow tail and error rate come from the same StubConfig as the HTTP stubs.
+install_fake_models() wires them into the chatbot and resume modules in place of Gemini,
+sentence-transformers and the vector store.
+"""
+import asyncio
+import hashlib
+import math
+import time
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.language_models.llms import LLM
+from langchain_core.retrievers import BaseRetriever
+
+from stub_upstreams import StubConfig
+
+OFF_TOPIC_MARKER = "[off-topic]"  # Questions containing this make the fake model use the fallback phrase
+
+
+class FakeModelError(RuntimeError):
+    pass
+
+
+class FakeChatLLM(LLM):
+    """Sleeps like a remote chat model; fails at config.error_ratio."""
+    config: Any = None
+    fallback_phrase: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        time.sleep(self.config.delay())
+        if self.config.should_fail():
+            raise FakeModelError("fake model failure")
+        answer = "Focus on building a portfolio, networking with practitioners and tailoring each application. " * 3
+        if OFF_TOPIC_MARKER in prompt and "Retrieved Context" in prompt:
+            answer = f"{self.fallback_phrase}\n{answer}"
+        return answer
+
+
+class FakeGeminiModel:
+    """generate_content / generate_content_async with the response shape resume_builder_logic reads."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+
+    def _response(self, prompt):
+        if self.config.should_fail():
+            raise FakeModelError("fake model failure")
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        text = f"Results-driven professional ({digest}) with a record of shipping reliable software and mentoring teams."
+        return SimpleNamespace(parts=[text], text=text, prompt_feedback=None, candidates=[])
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.config.delay())
+        return self._response(prompt)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(self.config.delay())
+        return self._response(prompt)
+
+
+class FakeEmbeddings:
+    """Deterministic bag-of-words hashing vectors: identical questions embed identically, distinct ones do not."""
+
+    def __init__(self, dimensions=64, latency=0.002):
+        self.dimensions, self.latency = dimensions, latency
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        vector = [0.0] * self.dimensions
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+class FakeRetriever(BaseRetriever):
+    latency: float = 0.01
+    documents: int = 3
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        time.sleep(self.latency)
+        return [Document(page_content=f"Career guidance passage {i}: practical advice on interviews, resumes and skills. " * 8)
+                for i in range(self.documents)]
+
+
+def install_fake_models(config: StubConfig, retrieval_latency=0.01, llm=None):
+    """Points the chatbot chains (at `llm`, default a FakeChatLLM) and the resume summary model at the fakes."""
+    from langchain.chains import LLMChain, RetrievalQA
+    import career_ai_chatbot_logic as chatbot
+    import rate_limit_logic
+    import resume_builder_logic as resume
+
+    llm = llm or FakeChatLLM(config=config, fallback_phrase=chatbot.FALLBACK_PHRASE)
+    retriever = FakeRetriever(latency=retrieval_latency)
+    chatbot.embedding_model_chatbot = FakeEmbeddings()
+    chatbot.llm_chatbot = llm
+    chatbot.retriever_chatbot = retriever
+    chatbot.qa_chain_retriever_chatbot = RetrievalQA.from_chain_type(
+        llm=llm, chain_type="stuff", retriever=retriever, return_source_documents=True)
+    chatbot.llm_chain_general_chatbot = LLMChain(llm=llm, prompt=chatbot.GENERAL_PROMPT_CHATBOT)
+    chatbot.llm_chain_refine_chatbot = LLMChain(llm=llm, prompt=chatbot.REFINE_PROMPT_CHATBOT)
+    chatbot.llm_chain_single_pass_chatbot = LLMChain(llm=llm, prompt=chatbot.SINGLE_PASS_PROMPT_CHATBOT)
+    chatbot.is_chatbot_initialized_flag = True
+
+    resume.GOOGLE_API_KEY_RESUME_AI = resume.GOOGLE_API_KEY_RESUME_AI or "stub-key"
+    resume._summary_model = FakeGeminiModel(config)
+    resume._summary_generation_config = None
+    rate_limit_logic.RATE_LIMITS_ENABLED = False # Fakes have no quota to protect
@@ -0,0 +1,124 @@
+# /my_career_portal/benchmarks/stub_upstreams.py
+"""
+Local stand-ins for the Google Places, Wikipedia and Unsplash APIs used by the
+education fetcher, so benchmarks run offline with controllable latency.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubConfig:
+    def __init__(self, latency=0.05, jitter=0.02, slow_ratio=0.0, slow_latency=2.0, error_ratio=0.0, places_count=8, seed=42):
+        self.latency = latency            # base seconds per request
+        self.jitter = jitter              # +/- uniform jitter in seconds
+        self.slow_ratio = slow_ratio      # fraction of requests that hit the slow tail
+        self.slow_latency = slow_latency  # latency for slow-tail requests
+        self.error_ratio = error_ratio    # fraction of requests answered with HTTP 503
+        self.places_count = places_count
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        with self.lock:
+            if self.random.random() < self.slow_ratio:
+                return self.slow_latency
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.error_ratio
+
+
+class _StubServer(ThreadingHTTPServer):
+    request_queue_size = 1024  # The default backlog of 5 drops connections under load tests
+    daemon_threads = True
+
+
+def _make_handler(config, counters):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # Headers and body are separate writes; avoid the delayed-ACK stall
+
+        def log_message(self, format, *args):  # Keep benchmark output clean
+            pass
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            params = parse_qs(parsed.query)
+            route = parsed.path.split("/")[1] if parsed.path.count("/") else ""
+            with config.lock:
+                counters[route] = counters.get(route, 0) + 1
+            time.sleep(config.delay())
+            if config.should_fail():
+                return self._send_json({"error": "stub failure"}, status=503)
+
+            if route == "places":
+                query = params.get("query", [""])[0]
+                results = [{
+                    "name": f"Stub University {i} ({query[:20]})",
+                    "formatted_address": f"{i} Campus Road",
+                    "rating": 4.0 + (i % 10) / 10,
+                } for i in range(config.places_count)]
+                return self._send_json({"results": results, "status": "OK"})
+            if route == "wiki-search":
+                term = params.get("srsearch", ["Unknown"])[0]
+                return self._send_json({"query": {"search": [{"title": term or "Unknown"}]}})
+            if route == "wiki-summary":
+                title = parsed.path.split("/", 2)[-1]
+                return self._send_json({"extract": f"{title} is a stub institution used for benchmarking. " * 3})
+            if route == "unsplash":
+                return self._send_json({"urls": {"regular": "http://stub.invalid/image.jpg"}})
+            return self._send_json({"error": "unknown route"}, status=404)
+
+    return StubHandler
+
+
+class StubUpstreams:
+    """Context manager running the stub server on a random local port."""
+
+    def __init__(self, config=None):
+        self.config = config or StubConfig()
+        self.counters = {}
+        self.server = _StubServer(("127.0.0.1", 0), _make_handler(self.config, self.counters))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def urls(self):
+        return {
+            "GOOGLE_PLACES_TEXTSEARCH_URL": f"{self.base_url}/places",
+            "WIKIPEDIA_SEARCH_URL": f"{self.base_url}/wiki-search",
+            "WIKIPEDIA_SUMMARY_URL": f"{self.base_url}/wiki-summary",
+            "UNSPLASH_RANDOM_PHOTO_URL": f"{self.base_url}/unsplash",
+        }
+
+    def point_fetcher_at_stub(self, fetcher_module):
+        for attr, url in self.urls().items():
+            setattr(fetcher_module, attr, url)
+        fetcher_module.GOOGLE_API_KEY_PLACES = fetcher_module.GOOGLE_API_KEY_PLACES or "stub-key"
+        fetcher_module.UNSPLASH_ACCESS_KEY_EDU = fetcher_module.UNSPLASH_ACCESS_KEY_EDU or "stub-key"
+        import rate_limit_logic
+        rate_limit_logic.RATE_LIMITS_ENABLED = False # The stub has no quota to protect
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
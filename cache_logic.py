@@ -0,0 +1,418 @@
+# /my_career_portal/cache_logic.py
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics_logic import register_collector
+
+_MISSING = object()
+_registered_caches = {} # name -> TTLLRUCache, so stats can be scraped from one place
+_registered_single_flights = {} # name -> SingleFlight
+
+class SQLiteConnections:
+    """
+    Per-thread connections to one SQLite file in WAL mode, for the stores shared by every worker on the
+    host (this cache store, rate_limit_logic's buckets, institution_index_logic's catalog). A new
+    connection is opened per thread, and again after a fork, since the PID check catches forked workers.
+    """
+    def __init__(self, path: str, timeout: float = 5, row_factory=None):
+        self.path = path
+        self.timeout = timeout
+        self.row_factory = row_factory
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+class SQLiteCacheStore:
+    """
+    Small key/value store on a SQLite file so cached entries survive restarts and are
+    shared by every gunicorn worker on the host. Values are stored as JSON.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = SQLiteConnections(path)
+        with self._db.connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def get(self, namespace: str, key: str):
+        """Returns (value, expires_at) or None when absent/expired."""
+        row = self._db.connection().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, namespace: str, key: str, value, expires_at: float):
+        self._db.connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), expires_at),
+        )
+
+    def update(self, namespace: str, key: str, update, expires_at: float):
+        """
+        Atomic read-modify-write of one entry: update(current value or None) returns the new value,
+        or None to leave the entry as it is. BEGIN IMMEDIATE serializes concurrent workers.
+        Returns what update returned.
+        """
+        conn = self._db.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            value = update(json.loads(row[0]) if row is not None and row[1] > time.time() else None)
+            if value is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value), expires_at),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def delete(self, namespace: str, key: str = None):
+        if key is None:
+            self._db.connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+        else:
+            self._db.connection().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def items(self, namespace: str) -> list:
+        """All unexpired (key, value, expires_at) rows of a namespace."""
+        rows = self._db.connection().execute(
+            "SELECT key, value, expires_at FROM cache_entries WHERE namespace = ? AND expires_at > ?", (namespace, time.time())
+        ).fetchall()
+        return [(key, json.loads(value), expires_at) for key, value, expires_at in rows]
+
+    def purge_expired(self) -> int:
+        cursor = self._db.connection().execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+class TTLLRUCache:
+    """
+    Thread-safe in-memory cache with a maximum entry count (LRU eviction) and per-entry TTLs.
+    If a SQLiteCacheStore is given, it acts as a second tier: misses in memory are looked up
+    there and promoted, and every write goes to both tiers.
+    """
+    def __init__(self, name: str, max_entries: int = 1024, default_ttl: float = 3600, store: SQLiteCacheStore = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.store = store
+        self._entries = OrderedDict() # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.evictions = 0
+        _registered_caches[name] = self
+
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+
+        if self.store is not None:
+            try:
+                stored = self.store.get(self.name, key)
+            except sqlite3.Error as e:
+                print(f"WARNING (Cache '{self.name}'): persistent store read failed: {e}")
+                stored = None
+            if stored is not None:
+                with self._lock:
+                    self._insert(key, stored[0], stored[1])
+                    self.hits += 1
+                    self.store_hits += 1
+                return stored[0]
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key: str, value, ttl: float = None):
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._insert(key, value, expires_at)
+        if self.store is not None:
+            try:
+                self.store.set(self.name, key, value, expires_at)
+            except sqlite3.Error as e:
+                print(f"WARNING (Cache '{self.name}'): persistent store write failed: {e}")
+
+    def _insert(self, key, value, expires_at):
+        # Caller holds self._lock
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.store is not None:
+            self.store.delete(self.name, key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.delete(self.name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name, "size": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses, "store_hits": self.store_hits,
+                "evictions": self.evictions, "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the function and
+    every caller that arrives while it is in flight waits for and shares its result
+    (or its exception).
+    """
+    class _Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        _registered_single_flights[name] = self
+
+    def do(self, key, fn, *args, **kwargs):
+        call, is_leader = self.join(key)
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        result, error = None, None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.finish(key, call, result, error)
+
+    def join(self, key):
+        """
+        (call, is_leader) for work that cannot be wrapped in one function call, such as a
+        generator. A leader must call finish() (in a finally block); others wait on call.event
+        and then read call.result / call.error.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = SingleFlight._Call()
+            self.executions += 1
+            return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        call.result, call.error = result, error
+        with self._lock:
+            self._calls.pop(key, None)
+        call.event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"name": self.name, "in_flight": len(self._calls), "executions": self.executions, "coalesced": self.coalesced}
+
+def _unit_vector(vector) -> list:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+class SemanticCache:
+    """
+    Answer cache keyed on embedding similarity rather than exact text: a lookup returns the
+    stored answer of the most similar cached question if its cosine similarity reaches
+    `threshold`. Bounded with LRU eviction and TTLs; persisted to a SQLiteCacheStore if given.
+    `ensure_fingerprint` drops everything when the underlying knowledge base changes.
+    """
+    _FINGERPRINT_KEY = "__fingerprint__"
+
+    def __init__(self, name: str, threshold: float = 0.92, max_entries: int = 512, ttl: float = 86400, store: SQLiteCacheStore = None):
+        self.name = name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._entries = OrderedDict() # key -> {"vector", "question", "answer", "expires_at"}
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        _registered_caches[name] = self
+        if store is not None:
+            self._load_from_store()
+
+    def _load_from_store(self):
+        try:
+            rows = sorted(self.store.items(self.name), key=lambda row: row[2])
+        except sqlite3.Error as e:
+            print(f"WARNING (Cache '{self.name}'): could not load persisted entries: {e}")
+            return
+        with self._lock:
+            for key, value, expires_at in rows:
+                if key == self._FINGERPRINT_KEY:
+                    self._fingerprint = value
+                else:
+                    self._entries[key] = {**value, "expires_at": expires_at}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def ensure_fingerprint(self, fingerprint: str):
+        """Clears the cache if the knowledge-base fingerprint changed since entries were stored."""
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return
+            had_entries = bool(self._entries)
+            self._entries.clear()
+            self._fingerprint = fingerprint
+            if had_entries:
+                self.invalidations += 1
+        if self.store is not None:
+            try:
+                self.store.delete(self.name)
+                self.store.set(self.name, self._FINGERPRINT_KEY, fingerprint, time.time() + 10 * 365 * 86400)
+            except sqlite3.Error as e:
+                print(f"WARNING (Cache '{self.name}'): persistent store write failed: {e}")
+
+    def lookup(self, vector):
+        """Returns (answer, similarity) for the closest cached question above threshold, else None."""
+        query = _unit_vector(vector)
+        now = time.time()
+        best_key, best_score = None, -1.0
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry["expires_at"] <= now:
+                    del self._entries[key]
+                    continue
+                score = sum(a * b for a, b in zip(query, entry["vector"]))
+                if score > best_score:
+                    best_key, best_score = key, score
+            if best_key is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best_key)
+                self.hits += 1
+                return self._entries[best_key]["answer"], best_score
+            self.misses += 1
+            return None
+
+    def add(self, question: str, vector, answer: str):
+        key = hashlib.sha1(" ".join(question.lower().split()).encode("utf-8")).hexdigest()
+        entry = {"vector": _unit_vector(vector), "question": question, "answer": answer}
+        expires_at = time.time() + self.ttl
+        evicted = []
+        with self._lock:
+            self._entries[key] = {**entry, "expires_at": expires_at}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+                self.evictions += 1
+        if self.store is not None:
+            try:
+                self.store.set(self.name, key, entry, expires_at)
+                for evicted_key in evicted: # Keep the persisted copy bounded too
+                    self.store.delete(self.name, evicted_key)
+            except sqlite3.Error as e:
+                print(f"WARNING (Cache '{self.name}'): persistent store write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.delete(self.name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name, "size": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "invalidations": self.invalidations, "threshold": self.threshold,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+_shared_stores = {}
+_shared_stores_lock = threading.Lock()
+
+def get_sqlite_cache_store(path: str):
+    """Returns one SQLiteCacheStore per file path (or None when path is empty)."""
+    if not path:
+        return None
+    with _shared_stores_lock:
+        if path not in _shared_stores:
+            try:
+                _shared_stores[path] = SQLiteCacheStore(path)
+            except (sqlite3.Error, OSError) as e:
+                print(f"WARNING (Cache): could not open persistent cache at '{path}', using memory only: {e}")
+                _shared_stores[path] = None
+        return _shared_stores[path]
+
+def get_all_cache_stats() -> list:
+    return [cache.stats() for cache in list(_registered_caches.values())]
+
+def get_all_single_flight_stats() -> list:
+    return [flight.stats() for flight in list(_registered_single_flights.values())]
+
+def _collect_cache_metrics():
+    caches, flights = get_all_cache_stats(), get_all_single_flight_stats()
+    return [
+        ("cache_hits_total", "counter", "Cache lookups answered from the cache.", [({"cache": c["name"]}, c["hits"]) for c in caches]),
+        ("cache_misses_total", "counter", "Cache lookups that missed.", [({"cache": c["name"]}, c["misses"]) for c in caches]),
+        ("cache_evictions_total", "counter", "Entries evicted to stay within max_entries.", [({"cache": c["name"]}, c["evictions"]) for c in caches]),
+        ("cache_entries", "gauge", "Entries currently held in memory.", [({"cache": c["name"]}, c["size"]) for c in caches]),
+        ("single_flight_executions_total", "counter", "Calls that ran the underlying function.", [({"name": f["name"]}, f["executions"]) for f in flights]),
+        ("single_flight_coalesced_total", "counter", "Calls that shared an in-flight result.", [({"name": f["name"]}, f["coalesced"]) for f in flights]),
+    ]
+
+register_collector(_collect_cache_metrics)
@@ -1,20 +1,20 @@
 # /my_career_portal/career_ai_chatbot_logic.py
 import os
+import asyncio
 import logging
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.chains import RetrievalQA, LLMChain
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-from dotenv import load_dotenv
-
-# This will be loaded initially by app.py (which should call load_dotenv() before importing this),
-# or here if this module is somehow run standalone or imported before app.py's load_dotenv().
-# It's generally best practice for the main application entry point (app.py) to handle .env loading once.
-_initial_key_load_attempted = False
-if not os.getenv("GOOGLE_API_KEY"): # Avoid multiple load_dotenv calls if key is already in env
-    load_dotenv()
-    _initial_key_load_attempted = True
+import threading
+import time
+import functools
+from cache_logic import SemanticCache, get_sqlite_cache_store
+from env_logic import load_env
+from metrics_logic import counter, record_stage, span
+from rate_limit_logic import aacquire_upstream, acquire_upstream
+
+# langchain, langchain_google_genai and sentence-transformers are imported inside the functions
+# that build the chatbot, so importing this module (and app.py) stays cheap until first use.
+
+# No-op when app.py (or another module) already loaded .env
+load_env()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") # This is the module-level global
 
@@ -28,7 +28,45 @@ llm_chatbot = None
 qa_chain_retriever_chatbot = None
 llm_chain_general_chatbot = None
 llm_chain_refine_chatbot = None
+retriever_chatbot = None
+llm_chain_single_pass_chatbot = None
 is_chatbot_initialized_flag = False
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# Warm-up bookkeeping reported by get_chatbot_readiness()
+chatbot_init_stats = {"embedding_load_seconds": None, "init_seconds": None, "rss_mb_after_init": None, "initialized_pid": None}
+
+# --- Pipeline mode ---
+# "single": vector search + ONE generation call that handles insufficient context itself.
+# "legacy": RetrievalQA (LLM call whose answer is discarded) + refine call + optional general call.
+PIPELINE_MODE = os.getenv("CHATBOT_PIPELINE_MODE", "single").lower()
+
+# --- Semantic answer cache ---
+# Near-duplicate questions (cosine similarity >= threshold on the MiniLM embedding) reuse a stored answer.
+SEMANTIC_CACHE_ENABLED = os.getenv("CHATBOT_SEMANTIC_CACHE", "1") == "1"
+SEMANTIC_CACHE_FINGERPRINT_CHECK_SECONDS = float(os.getenv("CHATBOT_SEMANTIC_CACHE_FINGERPRINT_CHECK_SECONDS", "60"))
+semantic_answer_cache = SemanticCache(
+    "chatbot_semantic_answers",
+    threshold=float(os.getenv("CHATBOT_SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    max_entries=int(os.getenv("CHATBOT_SEMANTIC_CACHE_MAX_ENTRIES", "512")),
+    ttl=float(os.getenv("CHATBOT_SEMANTIC_CACHE_TTL", str(24 * 3600))),
+    store=get_sqlite_cache_store(os.getenv("CHATBOT_SEMANTIC_CACHE_PATH", "")),
+)
+_last_fingerprint_check = 0.0
+_retriever_fingerprint = None # Vector store fingerprint the hybrid retriever's keyword index was built from
+_retriever_rebuild_lock = threading.Lock()
+CHROMA_DB_PATH = os.path.join(os.getcwd(), "chroma_db")
+
+# --- Vector store backend ---
+# "chroma": the persisted Chroma DB above. "numpy": a memory-mapped embedding matrix built with
+# `python vector_index_logic.py export-chroma` (no chromadb import, far smaller footprint).
+VECTOR_BACKEND = os.getenv("CHATBOT_VECTOR_BACKEND", "chroma").lower()
+VECTOR_INDEX_PATH = os.getenv("CHATBOT_VECTOR_INDEX_PATH", os.path.join(os.getcwd(), "vector_index"))
+# "vector": plain top-k similarity search over the store.
+# "hybrid": BM25 + vector search, fused and reranked with a relevance threshold (hybrid_retrieval_logic).
+# Validate CHATBOT_RERANK_THRESHOLD on the production embeddings (benchmarks/bench_retrieval_quality.py)
+# before switching: a threshold that is too high drops the context of answerable questions.
+RETRIEVER_MODE = os.getenv("CHATBOT_RETRIEVER", "vector").lower()
+RETRIEVER_K = int(os.getenv("CHATBOT_RETRIEVER_K", "3"))
 
 # --- Prompts ---
 GENERAL_PROMPT_TEMPLATE_STR = """
@@ -39,7 +77,6 @@ and you don't have access to that, politely state that you can only provide gene
 
 Question: {question}
 Helpful Answer:"""
-GENERAL_PROMPT_CHATBOT = PromptTemplate(input_variables=["question"], template=GENERAL_PROMPT_TEMPLATE_STR)
 
 REFINE_WITH_CONTEXT_PROMPT_TEMPLATE_STR = """
 You are a highly intelligent AI assistant. You have been provided with context retrieved from documents and an original question.
@@ -53,14 +90,82 @@ Retrieved Context:
 Original Question: {question}
 
 Answer:"""
-REFINE_PROMPT_CHATBOT = PromptTemplate(input_variables=["context", "question"], template=REFINE_WITH_CONTEXT_PROMPT_TEMPLATE_STR)
+
+SINGLE_PASS_PROMPT_TEMPLATE_STR = """
+You are a highly intelligent AI assistant. You have been provided with context retrieved from documents and a question.
+If the context is relevant and sufficient, write a comprehensive, well-phrased, and accurate answer based ONLY on the context.
+If the context does NOT contain the answer, or is insufficient, begin your reply with exactly "Let me answer you through llm's." on its own line,
+then answer the question helpfully and concisely from your general knowledge.
+
+Retrieved Context:
+{context}
+
+Question: {question}
+
+Answer:"""
+
+@functools.lru_cache(maxsize=None)
+def _prompt_templates():
+    from langchain.prompts import PromptTemplate
+    return {
+        "GENERAL_PROMPT_CHATBOT": PromptTemplate(input_variables=["question"], template=GENERAL_PROMPT_TEMPLATE_STR),
+        "REFINE_PROMPT_CHATBOT": PromptTemplate(input_variables=["context", "question"], template=REFINE_WITH_CONTEXT_PROMPT_TEMPLATE_STR),
+        "SINGLE_PASS_PROMPT_CHATBOT": PromptTemplate(input_variables=["context", "question"], template=SINGLE_PASS_PROMPT_TEMPLATE_STR),
+    }
+
+def __getattr__(name):
+    # GENERAL_PROMPT_CHATBOT etc. stay module attributes, built on first access
+    if name in ("GENERAL_PROMPT_CHATBOT", "REFINE_PROMPT_CHATBOT", "SINGLE_PASS_PROMPT_CHATBOT"):
+        return _prompt_templates()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Constant for the fallback phrase
 FALLBACK_PHRASE = "Let me answer you through llm's."
+# Reply when the site-wide Gemini budget (rate_limit_logic) is spent: semantic cache hits are still served.
+# Starts with "Sorry," so it is neither cached nor recorded as a session turn.
+BUDGET_EXHAUSTED_REPLY = "Sorry, the assistant is answering too many questions right now. Please try again later."
+FALLBACK_TRIGGERS = counter("chatbot_fallback_phrase", "Answers where the model fell back to general knowledge.", ("pipeline",))
+
+def _current_rss_mb():
+    """Resident set size of this process in MB (current on Linux, peak elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def preload_embedding_model():
+    """
+    Loads the sentence-transformer weights without touching Chroma or the LLM client.
+    Safe to call in a gunicorn master with preload_app=True: forked workers then share the
+    weights copy-on-write instead of each loading their own copy. Chroma's SQLite handles and
+    the Gemini gRPC client are NOT fork-safe, so those are created per worker by
+    initialize_chatbot_components_globally().
+    """
+    global embedding_model_chatbot
+    if embedding_model_chatbot is None:
+        started = time.perf_counter()
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        embedding_model_chatbot = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+        chatbot_init_stats["embedding_load_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"Embedding model '{EMBEDDING_MODEL_NAME}' loaded in {chatbot_init_stats['embedding_load_seconds']}s (RSS {_current_rss_mb()} MB).")
+    return embedding_model_chatbot
+
+def get_chatbot_readiness():
+    return {
+        "ready": is_chatbot_initialized_flag,
+        "embedding_model_loaded": embedding_model_chatbot is not None,
+        "vector_db_loaded": vector_db_chatbot is not None,
+        "vector_backend": VECTOR_BACKEND,
+        "pid": os.getpid(),
+        **chatbot_init_stats,
+    }
 
 def initialize_chatbot_components_globally():
     global embedding_model_chatbot, vector_db_chatbot, llm_chatbot, qa_chain_retriever_chatbot, \
            llm_chain_general_chatbot, llm_chain_refine_chatbot, is_chatbot_initialized_flag, \
+           retriever_chatbot, llm_chain_single_pass_chatbot, _retriever_fingerprint, \
            GOOGLE_API_KEY # Declare GOOGLE_API_KEY as global HERE, at the beginning of the function
 
     if is_chatbot_initialized_flag:
@@ -72,8 +177,7 @@ def initialize_chatbot_components_globally():
         # This block attempts to load/reload if the key wasn't available when the module was first imported.
         # This is a fallback, ideally app.py ensures it's loaded before this function is called.
         logger.warning("GOOGLE_API_KEY not set at module level during initialization. Attempting to load from .env...")
-        if not _initial_key_load_attempted: # Only call load_dotenv again if not done at module load
-            load_dotenv()
+        load_env()
         
         reloaded_key = os.getenv("GOOGLE_API_KEY")
         if reloaded_key:
@@ -90,16 +194,12 @@ def initialize_chatbot_components_globally():
 
     try:
         logger.info("Initializing chatbot components...")
-        embedding_model_chatbot = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        init_started = time.perf_counter()
+        from langchain.chains import RetrievalQA, LLMChain
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        preload_embedding_model() # No-op when the weights were preloaded before fork
         
-        db_path = os.path.join(os.getcwd(), "chroma_db") 
-        logger.info(f"Attempting to load Chroma DB from: {db_path}")
-        if os.path.exists(db_path) and os.path.isdir(db_path):
-            vector_db_chatbot = Chroma(persist_directory=db_path, embedding_function=embedding_model_chatbot)
-            logger.info("Chroma DB loaded successfully.")
-        else:
-            logger.warning(f"Chroma DB not found at {db_path} or is not a directory. RAG features will be limited.")
-            vector_db_chatbot = None
+        vector_db_chatbot = _load_vector_store()
 
         llm_chatbot = ChatGoogleGenerativeAI(
             model="gemini-1.5-flash",
@@ -108,30 +208,128 @@ def initialize_chatbot_components_globally():
             google_api_key=GOOGLE_API_KEY # Use the (potentially updated) global GOOGLE_API_KEY
         )
 
-        llm_chain_general_chatbot = LLMChain(llm=llm_chatbot, prompt=GENERAL_PROMPT_CHATBOT)
-        llm_chain_refine_chatbot = LLMChain(llm=llm_chatbot, prompt=REFINE_PROMPT_CHATBOT)
+        prompts = _prompt_templates()
+        llm_chain_general_chatbot = LLMChain(llm=llm_chatbot, prompt=prompts["GENERAL_PROMPT_CHATBOT"])
+        llm_chain_refine_chatbot = LLMChain(llm=llm_chatbot, prompt=prompts["REFINE_PROMPT_CHATBOT"])
+        llm_chain_single_pass_chatbot = LLMChain(llm=llm_chatbot, prompt=prompts["SINGLE_PASS_PROMPT_CHATBOT"])
 
         if vector_db_chatbot:
+            retriever_chatbot = _build_retriever(vector_db_chatbot)
+            _retriever_fingerprint = _vector_store_fingerprint()
             qa_chain_retriever_chatbot = RetrievalQA.from_chain_type(
                 llm=llm_chatbot,
                 chain_type="stuff",
-                retriever=vector_db_chatbot.as_retriever(search_kwargs={"k": 3}),
+                retriever=retriever_chatbot,
                 return_source_documents=True,
             )
-            logger.info("QA chain with retriever initialized.")
+            logger.info(f"QA chain with retriever initialized (pipeline mode: {PIPELINE_MODE}).")
         else:
+            retriever_chatbot = None
             qa_chain_retriever_chatbot = None
             logger.warning("QA chain with retriever NOT initialized (no vector_db).")
         
         is_chatbot_initialized_flag = True
-        logger.info("Chatbot components initialized successfully.")
+        chatbot_init_stats.update({
+            "init_seconds": round(time.perf_counter() - init_started, 3),
+            "rss_mb_after_init": _current_rss_mb(), "initialized_pid": os.getpid(),
+        })
+        logger.info(f"Chatbot components initialized successfully in {chatbot_init_stats['init_seconds']}s (RSS {chatbot_init_stats['rss_mb_after_init']} MB).")
         return True
     except Exception as e:
         logger.error(f"ERROR during chatbot initialization: {e}", exc_info=True)
         is_chatbot_initialized_flag = False
         return False
 
-def get_chatbot_answer_from_question(question: str):
+def _build_retriever(vector_db):
+    if RETRIEVER_MODE == "hybrid":
+        try:
+            from hybrid_retrieval_logic import build_hybrid_retriever
+            return build_hybrid_retriever(vector_db, embedding_model_chatbot, k=RETRIEVER_K)
+        except Exception as e:
+            logger.error(f"Hybrid retriever could not be built, using vector-only retrieval: {e}", exc_info=True)
+    return vector_db.as_retriever(search_kwargs={"k": RETRIEVER_K})
+
+def _load_vector_store():
+    """The configured vector store (anything with .as_retriever(search_kwargs=...)), or None."""
+    if VECTOR_BACKEND == "numpy":
+        from vector_index_logic import NumpyVectorIndex
+        logger.info(f"Attempting to load NumPy vector index from: {VECTOR_INDEX_PATH}")
+        if not os.path.exists(os.path.join(VECTOR_INDEX_PATH, "meta.json")):
+            logger.warning(f"NumPy vector index not found at {VECTOR_INDEX_PATH}. RAG features will be limited.")
+            return None
+        index = NumpyVectorIndex(VECTOR_INDEX_PATH, embedding_function=embedding_model_chatbot)
+        if index.meta.get("embedding_model") not in (None, EMBEDDING_MODEL_NAME):
+            logger.warning(f"Vector index was built with '{index.meta['embedding_model']}', queries use '{EMBEDDING_MODEL_NAME}'.")
+        logger.info(f"NumPy vector index loaded successfully ({len(index)} chunks, ivf_lists={index.meta.get('ivf_lists')}).")
+        return index
+
+    from langchain_community.vectorstores import Chroma # Imported only when this backend is used
+    db_path = CHROMA_DB_PATH
+    logger.info(f"Attempting to load Chroma DB from: {db_path}")
+    if os.path.exists(db_path) and os.path.isdir(db_path):
+        vector_db = Chroma(persist_directory=db_path, embedding_function=embedding_model_chatbot)
+        logger.info("Chroma DB loaded successfully.")
+        return vector_db
+    logger.warning(f"Chroma DB not found at {db_path} or is not a directory. RAG features will be limited.")
+    return None
+
+def _vector_store_fingerprint() -> str:
+    """Changes whenever the knowledge base is re-ingested (document count or DB file mtime / index build time)."""
+    if vector_db_chatbot is None:
+        return "no-vector-db"
+    if hasattr(vector_db_chatbot, "fingerprint"):
+        return vector_db_chatbot.fingerprint()
+    try:
+        count = vector_db_chatbot._collection.count()
+    except Exception:
+        count = "?"
+    sqlite_file = os.path.join(CHROMA_DB_PATH, "chroma.sqlite3")
+    mtime = os.path.getmtime(sqlite_file) if os.path.exists(sqlite_file) else 0
+    return f"{count}:{mtime}"
+
+def _check_vector_store_fingerprint():
+    """
+    At most every SEMANTIC_CACHE_FINGERPRINT_CHECK_SECONDS: after a re-ingestion, drops the semantic
+    cache and rebuilds the hybrid retriever's BM25 index and corpus matrix (in the background; the
+    old retriever keeps answering until the new one is ready).
+    """
+    global _last_fingerprint_check
+    now = time.monotonic()
+    if now - _last_fingerprint_check < SEMANTIC_CACHE_FINGERPRINT_CHECK_SECONDS:
+        return
+    _last_fingerprint_check = now
+    fingerprint = _vector_store_fingerprint()
+    if SEMANTIC_CACHE_ENABLED:
+        semantic_answer_cache.ensure_fingerprint(fingerprint)
+    if RETRIEVER_MODE == "hybrid" and _retriever_fingerprint is not None and fingerprint != _retriever_fingerprint:
+        threading.Thread(target=_rebuild_retriever, args=(fingerprint,), name="chatbot-retriever-rebuild", daemon=True).start()
+
+def _rebuild_retriever(fingerprint: str):
+    global retriever_chatbot, _retriever_fingerprint
+    if not _retriever_rebuild_lock.acquire(blocking=False): # A rebuild is already running
+        return
+    try:
+        logger.info("Chatbot: knowledge base changed; rebuilding the hybrid retriever.")
+        retriever = _build_retriever(vector_db_chatbot)
+        retriever_chatbot = retriever
+        if qa_chain_retriever_chatbot is not None:
+            qa_chain_retriever_chatbot.retriever = retriever
+        _retriever_fingerprint = fingerprint
+    finally:
+        _retriever_rebuild_lock.release()
+
+def _question_with_history(question: str, history: str = None) -> str:
+    """The question as the prompts see it; session history (chat_session_logic) follows it as reference."""
+    if not history:
+        return question
+    return f"{question}\n\nConversation so far (use it to interpret the question):\n{history}"
+
+def get_chatbot_answer_from_question(question: str, history: str = None, retrieval_query: str = None):
+    """
+    history: earlier turns of a chat session, already within its token budget.
+    retrieval_query: standalone rewrite of a follow-up question, used for the vector search.
+    Answers that depend on history skip the semantic cache.
+    """
     if not is_chatbot_initialized_flag:
         if not initialize_chatbot_components_globally():
             return "Chatbot is not initialized. Please check server logs. API key or DB might be missing."
@@ -140,23 +338,104 @@ def get_chatbot_answer_from_question(question: str):
     if not question:
         return "Question cannot be empty."
 
+    _check_vector_store_fingerprint()
+    question_vector = None
+    if SEMANTIC_CACHE_ENABLED and not history:
+        try:
+            with span("embed_question"):
+                question_vector = embedding_model_chatbot.embed_query(question)
+            cached = semantic_answer_cache.lookup(question_vector)
+            if cached is not None:
+                logger.info(f"Chatbot: Semantic cache hit (similarity {cached[1]:.3f}) for: {question}")
+                return cached[0]
+        except Exception as e:
+            logger.warning(f"Chatbot: Semantic cache lookup failed, answering normally: {e}")
+            question_vector = None
+
+    if not acquire_upstream("gemini"): # Pays for the first model call; the pipelines pay for any further ones
+        logger.warning("Chatbot: Gemini budget exhausted; serving cached answers only.")
+        return BUDGET_EXHAUSTED_REPLY
+    answer = _generate_chatbot_answer(_question_with_history(question, history), retrieval_query)
+    if question_vector is not None and answer and not answer.startswith("Sorry,"): # Never cache error replies
+        semantic_answer_cache.add(question, question_vector, answer)
+    return answer
+
+def _generate_chatbot_answer(question: str, retrieval_query: str = None):
+    if PIPELINE_MODE == "legacy":
+        return _generate_answer_legacy(question, retrieval_query)
+    return _generate_answer_single_pass(question, retrieval_query)
+
+def _generate_answer_single_pass(question: str, retrieval_query: str = None):
+    """Retrieval only (no LLM), then a single generation call (a second one only if that call fails)."""
+    llm_calls = 0
+    if retriever_chatbot is not None:
+        try:
+            logger.info(f"Chatbot: Single-pass RAG for question: {question}")
+            with span("retrieval"):
+                docs = retriever_chatbot.invoke(retrieval_query or question)
+            if docs:
+                context = "\n\n".join([doc.page_content for doc in docs])
+                llm_calls += 1
+                with span("llm_single_pass"):
+                    answer = llm_chain_single_pass_chatbot.invoke({"context": context, "question": question}).get("text", "")
+                if FALLBACK_PHRASE.lower() in answer.lower():
+                    FALLBACK_TRIGGERS.inc(pipeline="single")
+                    logger.info("Chatbot: Context not sufficient; answered from general knowledge in the same call.")
+                else:
+                    logger.info(f"Chatbot: Single-pass RAG answer (first 100 chars): {answer[:100]}...")
+                return answer
+            logger.info("Chatbot: No relevant documents found by retriever. Falling back to general LLM.")
+        except Exception as e:
+            logger.error(f"Chatbot: Error during single-pass RAG: {e}. Falling back to general LLM.", exc_info=True)
+    if llm_calls and not _acquire_further_gemini_call():
+        return BUDGET_EXHAUSTED_REPLY
+    return _generate_general_answer(question)
+
+def _acquire_further_gemini_call() -> bool:
+    """Budget for a model call beyond the first one (which the answer functions pay for up front)."""
+    if acquire_upstream("gemini"):
+        return True
+    logger.warning("Chatbot: Gemini budget exhausted mid-answer; skipping the next model call.")
+    return False
+
+def _generate_answer_legacy(question: str, retrieval_query: str = None):
+    """
+    RetrievalQA, refine and (when the context falls short) a general-knowledge supplement: up to
+    three model calls, each charged to the gemini budget. When the budget runs out mid-answer, the
+    answer so far is returned.
+    """
     use_rag = qa_chain_retriever_chatbot is not None
+    llm_calls = 0
 
     if use_rag:
         try:
             logger.info(f"Chatbot: Attempting RAG for question: {question}")
-            rag_result = qa_chain_retriever_chatbot.invoke({"query": question})
-            docs = rag_result.get("source_documents", [])
-
+            # Retrieve once up front: when nothing is relevant (the hybrid retriever's threshold), the
+            # RetrievalQA and refine calls are skipped and only the general answer is paid for.
+            with span("retrieval"):
+                docs = retriever_chatbot.invoke(retrieval_query or question)
             if docs:
+                llm_calls += 1
+                with span("llm_retrieval_qa"): # The RetrievalQA "stuff" call on the documents already retrieved
+                    qa_answer = qa_chain_retriever_chatbot.combine_documents_chain.invoke(
+                        {"input_documents": docs, "question": retrieval_query or question}).get("output_text", "")
+                if not _acquire_further_gemini_call():
+                    return qa_answer or BUDGET_EXHAUSTED_REPLY
                 context = "\n\n".join([doc.page_content for doc in docs])
                 refine_input = {"context": context, "question": question}
-                refined = llm_chain_refine_chatbot.invoke(refine_input)
+                llm_calls += 1
+                with span("llm_refine"):
+                    refined = llm_chain_refine_chatbot.invoke(refine_input)
                 answer = refined.get("text", "")
 
                 if FALLBACK_PHRASE.lower() in answer.lower():
+                    FALLBACK_TRIGGERS.inc(pipeline="legacy")
                     logger.info("Chatbot: Context not sufficient (per refine_prompt), supplementing with general knowledge.")
-                    general = llm_chain_general_chatbot.invoke({"question": question})
+                    if not _acquire_further_gemini_call():
+                        return answer
+                    llm_calls += 1
+                    with span("llm_general"):
+                        general = llm_chain_general_chatbot.invoke({"question": question})
                     
                     fallback_start_index = answer.lower().find(FALLBACK_PHRASE.lower())
                     part_before = answer[:fallback_start_index]
@@ -170,13 +449,180 @@ def get_chatbot_answer_from_question(question: str):
                 logger.info("Chatbot: No relevant documents found by RAG retriever. Falling back to general LLM.")
         except Exception as e:
             logger.error(f"Chatbot: Error during RAG processing: {e}. Falling back to general LLM.", exc_info=True)
+    if llm_calls and not _acquire_further_gemini_call():
+        return BUDGET_EXHAUSTED_REPLY
+    return _generate_general_answer(question)
 
+def _generate_general_answer(question: str):
     logger.info(f"Chatbot: Using general knowledge for: {question}")
     try:
-        general = llm_chain_general_chatbot.invoke({"question": question})
+        with span("llm_general"):
+            general = llm_chain_general_chatbot.invoke({"question": question})
         general_text = general.get("text", "Sorry, I could not generate a response at this moment.")
         logger.info(f"Chatbot: General knowledge answer (first 100 chars): {general_text[:100]}...")
         return general_text
     except Exception as e:
         logger.error(f"Chatbot: Error during general LLM call: {e}", exc_info=True)
-        return "Sorry, an error occurred while I was trying to formulate a response."
\ No newline at end of file
+        return "Sorry, an error occurred while I was trying to formulate a response."
+
+# --- Async variants (ASGI serving mode, see asgi_app.py) ---
+# LLM calls are awaited with ainvoke, so a slow Gemini response holds no thread. Embedding and
+# vector search are CPU work and run in the default thread pool.
+async def aget_chatbot_answer_from_question(question: str, history: str = None, retrieval_query: str = None):
+    if not is_chatbot_initialized_flag:
+        if not await asyncio.to_thread(initialize_chatbot_components_globally):
+            return "Chatbot is not initialized. Please check server logs. API key or DB might be missing."
+
+    question = question.strip()
+    if not question:
+        return "Question cannot be empty."
+
+    _check_vector_store_fingerprint()
+    question_vector = None
+    if SEMANTIC_CACHE_ENABLED and not history:
+        try:
+            with span("embed_question"):
+                question_vector = await asyncio.to_thread(embedding_model_chatbot.embed_query, question)
+            cached = semantic_answer_cache.lookup(question_vector)
+            if cached is not None:
+                logger.info(f"Chatbot: Semantic cache hit (similarity {cached[1]:.3f}) for: {question}")
+                return cached[0]
+        except Exception as e:
+            logger.warning(f"Chatbot: Semantic cache lookup failed, answering normally: {e}")
+            question_vector = None
+
+    if not await aacquire_upstream("gemini"):
+        logger.warning("Chatbot: Gemini budget exhausted; serving cached answers only.")
+        return BUDGET_EXHAUSTED_REPLY
+    prompt_question = _question_with_history(question, history)
+    if PIPELINE_MODE == "legacy": # Kept on a worker thread; the single-pass pipeline is the async one
+        answer = await asyncio.to_thread(_generate_answer_legacy, prompt_question, retrieval_query)
+    else:
+        answer = await _agenerate_answer_single_pass(prompt_question, retrieval_query)
+    if question_vector is not None and answer and not answer.startswith("Sorry,"): # Never cache error replies
+        semantic_answer_cache.add(question, question_vector, answer)
+    return answer
+
+async def _agenerate_answer_single_pass(question: str, retrieval_query: str = None):
+    llm_calls = 0
+    if retriever_chatbot is not None:
+        try:
+            logger.info(f"Chatbot: Single-pass RAG (async) for question: {question}")
+            with span("retrieval"):
+                docs = await retriever_chatbot.ainvoke(retrieval_query or question)
+            if docs:
+                context = "\n\n".join([doc.page_content for doc in docs])
+                llm_calls += 1
+                with span("llm_single_pass"):
+                    answer = (await llm_chain_single_pass_chatbot.ainvoke({"context": context, "question": question})).get("text", "")
+                if FALLBACK_PHRASE.lower() in answer.lower():
+                    FALLBACK_TRIGGERS.inc(pipeline="single")
+                    logger.info("Chatbot: Context not sufficient; answered from general knowledge in the same call.")
+                else:
+                    logger.info(f"Chatbot: Single-pass RAG answer (first 100 chars): {answer[:100]}...")
+                return answer
+            logger.info("Chatbot: No relevant documents found by retriever. Falling back to general LLM.")
+        except Exception as e:
+            logger.error(f"Chatbot: Error during single-pass RAG: {e}. Falling back to general LLM.", exc_info=True)
+    if llm_calls and not await asyncio.to_thread(_acquire_further_gemini_call):
+        return BUDGET_EXHAUSTED_REPLY
+    return await _agenerate_general_answer(question)
+
+async def _agenerate_general_answer(question: str):
+    logger.info(f"Chatbot: Using general knowledge (async) for: {question}")
+    try:
+        with span("llm_general"):
+            general = await llm_chain_general_chatbot.ainvoke({"question": question})
+        general_text = general.get("text", "Sorry, I could not generate a response at this moment.")
+        logger.info(f"Chatbot: General knowledge answer (first 100 chars): {general_text[:100]}...")
+        return general_text
+    except Exception as e:
+        logger.error(f"Chatbot: Error during general LLM call: {e}", exc_info=True)
+        return "Sorry, an error occurred while I was trying to formulate a response."
+
+def stream_chatbot_answer_events(question: str, history: str = None, retrieval_query: str = None):
+    """
+    Token-streaming variant of get_chatbot_answer_from_question (always single-pass, same
+    history/retrieval_query arguments). Yields dicts:
+      {"type": "retrieval", "documents": n}   once the vector search is done
+      {"type": "token", "text": "..."}        as the model generates
+      {"type": "fallback"}                    when the model switches to general knowledge
+      {"type": "done", "answer": "...", "cached": bool}
+    Errors are reported as {"type": "error", "error": "..."} followed by "done".
+    """
+    if not is_chatbot_initialized_flag:
+        if not initialize_chatbot_components_globally():
+            yield {"type": "error", "error": "Chatbot is not initialized. Please check server logs. API key or DB might be missing."}
+            yield {"type": "done", "answer": "", "cached": False}
+            return
+
+    question = question.strip()
+    if not question:
+        yield {"type": "error", "error": "Question cannot be empty."}
+        yield {"type": "done", "answer": "", "cached": False}
+        return
+
+    _check_vector_store_fingerprint()
+    question_vector = None
+    if SEMANTIC_CACHE_ENABLED and not history:
+        try:
+            with span("embed_question"):
+                question_vector = embedding_model_chatbot.embed_query(question)
+            cached = semantic_answer_cache.lookup(question_vector)
+            if cached is not None:
+                logger.info(f"Chatbot (stream): Semantic cache hit (similarity {cached[1]:.3f}) for: {question}")
+                yield {"type": "token", "text": cached[0]}
+                yield {"type": "done", "answer": cached[0], "cached": True}
+                return
+        except Exception as e:
+            logger.warning(f"Chatbot (stream): Semantic cache lookup failed, answering normally: {e}")
+            question_vector = None
+
+    if not acquire_upstream("gemini"):
+        logger.warning("Chatbot (stream): Gemini budget exhausted; serving cached answers only.")
+        yield {"type": "error", "error": BUDGET_EXHAUSTED_REPLY}
+        yield {"type": "done", "answer": "", "cached": False}
+        return
+
+    prompt_text = None
+    prompt_question = _question_with_history(question, history)
+    if retriever_chatbot is not None:
+        try:
+            with span("retrieval"):
+                docs = retriever_chatbot.invoke(retrieval_query or question)
+            yield {"type": "retrieval", "documents": len(docs)}
+            if docs:
+                context = "\n\n".join([doc.page_content for doc in docs])
+                prompt_text = _prompt_templates()["SINGLE_PASS_PROMPT_CHATBOT"].format(context=context, question=prompt_question)
+        except Exception as e:
+            logger.error(f"Chatbot (stream): Error during retrieval: {e}. Falling back to general LLM.", exc_info=True)
+            yield {"type": "retrieval", "documents": 0}
+    if prompt_text is None:
+        logger.info(f"Chatbot (stream): Using general knowledge for: {question}")
+        prompt_text = _prompt_templates()["GENERAL_PROMPT_CHATBOT"].format(question=prompt_question)
+
+    parts, fallback_reported, errored = [], False, False
+    stream_started = time.perf_counter()
+    try:
+        for chunk in llm_chatbot.stream(prompt_text):
+            text = getattr(chunk, "content", chunk)
+            if not text:
+                continue
+            parts.append(text)
+            yield {"type": "token", "text": text}
+            if not fallback_reported and FALLBACK_PHRASE.lower() in "".join(parts).lower():
+                fallback_reported = True
+                FALLBACK_TRIGGERS.inc(pipeline="stream")
+                logger.info("Chatbot (stream): Context not sufficient; model is answering from general knowledge.")
+                yield {"type": "fallback"}
+    except Exception as e:
+        logger.error(f"Chatbot (stream): Error during LLM streaming: {e}", exc_info=True)
+        errored = True
+        yield {"type": "error", "error": "Sorry, an error occurred while I was trying to formulate a response."}
+    # Not a span: the generator pauses at every yield, so this is time-to-last-token including client writes
+    record_stage("llm_stream", time.perf_counter() - stream_started)
+
+    answer = "".join(parts)
+    if question_vector is not None and answer and not errored: # Never cache a truncated answer
+        semantic_answer_cache.add(question, question_vector, answer)
+    yield {"type": "done", "answer": answer, "cached": False}
@@ -0,0 +1,355 @@
+# /my_career_portal/chat_session_logic.py
+"""
+Server-side chat sessions for /api/chat and /api/chat/stream.
+
+A session keeps a running summary plus the most recent turns. The history sent with each
+question stays within CHAT_HISTORY_TOKEN_BUDGET: once it would not, the oldest turns are folded
+into the summary (one model call per compaction, not per turn, made on a background thread
+after the answer has been sent), so prompt size stays flat no matter how long the conversation runs. Follow-up questions ("what about in Germany?") are
+rewritten into standalone retrieval queries so the vector search sees the topic, not the pronoun.
+
+Sessions live in a SQLite file (CHAT_SESSION_SQLITE_PATH) shared by every worker on the host, so
+consecutive turns may land on different workers; each turn is one read-modify-write transaction.
+With CHAT_SESSION_SQLITE_PATH empty they live in a per-process TTL/LRU cache of at most
+CHAT_SESSION_MAX_SESSIONS entries instead (only correct with a single worker).
+"""
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+import career_ai_chatbot_logic as chatbot
+from cache_logic import TTLLRUCache, get_sqlite_cache_store
+from metrics_logic import counter, histogram, span
+from rate_limit_logic import acquire_upstream
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+CHAT_SESSION_MAX_SESSIONS = int(os.getenv("CHAT_SESSION_MAX_SESSIONS", "1000"))
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", str(2 * 3600))) # Idle seconds before a session is forgotten
+# Shared by all workers on the host; empty = this process only
+CHAT_SESSION_SQLITE_PATH = os.getenv("CHAT_SESSION_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "career_portal_chat_sessions.sqlite3"))
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "800")) # Summary + recent turns sent per question
+CHAT_SUMMARY_MODE = os.getenv("CHAT_SUMMARY_MODE", "llm").lower() # "llm" or "extractive" (no model call)
+CHAT_QUERY_REWRITE_MODE = os.getenv("CHAT_QUERY_REWRITE_MODE", "heuristic").lower() # "heuristic", "llm" or "off"
+# Stored messages and the summary are each clipped to a quarter of the budget, so the summary plus one full turn always fits
+_PART_MAX_TOKENS = max(16, CHAT_HISTORY_TOKEN_BUDGET // 4)
+
+_SESSION_NAMESPACE = "chat_sessions"
+_session_store = get_sqlite_cache_store(CHAT_SESSION_SQLITE_PATH)
+# Fallback when there is no shared store (CHAT_SESSION_SQLITE_PATH empty or unusable)
+chat_sessions = TTLLRUCache("chat_sessions", max_entries=CHAT_SESSION_MAX_SESSIONS, default_ttl=CHAT_SESSION_TTL)
+_session_locks = [threading.Lock() for _ in range(64)] # Striped per session id: in-memory turns of one session are applied in order
+_compacting = set() # Session ids with a compaction in flight in this process
+_compacting_lock = threading.Lock()
+
+SESSION_TURNS = counter("chat_session_turns", "Chat turns recorded in a session.")
+SESSION_COMPACTIONS = counter("chat_session_compactions", "Times older turns were folded into a session summary.", ("mode",))
+QUERY_REWRITES = counter("chat_query_rewrites", "Follow-up questions rewritten into standalone retrieval queries.", ("mode",))
+HISTORY_TOKENS = histogram("chat_history_tokens", "Estimated tokens of session history sent with a question.",
+                           buckets=(0, 50, 100, 200, 400, 800, 1600, 3200))
+
+_SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+SUMMARY_PROMPT_TEMPLATE_STR = """
+Update the running summary of a career-advice conversation.
+Keep what later questions may depend on: the user's background, goals and constraints, and the advice already given.
+Write plain prose, at most {max_words} words.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+
+Updated summary:"""
+
+REWRITE_PROMPT_TEMPLATE_STR = """
+Rewrite the follow-up question as a standalone search query that makes sense without the conversation.
+Reply with the query only.
+
+Conversation:
+{history}
+
+Follow-up question: {question}
+Standalone query:"""
+
+# --- Tokens ---
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 tokens per 3 words); good enough for budgeting, no tokenizer needed."""
+    return (len(text.split()) * 4 + 2) // 3
+
+def _clip_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    words = text.split()
+    max_words = max(1, max_tokens * 3 // 4)
+    if len(words) <= max_words:
+        return text
+    return "... " + " ".join(words[-max_words:]) if keep_tail else " ".join(words[:max_words]) + " ..."
+
+# --- Session ids ---
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+def is_valid_session_id(session_id) -> bool:
+    return isinstance(session_id, str) and bool(_SESSION_ID_PATTERN.match(session_id))
+
+def session_id_from_request(data: dict):
+    """
+    Sessions are opt-in per request: no "session_id" key means a stateless question (None),
+    null or "" starts a new session, anything else must be a well-formed id (ValueError if not).
+    """
+    if "session_id" not in data:
+        return None
+    session_id = data["session_id"]
+    if not session_id:
+        return new_session_id()
+    if not is_valid_session_id(session_id):
+        raise ValueError("session_id must be 8-64 characters of letters, digits, '-' or '_'.")
+    return session_id
+
+def _lock_for(session_id: str) -> threading.Lock:
+    return _session_locks[hash(session_id) % len(_session_locks)]
+
+def _copy(session) -> dict:
+    """A private copy of a stored session (a fresh one if unknown, expired or evicted)."""
+    if session is None:
+        return {"summary": "", "turns": [], "summarized_turns": 0}
+    return {"summary": session["summary"], "turns": [list(turn) for turn in session["turns"]],
+            "summarized_turns": session["summarized_turns"]}
+
+def _load(session_id: str) -> dict:
+    if _session_store is None:
+        return _copy(chat_sessions.get(session_id))
+    try:
+        stored = _session_store.get(_SESSION_NAMESPACE, session_id)
+    except sqlite3.Error as e:
+        logger.warning(f"Chat sessions: could not read session {session_id}, answering without history: {e}")
+        stored = None
+    return _copy(stored[0] if stored else None)
+
+def _update(session_id: str, apply):
+    """
+    Read-modify-write of one session, atomic across workers: apply(session) changes the copy it is
+    given and returns False to leave the stored session unchanged. Returns the stored session, or None.
+    """
+    if _session_store is None:
+        with _lock_for(session_id):
+            session = _load(session_id)
+            if not apply(session):
+                return None
+            chat_sessions.set(session_id, session)
+            return session
+    def update(stored):
+        session = _copy(stored)
+        return session if apply(session) else None
+    try:
+        return _session_store.update(_SESSION_NAMESPACE, session_id, update, time.time() + CHAT_SESSION_TTL)
+    except sqlite3.Error as e:
+        logger.warning(f"Chat sessions: could not update session {session_id}: {e}")
+        return None
+
+def clear_session(session_id: str):
+    if _session_store is None:
+        chat_sessions.delete(session_id)
+        return
+    try:
+        _session_store.delete(_SESSION_NAMESPACE, session_id)
+    except sqlite3.Error as e:
+        logger.warning(f"Chat sessions: could not clear session {session_id}: {e}")
+
+# --- History and compaction ---
+def format_history(session: dict) -> str:
+    lines = [f"Summary of earlier conversation: {session['summary']}"] if session["summary"] else []
+    for user_message, answer in session["turns"]:
+        lines.append(f"User: {user_message}")
+        lines.append(f"Assistant: {answer}")
+    return "\n".join(lines)
+
+def _first_sentence(text: str) -> str:
+    match = re.match(r"(.+?[.!?])(\s|$)", text.strip(), re.S)
+    return (match.group(1) if match else text).strip()
+
+def _extractive_summary(summary: str, turns: list) -> str:
+    """No-model summary: each folded turn keeps the question and the answer's first sentence; the oldest text drops off first."""
+    parts = [summary] if summary else []
+    parts += [f"User asked: {user_message} Assistant: {_first_sentence(answer)}" for user_message, answer in turns]
+    return _clip_tokens(" ".join(parts), _PART_MAX_TOKENS, keep_tail=True)
+
+def _summarize(summary: str, turns: list) -> str:
+    if CHAT_SUMMARY_MODE == "llm" and chatbot.llm_chatbot is not None and acquire_upstream("gemini"):
+        transcript = "\n".join(f"User: {user_message}\nAssistant: {answer}" for user_message, answer in turns)
+        prompt = SUMMARY_PROMPT_TEMPLATE_STR.format(max_words=_PART_MAX_TOKENS * 3 // 4, summary=summary or "(none)", turns=transcript)
+        try:
+            with span("llm_session_summary"):
+                result = chatbot.llm_chatbot.invoke(prompt)
+            text = str(getattr(result, "content", result)).strip()
+            if text:
+                SESSION_COMPACTIONS.inc(mode="llm")
+                return _clip_tokens(text, _PART_MAX_TOKENS)
+        except Exception as e:
+            logger.warning(f"Chat sessions: summary call failed, using an extractive summary: {e}")
+    SESSION_COMPACTIONS.inc(mode="extractive")
+    return _extractive_summary(summary, turns)
+
+def _turns_to_fold(session: dict) -> int:
+    """
+    Once the history is over budget, the number of oldest turns to fold into the summary so the
+    rest fits in half the budget (the latest turn always stays verbatim); 0 while it fits.
+    Halving means compaction runs every few turns rather than on every one.
+    """
+    if estimate_tokens(format_history(session)) <= CHAT_HISTORY_TOKEN_BUDGET:
+        return 0
+    turns = session["turns"]
+    fold = 1
+    while fold < len(turns) - 1 and estimate_tokens(format_history({**session, "turns": turns[fold:]})) > CHAT_HISTORY_TOKEN_BUDGET // 2:
+        fold += 1
+    return fold if fold < len(turns) else 0
+
+def _compact(session_id: str) -> bool:
+    """
+    Folds the oldest turns of a session into its summary. The summary call runs outside the
+    session's transaction; the result is applied only if those turns and the summary are still the
+    ones it was made from (the session was not cleared, expired or compacted by another worker meanwhile).
+    """
+    session = _load(session_id)
+    fold = _turns_to_fold(session)
+    if not fold:
+        return False
+    summary, folded = session["summary"], session["turns"][:fold]
+    new_summary = _summarize(summary, folded)
+
+    def apply(session):
+        if session["summary"] != summary or session["turns"][:fold] != folded:
+            return False
+        session["summary"] = new_summary
+        session["turns"] = session["turns"][fold:]
+        session["summarized_turns"] += fold
+        return True
+    return _update(session_id, apply) is not None
+
+def _compact_in_background(session_id: str):
+    with _compacting_lock:
+        if session_id in _compacting:
+            return
+        _compacting.add(session_id)
+    def run():
+        try:
+            _compact(session_id)
+        except Exception as e:
+            logger.warning(f"Chat sessions: compaction failed, will retry after the next turn: {e}")
+        finally:
+            with _compacting_lock:
+                _compacting.discard(session_id)
+    threading.Thread(target=run, name="chat-session-compaction", daemon=True).start()
+
+# --- Follow-up rewriting ---
+_REFERRING_WORDS = {"it", "its", "that", "this", "those", "these", "they", "them", "their", "there", "one", "ones", "same", "else"}
+_FOLLOW_UP_PREFIXES = ("and ", "also ", "what about", "how about", "what if", "then ", "so ", "but ", "why")
+_STOPWORDS = {
+    "the", "and", "for", "are", "but", "not", "you", "your", "with", "what", "how", "why", "when", "where", "which", "who",
+    "can", "could", "should", "would", "will", "does", "did", "have", "has", "had", "was", "were", "about", "into", "from",
+    "more", "some", "any", "also", "then", "than", "just", "like", "want", "need", "get", "make", "good", "best", "way",
+}
+
+def _is_follow_up(question: str) -> bool:
+    lowered = question.lower().strip()
+    words = re.findall(r"[a-z']+", lowered)
+    return len(words) <= 4 or lowered.startswith(_FOLLOW_UP_PREFIXES) or any(word in _REFERRING_WORDS for word in words)
+
+def _topic_terms(text: str) -> list:
+    terms = []
+    for word in re.findall(r"[A-Za-z][A-Za-z+#.-]*[A-Za-z+#]|[A-Za-z]", text):
+        lowered = word.lower()
+        if len(lowered) > 2 and lowered not in _STOPWORDS and lowered not in _REFERRING_WORDS and lowered not in terms:
+            terms.append(lowered)
+    return terms
+
+def _heuristic_rewrite(question: str, session: dict) -> str:
+    """The question plus topic words of the previous user messages (newest first) it does not already contain."""
+    present = set(_topic_terms(question))
+    extra = []
+    for user_message, _ in reversed(session["turns"][-2:]):
+        extra += [term for term in _topic_terms(user_message) if term not in present and term not in extra]
+    if not extra and session["summary"]:
+        extra = [term for term in _topic_terms(session["summary"]) if term not in present][:8]
+    return f"{question} {' '.join(extra[:8])}".strip()
+
+def rewrite_follow_up(question: str, session: dict) -> str:
+    """Standalone retrieval query for `question`; the question itself when it does not look like a follow-up."""
+    if CHAT_QUERY_REWRITE_MODE == "off" or not session["turns"] or not _is_follow_up(question):
+        return question
+    if CHAT_QUERY_REWRITE_MODE == "llm" and chatbot.llm_chatbot is not None and acquire_upstream("gemini"):
+        try:
+            with span("llm_query_rewrite"):
+                result = chatbot.llm_chatbot.invoke(REWRITE_PROMPT_TEMPLATE_STR.format(history=format_history(session), question=question))
+            rewritten = str(getattr(result, "content", result)).strip().strip('"')
+            if rewritten:
+                QUERY_REWRITES.inc(mode="llm")
+                return _clip_tokens(rewritten, 64)
+        except Exception as e:
+            logger.warning(f"Chat sessions: query rewrite call failed, using the heuristic rewrite: {e}")
+    QUERY_REWRITES.inc(mode="heuristic")
+    return _heuristic_rewrite(question, session)
+
+# --- Turns ---
+def prepare_turn(session_id: str, question: str):
+    """(history text, retrieval query) for the next question of a session."""
+    session = _load(session_id)
+    fold = _turns_to_fold(session)
+    if fold: # Compaction still in flight: stay within budget with a no-model summary for this question only
+        session = {**session, "summary": _extractive_summary(session["summary"], session["turns"][:fold]), "turns": session["turns"][fold:]}
+    history = format_history(session)
+    HISTORY_TOKENS.observe(estimate_tokens(history))
+    return history, rewrite_follow_up(question.strip(), session)
+
+def _is_recordable(answer: str) -> bool:
+    return bool(answer) and not answer.startswith(("Sorry,", "Chatbot is not initialized", "Question cannot be empty"))
+
+def record_turn(session_id: str, question: str, answer: str):
+    """Appends a finished turn (error replies are not remembered); compaction, if needed, runs in the background."""
+    if not _is_recordable(answer):
+        return
+    turn = [_clip_tokens(question.strip(), _PART_MAX_TOKENS), _clip_tokens(answer.strip(), _PART_MAX_TOKENS)]
+    session = _update(session_id, lambda session: session["turns"].append(turn) or True)
+    if session is None:
+        return
+    SESSION_TURNS.inc()
+    if _turns_to_fold(session) > 0:
+        _compact_in_background(session_id)
+
+def get_session_answer(session_id: str, question: str) -> str:
+    history, retrieval_query = prepare_turn(session_id, question)
+    answer = chatbot.get_chatbot_answer_from_question(question, history=history, retrieval_query=retrieval_query)
+    record_turn(session_id, question, answer)
+    return answer
+
+async def aget_session_answer(session_id: str, question: str) -> str:
+    # Session bookkeeping may call the model (llm rewrites) or SQLite synchronously, so it runs on a thread
+    history, retrieval_query = await asyncio.to_thread(prepare_turn, session_id, question)
+    answer = await chatbot.aget_chatbot_answer_from_question(question, history=history, retrieval_query=retrieval_query)
+    await asyncio.to_thread(record_turn, session_id, question, answer)
+    return answer
+
+def stream_session_answer_events(session_id: str, question: str):
+    """stream_chatbot_answer_events within a session; the "done" event carries the session_id."""
+    history, retrieval_query = prepare_turn(session_id, question)
+    failed = False
+    for event in chatbot.stream_chatbot_answer_events(question, history=history, retrieval_query=retrieval_query):
+        if event["type"] == "error":
+            failed = True
+        elif event["type"] == "done":
+            if not failed:
+                record_turn(session_id, question, event["answer"])
+            event = {**event, "session_id": session_id}
+        yield event
+
+def get_session_info(session_id: str) -> dict:
+    session = _load(session_id)
+    return {"session_id": session_id, "turns": len(session["turns"]), "summarized_turns": session["summarized_turns"],
+            "history_tokens": estimate_tokens(format_history(session))}
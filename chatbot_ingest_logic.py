@@ -0,0 +1,206 @@
+# /my_career_portal/chatbot_ingest_logic.py
+"""
+Builds and incrementally refreshes the chatbot's Chroma knowledge base from a directory of
+career documents (.md, .txt, and .pdf when pypdf is installed).
+
+Chunk ids are content hashes, so a re-run only embeds chunks whose text changed, deletes
+chunks that disappeared, and skips files whose bytes are unchanged without re-chunking them.
+Only chunks this ingester wrote (they carry "file_hash" metadata) are ever updated or deleted;
+chunks loaded into the same collection some other way are left alone.
+
+    python chatbot_ingest_logic.py knowledge_base/ --db chroma_db
+    python chatbot_ingest_logic.py knowledge_base/ --dry-run
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+logger = logging.getLogger(__name__)
+
+# --- Ingestion settings ---
+SUPPORTED_EXTENSIONS = (".md", ".markdown", ".txt", ".pdf")
+INGEST_CHUNK_SIZE = int(os.getenv("CHATBOT_INGEST_CHUNK_SIZE", "1000"))
+INGEST_CHUNK_OVERLAP = int(os.getenv("CHATBOT_INGEST_CHUNK_OVERLAP", "150"))
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("CHATBOT_INGEST_EMBED_BATCH_SIZE", "256")) # Texts per embed_documents call
+INGEST_WRITE_BATCH_SIZE = int(os.getenv("CHATBOT_INGEST_WRITE_BATCH_SIZE", "1000")) # Ids per Chroma upsert/delete
+CHROMA_COLLECTION_NAME = os.getenv("CHATBOT_CHROMA_COLLECTION", "langchain") # langchain's Chroma default
+
+def _sha256(data) -> str:
+    return hashlib.sha256(data if isinstance(data, bytes) else data.encode("utf-8")).hexdigest()
+
+def chunk_id(source: str, text: str) -> str:
+    """Content-addressed id: the same text in the same file always maps to the same id."""
+    return _sha256(f"{source}\0{text}")[:40]
+
+def scan_documents(source_dir: str) -> dict:
+    """Relative path -> absolute path of every supported document under source_dir."""
+    documents = {}
+    for root, _dirs, files in os.walk(source_dir):
+        for filename in files:
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS) and not filename.startswith("."):
+                path = os.path.join(root, filename)
+                documents[os.path.relpath(path, source_dir).replace(os.sep, "/")] = path
+    return dict(sorted(documents.items()))
+
+def read_document_text(path: str):
+    """Plain text of a document, or None if it cannot be read (e.g. a PDF without pypdf installed)."""
+    if path.lower().endswith(".pdf"):
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            logger.warning(f"pypdf not installed; skipping PDF {path}")
+            return None
+        try:
+            return "\n\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+        except Exception as e:
+            logger.warning(f"Could not read PDF {path}: {e}")
+            return None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+def make_text_splitter(chunk_size=INGEST_CHUNK_SIZE, chunk_overlap=INGEST_CHUNK_OVERLAP):
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+def _existing_chunks_by_source(collection):
+    """
+    (source -> {"ids": set, "file_hash": str} for the chunks this ingester owns, number of other
+    chunks in the collection).
+    """
+    by_source, unmanaged = {}, 0
+    stored = collection.get(include=["metadatas"])
+    for chunk, metadata in zip(stored["ids"], stored["metadatas"]):
+        metadata = metadata or {}
+        if not metadata.get("file_hash"):
+            unmanaged += 1
+            continue
+        entry = by_source.setdefault(metadata.get("source", ""), {"ids": set(), "file_hash": None})
+        entry["ids"].add(chunk)
+        entry["file_hash"] = entry["file_hash"] or metadata["file_hash"]
+    return by_source, unmanaged
+
+def _batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def ingest_directory(source_dir, collection, embeddings, splitter=None,
+                     embed_batch_size=INGEST_EMBED_BATCH_SIZE, dry_run=False) -> dict:
+    """
+    Syncs `collection` (a chromadb Collection) with the documents under source_dir, embedding new
+    chunks with `embeddings` (a langchain Embeddings, e.g. the chatbot's MiniLM model).
+    Returns a report dict with counts and throughput.
+    """
+    splitter = splitter or make_text_splitter()
+    started = time.perf_counter()
+    report = {"files_scanned": 0, "files_unchanged": 0, "files_changed": 0, "files_removed": 0, "files_unreadable": 0,
+              "chunks_total": 0, "chunks_embedded": 0, "chunks_kept": 0, "chunks_deleted": 0, "chunks_unmanaged": 0,
+              "embed_seconds": 0.0, "dry_run": dry_run}
+
+    existing, report["chunks_unmanaged"] = _existing_chunks_by_source(collection)
+    documents = scan_documents(source_dir)
+    to_embed = [] # (id, text, metadata)
+    to_relabel = [] # (id, metadata) for kept chunks of changed files, so the next run can skip them
+    to_delete = []
+
+    for source, path in documents.items():
+        report["files_scanned"] += 1
+        with open(path, "rb") as f:
+            file_hash = _sha256(f.read())
+        previous = existing.pop(source, None)
+        if previous and previous["file_hash"] == file_hash:
+            report["files_unchanged"] += 1
+            report["chunks_kept"] += len(previous["ids"])
+            report["chunks_total"] += len(previous["ids"])
+            continue
+        text = read_document_text(path)
+        if text is None:
+            report["files_unreadable"] += 1
+            if previous: # Keep what was indexed before rather than dropping it
+                report["chunks_kept"] += len(previous["ids"])
+            continue
+
+        report["files_changed"] += 1
+        previous_ids = previous["ids"] if previous else set()
+        current_ids = set()
+        for index, chunk_text in enumerate(splitter.split_text(text)):
+            chunk = chunk_id(source, chunk_text)
+            if chunk in current_ids: # Repeated boilerplate within one file is stored once
+                continue
+            current_ids.add(chunk)
+            metadata = {"source": source, "file_hash": file_hash, "chunk_index": index}
+            if chunk in previous_ids:
+                to_relabel.append((chunk, metadata))
+            else:
+                to_embed.append((chunk, chunk_text, metadata))
+        to_delete.extend(previous_ids - current_ids)
+        report["chunks_total"] += len(current_ids)
+        report["chunks_kept"] += len(current_ids & previous_ids)
+
+    for source, previous in existing.items(): # Ingested files that no longer exist
+        report["files_removed"] += 1
+        to_delete.extend(previous["ids"])
+
+    report["chunks_embedded"] = len(to_embed)
+    report["chunks_deleted"] = len(to_delete)
+    if not dry_run:
+        for batch in _batched(to_embed, embed_batch_size):
+            embed_started = time.perf_counter()
+            vectors = embeddings.embed_documents([text for _, text, _ in batch])
+            report["embed_seconds"] += time.perf_counter() - embed_started
+            collection.upsert(ids=[chunk for chunk, _, _ in batch], embeddings=vectors,
+                              documents=[text for _, text, _ in batch], metadatas=[metadata for _, _, metadata in batch])
+        for batch in _batched(to_relabel, INGEST_WRITE_BATCH_SIZE):
+            collection.update(ids=[chunk for chunk, _ in batch], metadatas=[metadata for _, metadata in batch])
+        for batch in _batched(to_delete, INGEST_WRITE_BATCH_SIZE):
+            collection.delete(ids=batch)
+
+    elapsed = time.perf_counter() - started
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["embed_seconds"] = round(report["embed_seconds"], 3)
+    report["chunks_per_second"] = round(report["chunks_total"] / elapsed, 1) if elapsed else 0.0
+    report["embedded_chunks_per_second"] = round(report["chunks_embedded"] / report["embed_seconds"], 1) if report["embed_seconds"] else 0.0
+    return report
+
+def open_chroma_collection(db_path, embeddings):
+    """The collection the chatbot reads (same persist directory and collection name)."""
+    from langchain_community.vectorstores import Chroma
+    vector_db = Chroma(collection_name=CHROMA_COLLECTION_NAME, persist_directory=db_path, embedding_function=embeddings)
+    return vector_db._collection
+
+def main():
+    from career_ai_chatbot_logic import CHROMA_DB_PATH, EMBEDDING_MODEL_NAME
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    parser = argparse.ArgumentParser(description="Incrementally ingest career documents into the chatbot's Chroma DB.")
+    parser.add_argument("source_dir")
+    parser.add_argument("--db", default=CHROMA_DB_PATH)
+    parser.add_argument("--batch-size", type=int, default=INGEST_EMBED_BATCH_SIZE, help="Chunks per embedding batch")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=INGEST_CHUNK_OVERLAP)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without embedding or writing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    load_started = time.perf_counter()
+    # sentence-transformers batches internally too; match it to our batch size so each call is one vectorized pass
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME, encode_kwargs={"batch_size": args.batch_size})
+    collection = open_chroma_collection(args.db, embeddings)
+    logger.info(f"Loaded embedding model and collection '{CHROMA_COLLECTION_NAME}' ({collection.count()} chunks) "
+                f"in {time.perf_counter() - load_started:.2f}s.")
+
+    report = ingest_directory(args.source_dir, collection, embeddings,
+                              splitter=make_text_splitter(args.chunk_size, args.chunk_overlap),
+                              embed_batch_size=args.batch_size, dry_run=args.dry_run)
+    print(f"Files: {report['files_scanned']} scanned, {report['files_unchanged']} unchanged, {report['files_changed']} changed, "
+          f"{report['files_removed']} removed, {report['files_unreadable']} unreadable")
+    print(f"Chunks: {report['chunks_total']} total, {report['chunks_embedded']} embedded, {report['chunks_kept']} kept, "
+          f"{report['chunks_deleted']} deleted{' (dry run)' if args.dry_run else ''}, "
+          f"{report['chunks_unmanaged']} not managed by this ingester (left alone)")
+    print(f"Took {report['elapsed_seconds']}s ({report['chunks_per_second']} chunks/s); embedding "
+          f"{report['embed_seconds']}s ({report['embedded_chunks_per_second']} chunks/s)")
+
+if __name__ == "__main__":
+    main()
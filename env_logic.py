@@ -0,0 +1,21 @@
+# /my_career_portal/env_logic.py
+"""
+.env loading shared by app.py and the *_logic modules: whichever module is imported first loads
+the file, every later call is a no-op. Variables already set in the environment always win.
+"""
+import threading
+
+from dotenv import load_dotenv
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+def load_env() -> bool:
+    """Loads .env once per process. Returns True if this call did the loading."""
+    global _env_loaded
+    with _env_lock:
+        if _env_loaded:
+            return False
+        load_dotenv()
+        _env_loaded = True
+        return True
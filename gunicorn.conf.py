@@ -0,0 +1,24 @@
+# /my_career_portal/gunicorn.conf.py
+# Usage: gunicorn -c gunicorn.conf.py app:app
+# With CHATBOT_PRELOAD=1 the app (and the MiniLM embedding weights) is imported once in the master
+# and forked workers share those pages copy-on-write; each worker then finishes chatbot init
+# (Chroma, Gemini client) in post_fork, so no request ever pays the cold start.
+import gc
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = os.getenv("CHATBOT_PRELOAD", "0") == "1"
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the GC's reach: collections would otherwise touch
+    # (and so un-share) the preloaded pages in every worker.
+    if preload_app:
+        gc.freeze()
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import warm_up_chatbot_for_worker
+        warm_up_chatbot_for_worker()
@@ -1,25 +1,96 @@
 # /my_career_portal/higher_education_fetcher_logic.py
 import requests
-from dotenv import load_dotenv
+from env_logic import load_env
 import os
+import tempfile
+import time
+import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from cache_logic import TTLLRUCache, SingleFlight, get_sqlite_cache_store
+from http_client_logic import http_get, async_http_get
+from institution_index_logic import get_institution_index
+from metrics_logic import span, submit_with_context
+from rate_limit_logic import aacquire_upstream, acquire_upstream
 
-load_dotenv()
+load_env()
 GOOGLE_API_KEY_PLACES = os.getenv("GOOGLE_API_KEY")
 UNSPLASH_ACCESS_KEY_EDU = os.getenv("UNSPLASH_ACCESS_KEY")
 
+# --- Upstream endpoints (overridable so benchmarks can point at local stub servers) ---
+GOOGLE_PLACES_TEXTSEARCH_URL = os.getenv("EDU_GOOGLE_PLACES_URL", "https://maps.googleapis.com/maps/api/place/textsearch/json")
+UNSPLASH_RANDOM_PHOTO_URL = os.getenv("EDU_UNSPLASH_URL", "https://api.unsplash.com/photos/random")
+WIKIPEDIA_SEARCH_URL = os.getenv("EDU_WIKIPEDIA_SEARCH_URL", "https://en.wikipedia.org/w/api.php")
+WIKIPEDIA_SUMMARY_URL = os.getenv("EDU_WIKIPEDIA_SUMMARY_URL", "https://en.wikipedia.org/api/rest_v1/page/summary")
+
+# --- Enrichment fan-out settings ---
+MAX_INSTITUTIONS_PER_SEARCH = 8
+ENRICH_MAX_WORKERS = int(os.getenv("EDU_ENRICH_MAX_WORKERS", "8"))
+ENRICH_DEADLINE_SECONDS = float(os.getenv("EDU_ENRICH_DEADLINE_SECONDS", "10"))
+WIKIPEDIA_TIMEOUT_FALLBACK = "Could not retrieve Wikipedia summary."
+UNSPLASH_TIMEOUT_FALLBACK = "https://source.unsplash.com/600x400/?campus,library"
+# Returned when the site-wide Places budget (rate_limit_logic) is spent; cached and catalog answers still work
+PLACES_BUDGET_EXHAUSTED_ERROR = "Search is temporarily limited. Please try again later."
+
+# --- Enrichment caches ---
+# EDU_CACHE_SQLITE_PATH makes the caches persistent and shared across workers; unset = memory only.
+WIKIPEDIA_NOT_FOUND_SUMMARY = "No specific Wikipedia summary found for this institution."
+UNSPLASH_FALLBACK_PREFIX = "https://source.unsplash.com/"
+_edu_cache_store = get_sqlite_cache_store(os.getenv("EDU_CACHE_SQLITE_PATH", ""))
+_edu_cache_max_entries = int(os.getenv("EDU_CACHE_MAX_ENTRIES", "2048"))
+WIKIPEDIA_CACHE_TTL = float(os.getenv("EDU_WIKIPEDIA_CACHE_TTL", str(7 * 24 * 3600)))
+WIKIPEDIA_NEGATIVE_CACHE_TTL = float(os.getenv("EDU_WIKIPEDIA_NEGATIVE_CACHE_TTL", str(24 * 3600)))
+UNSPLASH_CACHE_TTL = float(os.getenv("EDU_UNSPLASH_CACHE_TTL", str(24 * 3600)))
+wikipedia_summary_cache = TTLLRUCache("edu_wikipedia_summary", _edu_cache_max_entries, WIKIPEDIA_CACHE_TTL, _edu_cache_store)
+unsplash_image_cache = TTLLRUCache("edu_unsplash_image", _edu_cache_max_entries, UNSPLASH_CACHE_TTL, _edu_cache_store)
+
+# --- Query-level result cache (full search results per normalized query) ---
+SEARCH_RESULTS_CACHE_TTL = float(os.getenv("EDU_SEARCH_CACHE_TTL", "3600"))
+# Results where a Wikipedia/Unsplash lookup timed out or was skipped (budget): kept briefly so a retry can fill them in
+SEARCH_RESULTS_PARTIAL_CACHE_TTL = float(os.getenv("EDU_SEARCH_PARTIAL_CACHE_TTL", "120"))
+search_results_cache = TTLLRUCache("edu_search_results", int(os.getenv("EDU_SEARCH_CACHE_MAX_ENTRIES", "256")), SEARCH_RESULTS_CACHE_TTL, _edu_cache_store)
+_search_single_flight = SingleFlight("edu_search_results")
+
+# --- "Load More" continuations ---
+# A Places page holds up to 20 results but a response shows MAX_INSTITUTIONS_PER_SEARCH of them, so
+# the rest of the page is stored under a "more:" token and served before Places' own next page.
+# Each query's first continuation token is kept too, so cached answers can still offer "Load More".
+# Always in a SQLite file shared by the workers, since "Load More" may land on another worker than the search.
+CONTINUATION_TOKEN_PREFIX = "more:"
+EDU_CONTINUATION_SQLITE_PATH = os.getenv("EDU_CONTINUATION_SQLITE_PATH", os.getenv("EDU_CACHE_SQLITE_PATH") or
+                                         os.path.join(tempfile.gettempdir(), "career_portal_edu_continuations.sqlite3"))
+_edu_continuation_store = get_sqlite_cache_store(EDU_CONTINUATION_SQLITE_PATH)
+search_continuation_cache = TTLLRUCache("edu_search_continuations", 1024, SEARCH_RESULTS_CACHE_TTL, _edu_continuation_store)
+search_next_page_cache = TTLLRUCache("edu_search_next_page", 1024, SEARCH_RESULTS_CACHE_TTL, _edu_continuation_store)
+
+# --- Local institution catalog (see institution_index_logic.py); unset EDU_INDEX_PATH = disabled ---
+institution_index = get_institution_index(os.getenv("EDU_INDEX_PATH", ""))
+INDEX_MIN_RESULTS = int(os.getenv("EDU_INDEX_MIN_RESULTS", "3")) # Fewer catalog hits than this counts as a miss
+INDEX_WRITE_BACK = os.getenv("EDU_INDEX_WRITE_BACK", "1") == "1"
+
+# Shared pool: lookups that overrun the deadline keep running in the background instead of
+# blocking the request, so the pool must outlive any single search call.
+_enrich_executor = ThreadPoolExecutor(max_workers=ENRICH_MAX_WORKERS, thread_name_prefix="edu-enrich")
+
 def search_google_places_api_edu(query, api_key):
+    return search_google_places_page_api_edu(query, api_key)[0]
+
+def search_google_places_page_api_edu(query, api_key, page_token: str = None):
+    """One page of Places text search results; returns (results, next_page_token or None)."""
     if not api_key:
         print("ERROR (Edu Fetcher): Google API Key not provided for Places search.")
-        return []
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+        return [], None
     params = {"query": query, "key": api_key, "language": "en"}
+    if page_token: params["pagetoken"] = page_token
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json().get("results", [])
+        with span("places_search"):
+            response = http_get(GOOGLE_PLACES_TEXTSEARCH_URL, params=params, timeout=10)
+            response.raise_for_status()
+            payload = response.json()
+        return payload.get("results", []), payload.get("next_page_token")
     except requests.exceptions.RequestException as e:
         print(f"Error calling Google Places API for Education: {e}")
-        return []
+        return [], None
 
 def get_google_photo_url_api_edu(photo_reference: str, api_key: str, maxwidth: int = 400) -> str:
     if not api_key or not photo_reference: return ""
@@ -29,92 +100,543 @@ def get_google_photo_url_api_edu(photo_reference: str, api_key: str, maxwidth: i
     )
 
 def get_unsplash_image_api_edu(query: str, access_key: str) -> str:
+    cache_key = " ".join(query.lower().split())
+    cached = unsplash_image_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    image_url = _fetch_unsplash_image_api_edu(query, access_key)
+    if not image_url.startswith(UNSPLASH_FALLBACK_PREFIX): # Only cache real API results, never fallbacks
+        unsplash_image_cache.set(cache_key, image_url)
+    return image_url
+
+def _fetch_unsplash_image_api_edu(query: str, access_key: str) -> str:
     if not access_key:
         print("WARNING (Edu Fetcher): Unsplash Access Key not provided.")
         return "https://source.unsplash.com/600x400/?university,education,library" 
+    if not acquire_upstream("unsplash"): # Budget spent: the (uncached) fallback image, like a timeout
+        return UNSPLASH_TIMEOUT_FALLBACK
     
-    url = "https://api.unsplash.com/photos/random"
     unsplash_query = f"{query} university building campus architecture" # More specific query
     params = {"query": unsplash_query, "orientation": "landscape", "client_id": access_key}
     try:
-        res = requests.get(url, params=params, timeout=7)
+        with span("unsplash"):
+            res = http_get(UNSPLASH_RANDOM_PHOTO_URL, params=params, timeout=7)
         if res.status_code == 200:
             return res.json().get("urls", {}).get("regular", "https://source.unsplash.com/600x400/?education,study")
     except requests.exceptions.RequestException as e:
         print(f"Error calling Unsplash API for Education: {e}")
-    return "https://source.unsplash.com/600x400/?campus,library"
+    return UNSPLASH_TIMEOUT_FALLBACK
 
 def get_wikipedia_summary_api_edu(place_name: str) -> str:
     # Remove common suffixes that might hinder search
     place_name_cleaned = place_name.replace("University of", "").replace("College", "").strip()
-    search_url = "https://en.wikipedia.org/w/api.php"
+    cache_key = " ".join(place_name_cleaned.lower().split())
+    cached = wikipedia_summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    summary = _fetch_wikipedia_summary_api_edu(place_name_cleaned)
+    if summary == WIKIPEDIA_NOT_FOUND_SUMMARY: # Negative cache, shorter TTL
+        wikipedia_summary_cache.set(cache_key, summary, ttl=WIKIPEDIA_NEGATIVE_CACHE_TTL)
+    elif summary != WIKIPEDIA_TIMEOUT_FALLBACK: # Transient errors are not cached
+        wikipedia_summary_cache.set(cache_key, summary)
+    return summary
+
+def _fetch_wikipedia_summary_api_edu(place_name_cleaned: str) -> str:
+    if not acquire_upstream("wikipedia", cost=2): # Search + summary; budget spent: the (uncached) fallback text
+        return WIKIPEDIA_TIMEOUT_FALLBACK
     search_params = {
         "action": "query", "list": "search", "srsearch": place_name_cleaned,
         "format": "json", "utf8": "", "limit": 1
     }
     try:
-        search_response = requests.get(search_url, params=search_params, timeout=7)
-        search_response.raise_for_status()
-        search_results = search_response.json().get("query", {}).get("search", [])
-        
-        if not search_results:
-            return "No specific Wikipedia summary found for this institution."
-        
-        page_title = search_results[0]["title"]
-        summary_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{page_title.replace(' ', '_')}"
-        
-        summary_response = requests.get(summary_url, headers={'User-Agent': 'CareerPortalEduFetcher/1.0'}, timeout=7)
-        summary_response.raise_for_status()
-        summary_data = summary_response.json()
+        with span("wikipedia"):
+            search_response = http_get(WIKIPEDIA_SEARCH_URL, params=search_params, timeout=7)
+            search_response.raise_for_status()
+            search_results = search_response.json().get("query", {}).get("search", [])
+
+            if not search_results:
+                return WIKIPEDIA_NOT_FOUND_SUMMARY
+
+            page_title = search_results[0]["title"]
+            summary_url = f"{WIKIPEDIA_SUMMARY_URL}/{page_title.replace(' ', '_')}"
+
+            summary_response = http_get(summary_url, headers={'User-Agent': 'CareerPortalEduFetcher/1.0'}, timeout=7)
+            summary_response.raise_for_status()
+            summary_data = summary_response.json()
         extract = summary_data.get("extract", "No detailed description available on Wikipedia.")
         return (extract[:350] + '...') if len(extract) > 353 else extract
     except requests.exceptions.RequestException as e:
         print(f"Error fetching Wikipedia data for '{place_name_cleaned}': {e}")
-        return "Could not retrieve Wikipedia summary."
+        return WIKIPEDIA_TIMEOUT_FALLBACK
 
-def search_colleges_globally_api(country: str, course_type: str, degree_level: str = None):
-    if not GOOGLE_API_KEY_PLACES:
-        print("ERROR (Edu Fetcher): GOOGLE_API_KEY is not set. Cannot perform college search.")
-        return [{"name": "API Key Missing", "country": country, "error": "Google API Key not configured on server."}]
+def _build_college_record(place: dict, country: str, course_type: str) -> dict:
+    """Bare institution record from a Places result; image/description are filled by enrichment."""
+    image_url = ""
+    if "photos" in place and place["photos"]:
+        photo_ref = place["photos"][0].get("photo_reference")
+        if photo_ref: image_url = get_google_photo_url_api_edu(photo_ref, GOOGLE_API_KEY_PLACES)
+    return {
+        "name": place.get("name", "N/A"), "address": place.get("formatted_address", "N/A"), "country": country,
+        "website": place.get("website"), "rating": place.get("rating"),
+        "image_url": image_url, "description": "",
+        "programs": [course_type] # This is a simplified representation
+    }
+
+def iter_enriched_colleges(colleges: list, country: str, max_workers: int = None, deadline: float = None):
+    """
+    Fetches Wikipedia descriptions and Unsplash fallback images for every college in parallel and
+    yields (index, college) as soon as each college's lookups have finished. All lookups share one
+    overall deadline; colleges with lookups still running when it expires are yielded last with the
+    same fallback text/image the sequential code used on errors. Mutates the college dicts.
+    """
+    max_workers = max_workers or ENRICH_MAX_WORKERS
+    deadline = ENRICH_DEADLINE_SECONDS if deadline is None else deadline
+    executor = _enrich_executor if max_workers == ENRICH_MAX_WORKERS else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="edu-enrich")
+
+    futures = {}
+    pending_per_college = [0] * len(colleges)
+    for index, college in enumerate(colleges):
+        if not college["description"]:
+            futures[submit_with_context(executor, get_wikipedia_summary_api_edu, college["name"])] = (index, "description")
+            pending_per_college[index] += 1
+        if not college["image_url"]: # Fallback to Unsplash
+            query = f"{college['name']} {country or ''}"
+            futures[submit_with_context(executor, get_unsplash_image_api_edu, query, UNSPLASH_ACCESS_KEY_EDU)] = (index, "image_url")
+            pending_per_college[index] += 1
+
+    def with_fallbacks(college):
+        if not college["description"]: college["description"] = WIKIPEDIA_TIMEOUT_FALLBACK
+        if not college["image_url"]: college["image_url"] = UNSPLASH_TIMEOUT_FALLBACK
+        return college
+
+    try:
+        for index, college in enumerate(colleges): # Nothing to look up (e.g. catalog rows, Places photos)
+            if pending_per_college[index] == 0:
+                yield index, with_fallbacks(college)
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                index, field = futures[future]
+                try:
+                    colleges[index][field] = future.result()
+                except Exception as e: # Lookups catch their own request errors; this guards anything unexpected
+                    print(f"Edu Fetcher: Enrichment of '{colleges[index]['name']}' ({field}) failed: {e}")
+                pending_per_college[index] -= 1
+                if pending_per_college[index] == 0:
+                    yield index, with_fallbacks(colleges[index])
+        except FuturesTimeoutError:
+            timed_out = [future for future in futures if not future.done()]
+            print(f"Edu Fetcher: {len(timed_out)} enrichment lookups missed the {deadline}s deadline; returning partial results.")
+            for future in timed_out:
+                future.cancel()
+            for index, college in enumerate(colleges):
+                if pending_per_college[index] > 0:
+                    pending_per_college[index] = 0
+                    yield index, with_fallbacks(college)
+    finally:
+        # Also reached when a streaming client disconnects: drop its queued lookups so they don't hold
+        # up other requests on the shared pool (lookups already running finish and fill the caches)
+        for future in futures:
+            if not future.done():
+                future.cancel()
+        if executor is not _enrich_executor:
+            executor.shutdown(wait=False)
 
+def enrich_colleges_concurrently(colleges: list, country: str, max_workers: int = None, deadline: float = None) -> list:
+    """Runs iter_enriched_colleges to completion; mutates and returns `colleges`."""
+    for _ in iter_enriched_colleges(colleges, country, max_workers=max_workers, deadline=deadline):
+        pass
+    return colleges
+
+def _college_from_index_row(row: dict, country: str, course_type: str) -> dict:
+    return {
+        "name": row["name"], "address": row["address"] or "N/A", "country": country or row["country"],
+        "website": row["website"], "rating": row["rating"],
+        "image_url": row["image_url"] or "", "description": row["description"] or "",
+        "programs": [course_type] if course_type else [f for f in (row["fields"] or "").split(";") if f][:3]
+    }
+
+def search_institution_index(country: str, course_type: str, degree_level: str = None) -> list:
+    """Catalog lookup; returns enriched colleges, or [] on a miss (or when the catalog is disabled)."""
+    if institution_index is None:
+        return []
+    try:
+        rows = institution_index.search(country, course_type, degree_level, limit=MAX_INSTITUTIONS_PER_SEARCH)
+    except Exception as e:
+        print(f"Edu Fetcher: Institution index lookup failed, falling back to Places: {e}")
+        return []
+    if len(rows) < INDEX_MIN_RESULTS:
+        return []
+    colleges = [_college_from_index_row(row, country, course_type) for row in rows]
+    # Dump-loaded rows may lack descriptions/images; only those reach the (cached) enrichment APIs
+    if any(not c["description"] or not c["image_url"] for c in colleges):
+        enrich_colleges_concurrently(colleges, country)
+    return colleges
+
+def _write_back_to_index(colleges: list, course_type: str, degree_level: str = None):
+    if institution_index is None or not INDEX_WRITE_BACK:
+        return
+    degree = degree_level if degree_level and degree_level != "Any" else ""
+    # Timed-out lookups are left empty so a later search can fill them in
+    records = [{
+        **college, "fields": [course_type] if course_type else [], "degree_levels": [degree] if degree else [],
+        "description": "" if college["description"] == WIKIPEDIA_TIMEOUT_FALLBACK else college["description"],
+        "image_url": "" if college["image_url"].startswith(UNSPLASH_FALLBACK_PREFIX) else college["image_url"],
+    } for college in colleges]
+    try:
+        institution_index.upsert_many(records, source="places")
+    except Exception as e:
+        print(f"Edu Fetcher: Could not write Places results back to the institution index: {e}")
+
+def build_places_query(country: str, course_type: str, degree_level: str = None) -> str:
     query_parts = ["top"]
     if degree_level and degree_level != "Any": query_parts.append(degree_level)
     query_parts.append(course_type)
     query_parts.append("universities" if "university" not in course_type.lower() else "colleges") # Try to be smart
     if country: query_parts.extend(["in", country])
-    
-    query = " ".join(query_parts)
+    return " ".join(query_parts)
+
+def search_colleges_globally_api(country: str, course_type: str, degree_level: str = None):
+    indexed = search_institution_index(country, course_type, degree_level)
+    if indexed:
+        print(f"Edu Fetcher: Answered from institution index ({len(indexed)} institutions).")
+        return indexed
+
+    if not GOOGLE_API_KEY_PLACES:
+        print("ERROR (Edu Fetcher): GOOGLE_API_KEY is not set. Cannot perform college search.")
+        return [{"name": "API Key Missing", "country": country, "error": "Google API Key not configured on server."}]
+
+    if not acquire_upstream("places"):
+        print("Edu Fetcher: Places budget exhausted; not searching.")
+        return _places_budget_exhausted_result(country)
+
+    query = build_places_query(country, course_type, degree_level)
     print(f"Edu Fetcher: Searching Google Places with query: '{query}'")
     
-    google_places_results = search_google_places_api_edu(query, GOOGLE_API_KEY_PLACES)
+    google_places_results, next_page_token = search_google_places_page_api_edu(query, GOOGLE_API_KEY_PLACES)
     
-    colleges = []
     if not google_places_results:
         print("Edu Fetcher: No results from Google Places API.")
         return []
+    _remember_first_page(normalize_search_query_key(country, course_type, degree_level), google_places_results, next_page_token)
+
+    # Limit the number of results processed/returned
+    colleges = [_build_college_record(place, country, course_type) for place in google_places_results[:MAX_INSTITUTIONS_PER_SEARCH]]
+
+    started = time.perf_counter()
+    with span("edu_enrichment"):
+        enrich_colleges_concurrently(colleges, country)
+    print(f"Edu Fetcher: Enriched {len(colleges)} institutions in {time.perf_counter() - started:.2f}s.")
+    _write_back_to_index(colleges, course_type, degree_level)
+    return colleges
+
+
+def _places_budget_exhausted_result(country: str) -> list:
+    # An "error" record, so it is never cached (same shape as the missing-key record)
+    return [{"name": "Search Unavailable", "country": country, "error": PLACES_BUDGET_EXHAUSTED_ERROR}]
+
+def _continue_after(places: list, next_page_token: str = None):
+    """Token for what follows the shown part of a Places page: its unshown results, then Places' next page."""
+    rest = places[MAX_INSTITUTIONS_PER_SEARCH:]
+    if not rest:
+        return next_page_token
+    token = CONTINUATION_TOKEN_PREFIX + uuid.uuid4().hex
+    search_continuation_cache.set(token, {"places": rest, "next_page_token": next_page_token})
+    return token
 
-    for place in google_places_results: # Process more results, frontend can limit display
-        name = place.get("name", "N/A")
-        address = place.get("formatted_address", "N/A")
-        
-        image_url = ""
-        if "photos" in place and place["photos"]:
-            photo_ref = place["photos"][0].get("photo_reference")
-            if photo_ref: image_url = get_google_photo_url_api_edu(photo_ref, GOOGLE_API_KEY_PLACES)
-        
-        if not image_url: # Fallback to Unsplash
-            image_url = get_unsplash_image_api_edu(f"{name} {country or ''}", UNSPLASH_ACCESS_KEY_EDU)
-
-        description = get_wikipedia_summary_api_edu(name)
-        
-        college_data = {
-            "name": name, "address": address, "country": country,
-            "website": place.get("website"), "rating": place.get("rating"),
-            "image_url": image_url, "description": description,
-            "programs": [course_type] # This is a simplified representation
-        }
-        colleges.append(college_data)
-        if len(colleges) >= 8: # Limit the number of results processed/returned
+def _remember_first_page(key: str, places: list, next_page_token: str = None):
+    token = _continue_after(places, next_page_token)
+    if token:
+        search_next_page_cache.set(key, token)
+    else:
+        search_next_page_cache.delete(key)
+    return token
+
+def normalize_search_query_key(country: str, course_type: str, degree_level: str = None) -> str:
+    """Case/whitespace-insensitive key for a (country, course, degree) search; 'Any' == no degree."""
+    def norm(value):
+        return " ".join((value or "").lower().split())
+    degree = norm(degree_level)
+    if degree == "any": degree = ""
+    return f"{norm(country)}|{norm(course_type)}|{degree}"
+
+def _cache_search_results(key: str, colleges: list):
+    """Caches a search's results; partially enriched ones (timeout fallbacks) only for SEARCH_RESULTS_PARTIAL_CACHE_TTL."""
+    partial = any(college.get("description") == WIKIPEDIA_TIMEOUT_FALLBACK or college.get("image_url") == UNSPLASH_TIMEOUT_FALLBACK
+                  for college in colleges)
+    search_results_cache.set(key, colleges, ttl=SEARCH_RESULTS_PARTIAL_CACHE_TTL if partial else None)
+
+def search_colleges_cached(country: str, course_type: str, degree_level: str = None):
+    """
+    search_colleges_globally_api behind the query-level cache. Concurrent identical searches
+    are coalesced so only one of them reaches the upstream APIs.
+    """
+    key = normalize_search_query_key(country, course_type, degree_level)
+    cached = search_results_cache.get(key)
+    if cached is not None:
+        return cached
+    results = _search_single_flight.do(key, _search_and_cache, key, country, course_type, degree_level)
+    if results is None: # The leader was a stream whose client went away before it finished
+        results = _search_and_cache(key, country, course_type, degree_level)
+    return results
+
+def _search_and_cache(key, country, course_type, degree_level):
+    cached = search_results_cache.get(key) # A previous leader may have filled it while we queued
+    if cached is not None:
+        return cached
+    results = search_colleges_globally_api(country, course_type, degree_level)
+    # Empty results and configuration errors are not worth pinning for an hour
+    if results and not any("error" in college for college in results):
+        _cache_search_results(key, results)
+    return results
+
+def iter_college_search_events(country: str, course_type: str, degree_level: str = None, page_token: str = None):
+    """
+    Streaming variant of search_colleges_cached. Yields dict events:
+      {"type": "institution", "index": i, ...bare record}   as soon as the Places page arrives
+      {"type": "enriched", "index": i, "description": ..., "image_url": ...}   per institution
+      {"type": "done", "count": n, "next_page_token": token or None}
+    Cached and catalog answers are emitted as already-enriched institutions (cached ones keep
+    their "Load More" token). `page_token` continues a previous search: first the rest of the
+    Places page that was cut to MAX_INSTITUTIONS_PER_SEARCH, then the next Places page.
+    """
+    if page_token:
+        yield from _iter_search_page_events(country, course_type, degree_level, page_token)
+        return
+
+    key = normalize_search_query_key(country, course_type, degree_level)
+    cached = search_results_cache.get(key)
+    ready = cached or search_institution_index(country, course_type, degree_level)
+    if ready:
+        yield from _iter_ready_events(ready, search_next_page_cache.get(key) if cached else None)
+        return
+
+    # Identical concurrent searches, streamed or not, share one Places call and one enrichment
+    call, is_leader = _search_single_flight.join(key)
+    if not is_leader:
+        call.event.wait()
+        if call.error is None and call.result:
+            yield from _iter_ready_events(call.result, search_next_page_cache.get(key))
+            return
+    shown = [] # Filled once the page is fully enriched; what followers receive
+    try:
+        yield from _iter_search_page_events(country, course_type, degree_level, None, shown)
+    finally:
+        if is_leader: # Also when the client disconnects mid-stream (followers then search themselves)
+            _search_single_flight.finish(key, call, shown or None)
+
+def _iter_ready_events(colleges: list, next_page_token: str = None):
+    for index, college in enumerate(colleges):
+        yield {"type": "institution", "index": index, **college}
+    yield {"type": "done", "count": len(colleges), "next_page_token": next_page_token}
+
+def _iter_search_page_events(country: str, course_type: str, degree_level: str = None, page_token: str = None, shown: list = None):
+    """One page of a streamed search, from Places or from a stored continuation; appends the final records to `shown`."""
+    if page_token and page_token.startswith(CONTINUATION_TOKEN_PREFIX):
+        continuation = search_continuation_cache.get(page_token)
+        if continuation is None:
+            yield {"type": "error", "error": "These results have expired. Please search again."}
+            yield {"type": "done", "count": 0, "next_page_token": None}
+            return
+        places, next_page_token = continuation["places"], continuation["next_page_token"]
+    else:
+        if not GOOGLE_API_KEY_PLACES:
+            print("ERROR (Edu Fetcher): GOOGLE_API_KEY is not set. Cannot perform college search.")
+            records = [{"name": "API Key Missing", "country": country, "error": "Google API Key not configured on server."}]
+        elif not acquire_upstream("places"):
+            print("Edu Fetcher: Places budget exhausted; not searching.")
+            records = _places_budget_exhausted_result(country)
+        else:
+            records = None
+        if records:
+            if shown is not None: shown.extend(records)
+            yield from _iter_ready_events(records)
+            return
+        query = build_places_query(country, course_type, degree_level)
+        print(f"Edu Fetcher: Streaming Google Places search for '{query}' (page token: {bool(page_token)})")
+        places, next_page_token = search_google_places_page_api_edu(query, GOOGLE_API_KEY_PLACES, page_token)
+
+    key = normalize_search_query_key(country, course_type, degree_level)
+    next_page_token = _remember_first_page(key, places, next_page_token) if page_token is None else _continue_after(places, next_page_token)
+    colleges = [_build_college_record(place, country, course_type) for place in places[:MAX_INSTITUTIONS_PER_SEARCH]]
+    for index, college in enumerate(colleges):
+        yield {"type": "institution", "index": index, **college}
+
+    for index, college in iter_enriched_colleges(colleges, country):
+        yield {"type": "enriched", "index": index, "description": college["description"], "image_url": college["image_url"]}
+
+    if colleges:
+        _write_back_to_index(colleges, course_type, degree_level)
+        if not page_token:
+            _cache_search_results(key, colleges)
+    if shown is not None:
+        shown.extend(colleges)
+    yield {"type": "done", "count": len(colleges), "next_page_token": next_page_token}
+
+# --- Async variants (ASGI serving mode, see asgi_app.py) ---
+# Same caches, fallbacks and deadlines as the sync path, but every upstream call is awaited on the
+# event loop, so one process can hold hundreds of slow lookups without a thread for each.
+_async_search_in_flight = {} # key -> asyncio.Future, per event loop (coalesces like _search_single_flight)
+
+async def async_search_google_places_page_api_edu(query, api_key, page_token: str = None):
+    if not api_key:
+        print("ERROR (Edu Fetcher): Google API Key not provided for Places search.")
+        return [], None
+    params = {"query": query, "key": api_key, "language": "en"}
+    if page_token: params["pagetoken"] = page_token
+    try:
+        with span("places_search"):
+            response = await async_http_get(GOOGLE_PLACES_TEXTSEARCH_URL, params=params, timeout=10)
+            response.raise_for_status()
+            payload = response.json()
+        return payload.get("results", []), payload.get("next_page_token")
+    except Exception as e: # httpx errors, CircuitOpenError, bad JSON
+        print(f"Error calling Google Places API for Education: {e}")
+        return [], None
+
+async def async_get_unsplash_image_api_edu(query: str, access_key: str) -> str:
+    cache_key = " ".join(query.lower().split())
+    cached = unsplash_image_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    if not access_key:
+        print("WARNING (Edu Fetcher): Unsplash Access Key not provided.")
+        return "https://source.unsplash.com/600x400/?university,education,library"
+    if not await aacquire_upstream("unsplash"):
+        return UNSPLASH_TIMEOUT_FALLBACK
+    params = {"query": f"{query} university building campus architecture", "orientation": "landscape", "client_id": access_key}
+    try:
+        with span("unsplash"):
+            res = await async_http_get(UNSPLASH_RANDOM_PHOTO_URL, params=params, timeout=7)
+        if res.status_code == 200:
+            image_url = res.json().get("urls", {}).get("regular", "https://source.unsplash.com/600x400/?education,study")
+            if not image_url.startswith(UNSPLASH_FALLBACK_PREFIX):
+                unsplash_image_cache.set(cache_key, image_url)
+            return image_url
+    except Exception as e:
+        print(f"Error calling Unsplash API for Education: {e}")
+    return UNSPLASH_TIMEOUT_FALLBACK
+
+async def async_get_wikipedia_summary_api_edu(place_name: str) -> str:
+    place_name_cleaned = place_name.replace("University of", "").replace("College", "").strip()
+    cache_key = " ".join(place_name_cleaned.lower().split())
+    cached = wikipedia_summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    if not await aacquire_upstream("wikipedia", cost=2):
+        return WIKIPEDIA_TIMEOUT_FALLBACK
+    search_params = {
+        "action": "query", "list": "search", "srsearch": place_name_cleaned,
+        "format": "json", "utf8": "", "limit": 1
+    }
+    try:
+        with span("wikipedia"):
+            search_response = await async_http_get(WIKIPEDIA_SEARCH_URL, params=search_params, timeout=7)
+            search_response.raise_for_status()
+            search_results = search_response.json().get("query", {}).get("search", [])
+            if not search_results:
+                wikipedia_summary_cache.set(cache_key, WIKIPEDIA_NOT_FOUND_SUMMARY, ttl=WIKIPEDIA_NEGATIVE_CACHE_TTL)
+                return WIKIPEDIA_NOT_FOUND_SUMMARY
+            summary_url = f"{WIKIPEDIA_SUMMARY_URL}/{search_results[0]['title'].replace(' ', '_')}"
+            summary_response = await async_http_get(summary_url, headers={'User-Agent': 'CareerPortalEduFetcher/1.0'}, timeout=7)
+            summary_response.raise_for_status()
+            extract = summary_response.json().get("extract", "No detailed description available on Wikipedia.")
+        summary = (extract[:350] + '...') if len(extract) > 353 else extract
+        wikipedia_summary_cache.set(cache_key, summary)
+        return summary
+    except Exception as e:
+        print(f"Error fetching Wikipedia data for '{place_name_cleaned}': {e}")
+        return WIKIPEDIA_TIMEOUT_FALLBACK
+
+async def async_enrich_colleges(colleges: list, country: str, deadline: float = None) -> list:
+    """Async enrich_colleges_concurrently: all lookups at once, one overall deadline; mutates and returns colleges."""
+    deadline = ENRICH_DEADLINE_SECONDS if deadline is None else deadline
+    tasks = {}
+    for index, college in enumerate(colleges):
+        if not college["description"]:
+            tasks[asyncio.ensure_future(async_get_wikipedia_summary_api_edu(college["name"]))] = (index, "description")
+        if not college["image_url"]:
+            query = f"{college['name']} {country or ''}"
+            tasks[asyncio.ensure_future(async_get_unsplash_image_api_edu(query, UNSPLASH_ACCESS_KEY_EDU))] = (index, "image_url")
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in done:
+            index, field = tasks[task]
+            try:
+                colleges[index][field] = task.result()
+            except Exception as e:
+                print(f"Edu Fetcher: Enrichment of '{colleges[index]['name']}' ({field}) failed: {e}")
+        if pending:
+            print(f"Edu Fetcher: {len(pending)} enrichment lookups missed the {deadline}s deadline; returning partial results.")
+            for task in pending:
+                task.cancel()
+    for college in colleges:
+        if not college["description"]: college["description"] = WIKIPEDIA_TIMEOUT_FALLBACK
+        if not college["image_url"]: college["image_url"] = UNSPLASH_TIMEOUT_FALLBACK
+    return colleges
+
+async def async_search_colleges_globally_api(country: str, course_type: str, degree_level: str = None):
+    # The catalog is local SQLite: fast, but still kept off the event loop
+    indexed = await asyncio.to_thread(search_institution_index, country, course_type, degree_level)
+    if indexed:
+        print(f"Edu Fetcher: Answered from institution index ({len(indexed)} institutions).")
+        return indexed
+
+    if not GOOGLE_API_KEY_PLACES:
+        print("ERROR (Edu Fetcher): GOOGLE_API_KEY is not set. Cannot perform college search.")
+        return [{"name": "API Key Missing", "country": country, "error": "Google API Key not configured on server."}]
+
+    if not await aacquire_upstream("places"):
+        print("Edu Fetcher: Places budget exhausted; not searching.")
+        return _places_budget_exhausted_result(country)
+
+    query = build_places_query(country, course_type, degree_level)
+    print(f"Edu Fetcher: Searching Google Places (async) with query: '{query}'")
+    places, next_page_token = await async_search_google_places_page_api_edu(query, GOOGLE_API_KEY_PLACES)
+    if not places:
+        print("Edu Fetcher: No results from Google Places API.")
+        return []
+    _remember_first_page(normalize_search_query_key(country, course_type, degree_level), places, next_page_token)
+
+    colleges = [_build_college_record(place, country, course_type) for place in places[:MAX_INSTITUTIONS_PER_SEARCH]]
+    started = time.perf_counter()
+    with span("edu_enrichment"):
+        await async_enrich_colleges(colleges, country)
+    print(f"Edu Fetcher: Enriched {len(colleges)} institutions in {time.perf_counter() - started:.2f}s.")
+    await asyncio.to_thread(_write_back_to_index, colleges, course_type, degree_level)
+    return colleges
+
+async def async_search_colleges_cached(country: str, course_type: str, degree_level: str = None):
+    """
+    Async search_colleges_cached: same result cache; concurrent identical searches await one leader.
+    If the leader is cancelled (its client went away), its followers search again themselves.
+    """
+    key = normalize_search_query_key(country, course_type, degree_level)
+    while True:
+        cached = search_results_cache.get(key)
+        if cached is not None:
+            return cached
+        in_flight = _async_search_in_flight.get(key)
+        if in_flight is None or in_flight.get_loop() is not asyncio.get_running_loop():
             break
-            
-    return colleges
\ No newline at end of file
+        results = await asyncio.shield(in_flight)
+        if results is not None:
+            return results
+
+    future = asyncio.get_running_loop().create_future()
+    _async_search_in_flight[key] = future
+    try:
+        results = await async_search_colleges_globally_api(country, course_type, degree_level)
+        if results and not any("error" in college for college in results):
+            _cache_search_results(key, results)
+        future.set_result(results)
+        return results
+    except asyncio.CancelledError:
+        future.set_result(None) # Not cancel(): that would cancel every follower's request too
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception() # Mark retrieved so an unawaited follower doesn't log it
+        raise
+    finally:
+        if _async_search_in_flight.get(key) is future:
+            del _async_search_in_flight[key]
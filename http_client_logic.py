@@ -0,0 +1,299 @@
+# /my_career_portal/http_client_logic.py
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics_logic import counter, histogram, register_collector
+
+# --- Client settings ---
+# Pool size per host defaults to the enrichment fan-out width so parallel lookups never queue for a socket.
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", str(int(os.getenv("EDU_ENRICH_MAX_WORKERS", "8")) + 2)))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.2"))
+HTTP_BACKOFF_MAX_SECONDS = float(os.getenv("HTTP_BACKOFF_MAX_SECONDS", "2.0"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("HTTP_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("HTTP_CIRCUIT_RESET_SECONDS", "30"))
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Async client (ASGI serving mode): connections shared by all in-flight requests of the event loop
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200"))
+ASYNC_HTTP_MAX_KEEPALIVE = int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "50"))
+
+# --- Prometheus metrics (per upstream host) ---
+UPSTREAM_DURATION = histogram("upstream_request_duration_seconds", "Outbound HTTP request latency per attempt.", ("host",))
+UPSTREAM_ERRORS = counter("upstream_errors", "Failed outbound HTTP attempts (reason: connection, status, request, circuit_open).", ("host", "reason"))
+UPSTREAM_RETRIES = counter("upstream_retries", "Outbound HTTP retries.", ("host",))
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without touching the network while a host's circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Per-host breaker: opens after CIRCUIT_FAILURE_THRESHOLD consecutive failures, rejects calls
+    for CIRCUIT_RESET_SECONDS, then lets a single trial call through (half-open).
+    """
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_seconds=CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+class HostMetrics:
+    def __init__(self, host: str = ""):
+        self.host = host
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.circuit_rejections = 0
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.status_codes = {}
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests, "errors": self.errors, "retries": self.retries,
+            "circuit_rejections": self.circuit_rejections,
+            "latency_avg_ms": round(self.latency_sum / self.latency_count * 1000, 2) if self.latency_count else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 2), "status_codes": dict(self.status_codes),
+        }
+
+class PooledHTTPClient:
+    """Keep-alive session per host with jittered exponential backoff, circuit breakers and metrics."""
+    def __init__(self, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=HTTP_MAX_RETRIES,
+                 backoff_base=HTTP_BACKOFF_BASE_SECONDS, backoff_max=HTTP_BACKOFF_MAX_SECONDS):
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sessions = {}
+        self._breakers = {}
+        self._metrics = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _session_for(self, host: str) -> requests.Session:
+        with self._lock:
+            if self._pid != os.getpid(): # Forked worker: never share sockets with the parent
+                self._sessions, self._pid = {}, os.getpid()
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def _breaker_and_metrics(self, host: str):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker()
+                self._metrics[host] = HostMetrics(host)
+            return self._breakers[host], self._metrics[host]
+
+    def _backoff_seconds(self, attempt: int, response=None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        # "Full jitter": uniform over [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url: str, params=None, headers=None, timeout=10) -> requests.Response:
+        """
+        Like requests.get, but pooled and retried. Returns the final response (callers still
+        call raise_for_status); raises requests exceptions, including CircuitOpenError.
+        """
+        host = urlsplit(url).netloc
+        breaker, metrics = self._breaker_and_metrics(host)
+        if not breaker.allow_request():
+            self.record_circuit_rejection(metrics)
+            raise CircuitOpenError(f"Circuit open for {host}; skipping request.")
+
+        session = self._session_for(host)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            response, error = None, None
+            try:
+                response = session.get(url, params=params, headers=headers, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except requests.exceptions.RequestException:
+                # Not retryable (bad URL, decoding...), but it must still settle a half-open breaker
+                breaker.record_failure()
+                self.record(metrics, error="request")
+                raise
+
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            self.record(metrics, time.perf_counter() - started, response.status_code if response is not None else None,
+                        error=("connection" if error is not None else "status") if retryable else None)
+
+            if not retryable:
+                breaker.record_success()
+                return response
+            if attempt >= self.max_retries:
+                breaker.record_failure()
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            self.record(metrics, retry=True)
+            time.sleep(self._backoff_seconds(attempt, response))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                host: {**self._metrics[host].as_dict(), "circuit_state": self._breakers[host].state}
+                for host in self._metrics
+            }
+
+    def record(self, metrics: HostMetrics, elapsed: float = None, status_code: int = None, error: str = None, retry: bool = False):
+        """
+        Records one attempt (or a retry) in the host's stats and the Prometheus metrics. `error` is
+        the failure reason ("connection", "status", "request") or None. Shared with the async client.
+        """
+        if retry:
+            with self._lock:
+                metrics.retries += 1
+            UPSTREAM_RETRIES.inc(host=metrics.host)
+            return
+        with self._lock:
+            metrics.requests += 1
+            if elapsed is not None:
+                metrics.latency_count += 1
+                metrics.latency_sum += elapsed
+                metrics.latency_max = max(metrics.latency_max, elapsed)
+            if status_code is not None:
+                metrics.status_codes[status_code] = metrics.status_codes.get(status_code, 0) + 1
+            if error:
+                metrics.errors += 1
+        if elapsed is not None:
+            UPSTREAM_DURATION.observe(elapsed, host=metrics.host)
+        if error:
+            UPSTREAM_ERRORS.inc(host=metrics.host, reason=error)
+
+    def record_circuit_rejection(self, metrics: HostMetrics):
+        with self._lock:
+            metrics.circuit_rejections += 1
+        UPSTREAM_ERRORS.inc(host=metrics.host, reason="circuit_open")
+
+class AsyncPooledHTTPClient:
+    """
+    asyncio counterpart of PooledHTTPClient on httpx (optional dependency). Retries, backoff and
+    per-host circuit breakers/metrics are shared with the sync client, so both serving modes see
+    the same upstream health. Raises httpx exceptions (and CircuitOpenError).
+    """
+    def __init__(self, sync_client: PooledHTTPClient):
+        self.sync_client = sync_client
+        self._clients = weakref.WeakKeyDictionary() # event loop -> httpx.AsyncClient
+
+    def _client_for_loop(self):
+        import httpx
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            limits = httpx.Limits(max_connections=ASYNC_HTTP_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_HTTP_MAX_KEEPALIVE)
+            # Callers beyond the connection limit wait on the semaphore: httpx's own pool queue
+            # gets slow (CPU-wise) when thousands of requests are parked in it.
+            entry = self._clients[loop] = (httpx.AsyncClient(limits=limits), asyncio.Semaphore(ASYNC_HTTP_MAX_CONNECTIONS))
+        return entry
+
+    async def get(self, url: str, params=None, headers=None, timeout=10):
+        import httpx
+        host = urlsplit(url).netloc
+        breaker, metrics = self.sync_client._breaker_and_metrics(host)
+        if not breaker.allow_request():
+            self.sync_client.record_circuit_rejection(metrics)
+            raise CircuitOpenError(f"Circuit open for {host}; skipping request.")
+
+        client, slots = self._client_for_loop()
+        attempt = 0
+        while True:
+            response, error = None, None
+            try:
+                async with slots:
+                    started = time.perf_counter()
+                    response = await client.get(url, params=params, headers=headers, timeout=timeout)
+            except httpx.TransportError as e: # Connect/read errors and timeouts
+                error = e
+            except httpx.HTTPError:
+                breaker.record_failure()
+                self.sync_client.record(metrics, error="request")
+                raise
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            self.sync_client.record(metrics, time.perf_counter() - started, response.status_code if response is not None else None,
+                                    error=("connection" if error is not None else "status") if retryable else None)
+
+            if not retryable:
+                breaker.record_success()
+                return response
+            if attempt >= self.sync_client.max_retries:
+                breaker.record_failure()
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            self.sync_client.record(metrics, retry=True)
+            await asyncio.sleep(self.sync_client._backoff_seconds(attempt, response))
+
+    async def aclose(self):
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].aclose()
+
+# Module-level shared client used by all outbound integrations
+http_client = PooledHTTPClient()
+async_http_client = AsyncPooledHTTPClient(http_client)
+
+def http_get(url: str, params=None, headers=None, timeout=10) -> requests.Response:
+    return http_client.get(url, params=params, headers=headers, timeout=timeout)
+
+async def async_http_get(url: str, params=None, headers=None, timeout=10):
+    return await async_http_client.get(url, params=params, headers=headers, timeout=timeout)
+
+def get_http_client_stats() -> dict:
+    return http_client.stats()
+
+def _collect_circuit_metrics():
+    return [("upstream_circuit_open", "gauge", "1 while the host's circuit breaker rejects requests.",
+             [({"host": host}, 0 if stats["circuit_state"] == "closed" else 1) for host, stats in http_client.stats().items()])]
+
+register_collector(_collect_circuit_metrics)
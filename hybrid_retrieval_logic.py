@@ -0,0 +1,192 @@
+# /my_career_portal/hybrid_retrieval_logic.py
+"""
+Hybrid retriever for the career chatbot: an in-memory BM25 keyword index and the vector store
+each return their best candidates, Reciprocal Rank Fusion merges the two rankings, and a cheap
+CPU reranker scores the fused candidates (embedding cosine blended with idf-weighted coverage of
+the question's terms). Only candidates at or above CHATBOT_RERANK_THRESHOLD are returned, so an
+out-of-corpus question gets no context at all and the pipeline can go straight to the general
+answer instead of paying for a refine call that would only fall back.
+
+The BM25 index and the corpus embeddings are built from the vector store at initialization
+(Chroma collection or NumpyVectorIndex); nothing is added to the ingestion step.
+"""
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, List
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from metrics_logic import counter
+from vector_index_logic import NumpyVectorIndex, _normalize_rows, _top_k
+
+logger = logging.getLogger(__name__)
+
+# --- Settings ---
+HYBRID_CANDIDATES = int(os.getenv("CHATBOT_HYBRID_CANDIDATES", "20")) # Per side, before fusion
+HYBRID_RRF_K = 60 # Reciprocal Rank Fusion damping; 60 is the usual choice
+RERANK_POOL = int(os.getenv("CHATBOT_RERANK_POOL", "10")) # Fused candidates that get reranked
+RERANK_THRESHOLD = float(os.getenv("CHATBOT_RERANK_THRESHOLD", "0.3")) # Relevance in [0, 1]; below it a chunk is not context
+RERANK_SEMANTIC_WEIGHT = float(os.getenv("CHATBOT_RERANK_SEMANTIC_WEIGHT", "0.7")) # Cosine share of the relevance score
+BM25_K1, BM25_B = 1.5, 0.75
+
+RETRIEVAL_OUTCOMES = counter("chatbot_hybrid_retrievals", "Hybrid retrievals by outcome (context or below_threshold).", ("outcome",))
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#][a-z0-9+#]*)?")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can could do does for from had has have how i if in into is it its me my of on or our "
+    "should so than that the their them then there these they this to was we were what when where which who why will "
+    "with would you your".split())
+
+# --- Keyword index ---
+def _stem(word: str) -> str:
+    """Crude suffix stripping so "interviews"/"interviewing" match "interview"."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ed"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def tokenize(text: str) -> list:
+    return [_stem(token) for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of texts, with postings lists held in memory."""
+    def __init__(self, texts):
+        self.doc_terms = [Counter(tokenize(text)) for text in texts]
+        self.doc_lengths = [sum(terms.values()) for terms in self.doc_terms]
+        self.average_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        self.postings = {} # term -> [(doc, term frequency)]
+        for doc, terms in enumerate(self.doc_terms):
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, []).append((doc, frequency))
+        count = len(self.doc_terms)
+        self.idf = {term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5)) for term, docs in self.postings.items()}
+        self.unseen_idf = math.log(1 + (count + 0.5) / 0.5) # Terms absent from the corpus are the most specific of all
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def search(self, query_terms, k: int):
+        """[(doc, score)] for the k best-scoring documents, best first."""
+        scores = {}
+        for term in set(query_terms):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, frequency in self.postings[term]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc] / (self.average_length or 1.0))
+                scores[doc] = scores.get(doc, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+    def coverage(self, query_terms, doc: int) -> float:
+        """Share of the query's idf mass whose terms appear in the document (0..1)."""
+        terms = set(query_terms)
+        total = sum(self.idf.get(term, self.unseen_idf) for term in terms)
+        if not total:
+            return 0.0
+        return sum(self.idf[term] for term in terms if term in self.doc_terms[doc]) / total
+
+# --- Vector side ---
+class _MatrixVectors:
+    """Exact cosine search over corpus embeddings held in memory (used for Chroma collections)."""
+    def __init__(self, embeddings):
+        self.embeddings = _normalize_rows(embeddings)
+
+    def search(self, query_vector, k):
+        scores = self.embeddings @ query_vector
+        return [(int(row), float(scores[row])) for row in _top_k(scores, k)]
+
+    def similarities(self, query_vector, rows):
+        return self.embeddings[rows] @ query_vector
+
+class _IndexVectors:
+    """A NumpyVectorIndex's own (memory-mapped) embeddings; its row order is the corpus order."""
+    def __init__(self, index: NumpyVectorIndex):
+        self.index = index
+
+    def search(self, query_vector, k):
+        return self.index.search(query_vector, k)
+
+    def similarities(self, query_vector, rows):
+        order = np.argsort(rows)
+        scores = np.empty(len(rows), dtype=np.float32)
+        scores[order] = self.index.embeddings[np.asarray(rows)[order]] @ query_vector # Sorted reads from the memory map
+        return scores
+
+# --- Retriever ---
+def fuse_rankings(*rankings, k: int = HYBRID_RRF_K) -> list:
+    """Reciprocal Rank Fusion of [(doc, score)] lists (best first): [(doc, fused score)], best first."""
+    fused = {}
+    for ranking in rankings:
+        for rank, (doc, _score) in enumerate(ranking):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: -item[1])
+
+class HybridRetriever(BaseRetriever):
+    """langchain retriever: BM25 + vector candidates, RRF fusion, reranked and thresholded. May return []."""
+    texts: List[str]
+    metadatas: List[dict]
+    bm25: Any
+    vectors: Any
+    embeddings: Any
+    k: int = 3
+    candidates: int = HYBRID_CANDIDATES
+    rerank_pool: int = RERANK_POOL
+    threshold: float = RERANK_THRESHOLD
+    semantic_weight: float = RERANK_SEMANTIC_WEIGHT
+
+    def score(self, query: str) -> list:
+        """[(doc, relevance)] for the reranked pool, best first, before thresholding."""
+        query_terms = tokenize(query)
+        query_vector = _normalize_rows(np.asarray(self.embeddings.embed_query(query), dtype=np.float32).reshape(1, -1))[0]
+        fused = fuse_rankings(self.vectors.search(query_vector, self.candidates), self.bm25.search(query_terms, self.candidates))
+        pool = [doc for doc, _ in fused[:self.rerank_pool]]
+        if not pool:
+            return []
+        cosines = self.vectors.similarities(query_vector, pool)
+        scored = [(doc, self.semantic_weight * max(0.0, float(cosine)) + (1 - self.semantic_weight) * self.bm25.coverage(query_terms, doc))
+                  for doc, cosine in zip(pool, cosines)]
+        return sorted(scored, key=lambda item: -item[1])
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        relevant = [(doc, relevance) for doc, relevance in self.score(query) if relevance >= self.threshold][:self.k]
+        RETRIEVAL_OUTCOMES.inc(outcome="context" if relevant else "below_threshold")
+        return [Document(page_content=self.texts[doc], metadata={**(self.metadatas[doc] or {}), "relevance": round(relevance, 3)})
+                for doc, relevance in relevant]
+
+def _load_corpus(vector_store, page_size=5000):
+    """(texts, metadatas, vector side) from a Chroma vector store or a NumpyVectorIndex."""
+    if isinstance(vector_store, NumpyVectorIndex):
+        documents = [vector_store.get_document(row) for row in range(len(vector_store))]
+        return [d.page_content for d in documents], [d.metadata for d in documents], _IndexVectors(vector_store)
+    collection = vector_store._collection
+    texts, metadatas, vectors = [], [], []
+    for offset in range(0, collection.count(), page_size):
+        page = collection.get(include=["documents", "metadatas", "embeddings"], limit=page_size, offset=offset)
+        texts.extend(page["documents"])
+        metadatas.extend(page["metadatas"] or [{}] * len(page["documents"]))
+        vectors.extend(page["embeddings"])
+    return texts, metadatas, _MatrixVectors(np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1))
+
+def build_hybrid_retriever(vector_store, embeddings, k: int = 3, **settings) -> HybridRetriever:
+    texts, metadatas, vectors = _load_corpus(vector_store)
+    retriever = HybridRetriever(texts=texts, metadatas=metadatas, bm25=BM25Index(texts), vectors=vectors,
+                                embeddings=embeddings, k=k, **settings)
+    logger.info(f"Hybrid retriever ready: {len(texts)} chunks, {len(retriever.bm25.postings)} terms, threshold {retriever.threshold}.")
+    return retriever
+
+def build_hybrid_retriever_from_texts(texts, embeddings, metadatas=None, k: int = 3, **settings) -> HybridRetriever:
+    """Same retriever over an in-memory corpus (embedded here); used by the retrieval benchmark."""
+    vectors = _MatrixVectors(np.asarray(embeddings.embed_documents(list(texts)), dtype=np.float32))
+    return HybridRetriever(texts=list(texts), metadatas=list(metadatas or [{}] * len(texts)), bm25=BM25Index(texts),
+                           vectors=vectors, embeddings=embeddings, k=k, **settings)
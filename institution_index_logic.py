@@ -0,0 +1,245 @@
+# /my_career_portal/institution_index_logic.py
+"""
+Local institution catalog for the education fetcher, stored in SQLite with an FTS5 index
+over names and fields of study. Build it from a JSON/CSV dump with the CLI below; the
+fetcher also writes Google Places results back into it as searches come in.
+
+    python institution_index_logic.py load institutions.json --db data/institutions.db
+    python institution_index_logic.py search --db data/institutions.db --field "Computer Science" --country USA
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from cache_logic import SQLiteConnections
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+LIST_FIELD_SEPARATOR = ";" # For list columns (fields, degree_levels) in CSV dumps
+# Spellings of the same country that users type and Places prints at the end of addresses
+_COUNTRY_ALIASES = {
+    "us": "united states", "usa": "united states", "united states of america": "united states", "america": "united states",
+    "uk": "united kingdom", "great britain": "united kingdom", "britain": "united kingdom", "england": "united kingdom",
+    "uae": "united arab emirates", "korea": "south korea", "republic of korea": "south korea",
+}
+
+def _normalize(value) -> str:
+    return " ".join(str(value or "").lower().split())
+
+def country_key(value) -> str:
+    """Canonical country name for matching: case, dots and known aliases folded ("U.S.A." -> "united states")."""
+    key = _normalize(value).replace(".", "")
+    return _COUNTRY_ALIASES.get(key, key)
+
+def address_country_key(address) -> str:
+    """country_key of an address's last comma-separated part, without postcodes ("..., Singapore 119077" -> "singapore")."""
+    last_part = str(address or "").rsplit(",", 1)[-1]
+    return country_key(" ".join(word for word in last_part.split() if not any(ch.isdigit() for ch in word)))
+
+def _as_list(value) -> list:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(LIST_FIELD_SEPARATOR) if LIST_FIELD_SEPARATOR in value else value.split(",")
+    return [item.strip() for item in value if item and str(item).strip()]
+
+def _tokens(text: str) -> list:
+    return _TOKEN_RE.findall((text or "").lower())
+
+class InstitutionIndex:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = SQLiteConnections(path, row_factory=sqlite3.Row)
+        self._write_lock = threading.Lock()
+        conn = self._db.connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS institutions (
+                id INTEGER PRIMARY KEY,
+                name_key TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL, address TEXT, country TEXT, country_key TEXT,
+                fields TEXT, degree_levels TEXT, website TEXT, rating REAL,
+                image_url TEXT, description TEXT, source TEXT, updated_at REAL, address_country_key TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS institutions_fts USING fts5(name, fields, address, tokenize='unicode61');
+        """)
+        self._migrate_country_keys(conn)
+        conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_institutions_country ON institutions(country_key);
+            CREATE INDEX IF NOT EXISTS idx_institutions_address_country ON institutions(address_country_key);
+        """)
+
+    def _migrate_country_keys(self, conn):
+        """Catalogs built before address_country_key existed: add it and re-key countries with the alias map."""
+        if any(column["name"] == "address_country_key" for column in conn.execute("PRAGMA table_info(institutions)")):
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("ALTER TABLE institutions ADD COLUMN address_country_key TEXT")
+            for row in conn.execute("SELECT id, name, address, country FROM institutions").fetchall():
+                key = country_key(row["country"])
+                conn.execute("UPDATE institutions SET country_key = ?, address_country_key = ? WHERE id = ?",
+                             (key, address_country_key(row["address"]), row["id"]))
+                # A row that now collides with another spelling of the same country keeps its old name_key
+                conn.execute("UPDATE OR IGNORE institutions SET name_key = ? WHERE id = ?", (f"{_normalize(row['name'])}|{key}", row["id"]))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def upsert_many(self, records, source: str = "dump") -> int:
+        """
+        Inserts or merges institutions. Existing rows (same normalized name + country) keep their
+        data; fields and degree levels are unioned and empty columns are filled in.
+        """
+        conn = self._db.connection()
+        count = 0
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for record in records:
+                    if self._upsert_one(conn, record, source):
+                        count += 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def _upsert_one(self, conn, record: dict, source: str) -> bool:
+        name = (record.get("name") or "").strip()
+        if not name or name == "N/A":
+            return False
+        record_country_key = country_key(record.get("country"))
+        name_key = f"{_normalize(name)}|{record_country_key}"
+        fields = _as_list(record.get("fields") or record.get("programs"))
+        degrees = [_normalize(d) for d in _as_list(record.get("degree_levels"))]
+
+        existing = conn.execute("SELECT * FROM institutions WHERE name_key = ?", (name_key,)).fetchone()
+        if existing is not None:
+            fields = list(dict.fromkeys(_as_list(existing["fields"]) + fields))
+            degrees = list(dict.fromkeys(_as_list(existing["degree_levels"]) + degrees))
+            def keep(column):
+                return existing[column] if existing[column] not in (None, "") else record.get(column)
+            values = {column: keep(column) for column in ("address", "website", "rating", "image_url", "description")}
+            conn.execute(
+                "UPDATE institutions SET fields = ?, degree_levels = ?, address = ?, website = ?, rating = ?,"
+                " image_url = ?, description = ?, updated_at = ?, address_country_key = ? WHERE id = ?",
+                (LIST_FIELD_SEPARATOR.join(fields), LIST_FIELD_SEPARATOR.join(degrees), values["address"], values["website"],
+                 values["rating"], values["image_url"], values["description"], time.time(),
+                 address_country_key(values["address"]), existing["id"]),
+            )
+            conn.execute("DELETE FROM institutions_fts WHERE rowid = ?", (existing["id"],))
+            rowid, address = existing["id"], values["address"]
+        else:
+            address = record.get("address") or record.get("formatted_address")
+            cursor = conn.execute(
+                "INSERT INTO institutions (name_key, name, address, country, country_key, fields, degree_levels,"
+                " website, rating, image_url, description, source, updated_at, address_country_key)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (name_key, name, address, record.get("country"), record_country_key,
+                 LIST_FIELD_SEPARATOR.join(fields), LIST_FIELD_SEPARATOR.join(degrees), record.get("website"),
+                 record.get("rating"), record.get("image_url"), record.get("description"), source, time.time(),
+                 address_country_key(address)),
+            )
+            rowid = cursor.lastrowid
+        conn.execute(
+            "INSERT INTO institutions_fts (rowid, name, fields, address) VALUES (?, ?, ?, ?)",
+            (rowid, name, " ".join(fields), address or ""),
+        )
+        return True
+
+    def search(self, country: str = "", course_type: str = "", degree_level: str = None, limit: int = 8) -> list:
+        """
+        Institutions whose name/fields match every token of course_type, filtered by country
+        (the record's country or the address's last part, aliases folded; never a substring match)
+        and degree level (institutions with no recorded levels match any).
+        """
+        clauses, params = [], []
+        field_tokens = _tokens(course_type)
+        if field_tokens:
+            clauses.append("i.id IN (SELECT rowid FROM institutions_fts WHERE institutions_fts MATCH ?)")
+            params.append(" AND ".join(f'{{name fields}} : "{token}"' for token in field_tokens))
+        wanted_country = country_key(country)
+        if wanted_country:
+            clauses.append("(i.country_key = ? OR i.address_country_key = ?)")
+            params.extend([wanted_country, wanted_country])
+        degree_key = _normalize(degree_level)
+        if degree_key and degree_key != "any":
+            clauses.append("(i.degree_levels = '' OR i.degree_levels IS NULL OR lower(i.degree_levels) LIKE ?)")
+            params.append(f"%{degree_key}%")
+        where = " AND ".join(clauses) if clauses else "1 = 1"
+        rows = self._db.connection().execute(
+            f"SELECT * FROM institutions i WHERE {where} ORDER BY i.rating IS NULL, i.rating DESC, i.name LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        return self._db.connection().execute("SELECT COUNT(*) FROM institutions").fetchone()[0]
+
+def load_institution_records(path: str) -> list:
+    """Reads a JSON array/JSON Lines/CSV dump into a list of institution dicts."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return [dict(row) for row in csv.DictReader(f)]
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+_shared_indexes = {}
+_shared_indexes_lock = threading.Lock()
+
+def get_institution_index(path: str):
+    """Returns one InstitutionIndex per path, or None when the catalog is disabled/unavailable."""
+    if not path:
+        return None
+    with _shared_indexes_lock:
+        if path not in _shared_indexes:
+            try:
+                _shared_indexes[path] = InstitutionIndex(path)
+            except (sqlite3.Error, OSError) as e:
+                print(f"WARNING (Institution Index): could not open '{path}', catalog disabled: {e}")
+                _shared_indexes[path] = None
+        return _shared_indexes[path]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the local institution catalog.")
+    parser.add_argument("--db", default=os.getenv("EDU_INDEX_PATH", "data/institutions.db"))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    load_parser = subparsers.add_parser("load", help="Load institutions from JSON, JSON Lines or CSV")
+    load_parser.add_argument("paths", nargs="+")
+    search_parser = subparsers.add_parser("search", help="Run a catalog search")
+    search_parser.add_argument("--country", default="")
+    search_parser.add_argument("--field", default="")
+    search_parser.add_argument("--degree", default=None)
+    search_parser.add_argument("--limit", type=int, default=8)
+    subparsers.add_parser("stats", help="Print catalog size")
+    args = parser.parse_args()
+
+    index = InstitutionIndex(args.db)
+    if args.command == "load":
+        for path in args.paths:
+            started = time.perf_counter()
+            records = load_institution_records(path)
+            loaded = index.upsert_many(records, source=os.path.basename(path))
+            print(f"Loaded {loaded}/{len(records)} institutions from {path} in {time.perf_counter() - started:.2f}s.")
+        print(f"Catalog now holds {index.count()} institutions.")
+    elif args.command == "search":
+        started = time.perf_counter()
+        results = index.search(args.country, args.field, args.degree, args.limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for row in results:
+            print(f"- {row['name']} ({row['country'] or 'N/A'}) rating={row['rating']} fields={row['fields']}")
+        print(f"{len(results)} results in {elapsed_ms:.2f}ms")
+    else:
+        print(f"{index.count()} institutions in {args.db}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# /my_career_portal/metrics_logic.py
+"""
+In-process metrics: labelled counters and latency histograms, `span()` timers around pipeline
+stages, Prometheus text exposition for /metrics, and an optional per-request Server-Timing header.
+
+Metrics live in the process that records them. Under gunicorn every worker reports its own
+numbers, so scrape each worker (or run one worker per container); cache and upstream stats that
+already exist elsewhere are exported through collectors at scrape time rather than duplicated.
+"""
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+SERVER_TIMING_ENABLED = os.getenv("METRICS_SERVER_TIMING", "0") == "1" # Adds a Server-Timing header to every response
+# Seconds; Prometheus "le" upper bounds (+Inf is implicit)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics = {} # name -> Counter/Histogram, in registration order
+_collectors = [] # callables returning [(name, type, help, [(labels dict, value)])]
+_registry_lock = threading.Lock()
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic count per label set."""
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name, self.help_text, self.label_names = name, help_text, tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(tuple(str(labels.get(name, "")) for name in self.label_names), 0)
+
+    def exposition(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}_total{_format_labels(dict(zip(self.label_names, key)))} {_format_value(value)}"
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set, plus sum and count."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help_text, self.label_names = name, help_text, tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {} # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self, **labels):
+        """{"count", "sum"} for one label set (zeros if never observed)."""
+        with self._lock:
+            series = self._series.get(tuple(str(labels.get(name, "")) for name in self.label_names))
+            return {"count": series[-1], "sum": series[-2]} if series else {"count": 0, "sum": 0.0}
+
+    def exposition(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels({**labels, 'le': repr(float(bound))})} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(labels)} {series[-1]}"
+
+def _get_or_create(cls, name, help_text, label_names, **kwargs):
+    with _registry_lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, help_text, label_names, **kwargs)
+        return metric
+
+def counter(name: str, help_text: str, label_names=()) -> Counter:
+    """The process-wide counter `name` (exported as name_total), created on first use."""
+    return _get_or_create(Counter, name, help_text, label_names)
+
+def histogram(name: str, help_text: str, label_names=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(Histogram, name, help_text, label_names, buckets=buckets)
+
+def register_collector(collect):
+    """collect() -> [(name, "counter"|"gauge", help, [(labels dict, value)])], called on every scrape."""
+    with _registry_lock:
+        _collectors.append(collect)
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with _registry_lock:
+        metrics, collectors = list(_metrics.values()), list(_collectors)
+    for metric in metrics:
+        exported_name = f"{metric.name}_total" if metric.type_name == "counter" else metric.name
+        lines.append(f"# HELP {exported_name} {metric.help_text}")
+        lines.append(f"# TYPE {exported_name} {metric.type_name}")
+        lines.extend(metric.exposition())
+    for collect in collectors:
+        try:
+            families = collect()
+        except Exception as e: # A broken collector must not take /metrics down
+            print(f"Metrics: collector {getattr(collect, '__name__', collect)} failed: {e}")
+            continue
+        for name, type_name, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {type_name}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+# --- Stage spans ---
+STAGE_DURATION = histogram("stage_duration_seconds", "Time spent per pipeline stage.", ("stage",))
+STAGE_ERRORS = counter("stage_errors", "Stages that raised.", ("stage",))
+
+class RequestTimings:
+    """Stage durations of one request, for the Server-Timing header. Shared with worker threads."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages = {} # stage -> [seconds, calls]
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def server_timing_header(self) -> str:
+        """e.g. `places;dur=120.4, wikipedia;dur=310.2;desc="8 calls", total;dur=702.9`. Parallel calls are summed."""
+        with self._lock:
+            stages = list(self._stages.items())
+        parts = [f'{stage};dur={seconds * 1000:.1f}' + (f';desc="{calls} calls"' if calls > 1 else "")
+                 for stage, (seconds, calls) in stages]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+def start_request_timings() -> RequestTimings:
+    """Starts collecting stage timings for the current request (context-local)."""
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+def current_request_timings():
+    return _request_timings.get()
+
+def record_stage(stage: str, seconds: float):
+    STAGE_DURATION.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+@contextlib.contextmanager
+def span(stage: str):
+    """Times the enclosed block as `stage` (histogram + Server-Timing); exceptions are counted and re-raised."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """executor.submit that carries the caller's context (and so its request timings) into the worker thread."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
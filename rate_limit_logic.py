@@ -0,0 +1,195 @@
+# /my_career_portal/rate_limit_logic.py
+"""
+Token-bucket rate limits, kept in one SQLite file so every gunicorn/uvicorn worker on the host
+draws from the same buckets:
+
+- per client and endpoint group (search, chat, ai_summary, resume): a client that runs its
+  bucket dry gets 429 with Retry-After (see app.py / asgi_app.py);
+- per upstream (places, wikipedia, unsplash, gemini), shared by all clients: when the budget is
+  spent, callers degrade instead of calling out (no Wikipedia/Unsplash enrichment, cached or
+  catalog answers only, a "try again later" reply instead of a model call).
+
+Rates are "<count>/<second|minute|hour|day>": a bucket holds <count> tokens and refills evenly
+over the period, so bursts up to <count> are allowed. An empty rate (or "0") means no limit.
+If the shared store cannot be used, requests are let through (limits must never take the site down).
+"""
+import asyncio
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from cache_logic import SQLiteConnections
+from metrics_logic import counter
+
+# --- Settings ---
+RATE_LIMITS_ENABLED = os.getenv("RATE_LIMITS_ENABLED", "1") == "1"
+# Shared by all workers on the host; empty = per-process buckets in memory
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "career_portal_rate_limits.sqlite3"))
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1" # Identify clients by X-Forwarded-For (only behind our own proxy)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class Rate:
+    """Bucket size and refill speed parsed from "<count>/<period>"."""
+    def __init__(self, spec: str):
+        self.spec = spec
+        count, _, period = spec.partition("/")
+        self.capacity = float(count)
+        self.per_second = self.capacity / _PERIODS[period.strip().lower() or "second"]
+
+    def __repr__(self):
+        return f"Rate({self.spec!r})"
+
+def parse_rate(spec: str):
+    """Rate for a spec, or None (unlimited) for "" / "0"."""
+    spec = (spec or "").strip()
+    if not spec or spec.split("/")[0].strip() in ("0", "0.0"):
+        return None
+    return Rate(spec)
+
+# Per client. Batch endpoints spend one token per item; a search costs up to 17 upstream calls.
+CLIENT_LIMITS = {
+    "search": parse_rate(os.getenv("RATE_LIMIT_SEARCH", "20/minute")),
+    "chat": parse_rate(os.getenv("RATE_LIMIT_CHAT", "20/minute")),
+    "ai_summary": parse_rate(os.getenv("RATE_LIMIT_AI_SUMMARY", "30/minute")),
+    "resume": parse_rate(os.getenv("RATE_LIMIT_RESUME", "60/minute")),
+}
+# Whole site. Defaults follow the free tiers; set them to the quota actually bought.
+UPSTREAM_BUDGETS = {
+    "places": parse_rate(os.getenv("UPSTREAM_BUDGET_PLACES", "1000/day")),
+    "wikipedia": parse_rate(os.getenv("UPSTREAM_BUDGET_WIKIPEDIA", "6000/hour")),
+    "unsplash": parse_rate(os.getenv("UPSTREAM_BUDGET_UNSPLASH", "50/hour")), # Unsplash demo apps: 50 requests/hour
+    "gemini": parse_rate(os.getenv("UPSTREAM_BUDGET_GEMINI", "1500/day")),
+}
+
+RATE_LIMIT_DECISIONS = counter("rate_limit_requests", "Rate-limited requests by endpoint group and outcome (allowed, rejected, error).", ("group", "outcome"))
+UPSTREAM_BUDGET_DECISIONS = counter("upstream_budget_calls", "Upstream calls by budget outcome (allowed, exhausted = degraded, error).", ("upstream", "outcome"))
+
+# --- Bucket stores ---
+class MemoryBucketStore:
+    """Buckets in this process only (RATE_LIMIT_SQLITE_PATH empty, or the file could not be opened)."""
+    def __init__(self):
+        self._buckets = {} # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: Rate, cost: float = 1.0) -> float:
+        """Spends `cost` tokens; returns 0.0 if granted, else seconds until they would be available."""
+        with self._lock:
+            now = time.time()
+            tokens, retry_after = _spend(self._buckets.get(key), rate, cost, now)
+            self._buckets[key] = (tokens, now)
+            return retry_after
+
+class SQLiteBucketStore:
+    """
+    Buckets in a SQLite file. Each take is one short write transaction (BEGIN IMMEDIATE), so
+    concurrent workers serialize on the file lock instead of double-spending tokens.
+    """
+    PURGE_INTERVAL_SECONDS = 300
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = SQLiteConnections(path, timeout=2)
+        self._last_purge = 0.0
+        self._db.connection().execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+
+    def take(self, key: str, rate: Rate, cost: float = 1.0) -> float:
+        conn = self._db.connection()
+        now = time.time() # Wall clock: shared by every process on the host
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, retry_after = _spend(row, rate, cost, now)
+            conn.execute("INSERT OR REPLACE INTO token_buckets (key, tokens, updated_at) VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if now - self._last_purge > self.PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            self.purge_idle(now)
+        return retry_after
+
+    def purge_idle(self, now: float = None, max_idle: float = 86400) -> int:
+        """Drops buckets untouched for max_idle seconds (they would be full again anyway for rates up to /day)."""
+        cursor = self._db.connection().execute("DELETE FROM token_buckets WHERE updated_at < ?", ((now or time.time()) - max_idle,))
+        return cursor.rowcount
+
+def _spend(row, rate: Rate, cost: float, now: float):
+    """(tokens left, retry_after) after trying to spend `cost` from a bucket stored as (tokens, updated_at)."""
+    cost = min(cost, rate.capacity) # A batch larger than the burst drains the bucket rather than never passing
+    tokens = rate.capacity if row is None else min(rate.capacity, row[0] + max(0.0, now - row[1]) * rate.per_second)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate.per_second
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_bucket_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MemoryBucketStore()
+            if RATE_LIMIT_SQLITE_PATH:
+                try:
+                    _store = SQLiteBucketStore(RATE_LIMIT_SQLITE_PATH)
+                except (sqlite3.Error, OSError) as e:
+                    print(f"WARNING (Rate limits): could not open shared bucket store at '{RATE_LIMIT_SQLITE_PATH}', limits are per worker: {e}")
+        return _store
+
+# --- Client limits ---
+def client_id(remote_addr: str, forwarded_for: str = None) -> str:
+    """The address a client is limited by; the first X-Forwarded-For hop when RATE_LIMIT_TRUST_PROXY=1."""
+    if RATE_LIMIT_TRUST_PROXY and forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    return remote_addr or "unknown"
+
+def check_client_limit(group: str, client: str, cost: float = 1.0) -> float:
+    """Spends `cost` from the client's `group` bucket; returns 0.0 if allowed, else Retry-After seconds."""
+    rate = CLIENT_LIMITS.get(group)
+    if not RATE_LIMITS_ENABLED or rate is None:
+        return 0.0
+    try:
+        retry_after = get_bucket_store().take(f"client:{group}:{client}", rate, cost)
+    except sqlite3.Error as e:
+        print(f"WARNING (Rate limits): bucket store failed, allowing request: {e}")
+        RATE_LIMIT_DECISIONS.inc(group=group, outcome="error")
+        return 0.0
+    RATE_LIMIT_DECISIONS.inc(group=group, outcome="rejected" if retry_after else "allowed")
+    return retry_after
+
+async def acheck_client_limit(group: str, client: str, cost: float = 1.0) -> float:
+    """check_client_limit for async code: the SQLite write (up to a 2s lock wait) runs off the event loop."""
+    return await asyncio.to_thread(check_client_limit, group, client, cost)
+
+def retry_after_header(retry_after: float) -> str:
+    return str(max(1, math.ceil(retry_after)))
+
+def rate_limited_body(retry_after: float) -> dict:
+    """JSON body of a 429 (both serving modes); Retry-After carries the same number of seconds."""
+    return {"error": "Too many requests. Please slow down and retry shortly.", "retry_after": int(retry_after_header(retry_after))}
+
+# --- Upstream budgets ---
+def acquire_upstream(upstream: str, cost: float = 1.0) -> bool:
+    """Spends `cost` calls of an upstream's site-wide budget; False means skip the call and degrade."""
+    rate = UPSTREAM_BUDGETS.get(upstream)
+    if not RATE_LIMITS_ENABLED or rate is None:
+        return True
+    try:
+        allowed = get_bucket_store().take(f"upstream:{upstream}", rate, cost) == 0.0
+    except sqlite3.Error as e:
+        print(f"WARNING (Rate limits): bucket store failed, allowing {upstream} call: {e}")
+        UPSTREAM_BUDGET_DECISIONS.inc(upstream=upstream, outcome="error")
+        return True
+    UPSTREAM_BUDGET_DECISIONS.inc(upstream=upstream, outcome="allowed" if allowed else "exhausted")
+    return allowed
+
+async def aacquire_upstream(upstream: str, cost: float = 1.0) -> bool:
+    """acquire_upstream for async code, off the event loop."""
+    return await asyncio.to_thread(acquire_upstream, upstream, cost)
@@ -0,0 +1,223 @@
+# /my_career_portal/resume_batch_logic.py
+"""
+Batch resume rendering (e.g. a whole graduating cohort) on a pool of worker processes.
+Each payload goes through the same normalize_resume_payload/generate_resume_pdf_from_data
+path as the single-resume endpoint; a failing item is reported without stopping the batch.
+
+    python resume_batch_logic.py cohort.jsonl --zip cohort_resumes.zip
+    python resume_batch_logic.py cohort.jsonl --out-dir generated_resumes/cohort --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from resume_builder_logic import normalize_resume_payload, render_resume_pdf_bytes, render_resume_pdf_file, \
+    content_addressed_resume_path, find_rendered_resume_file, remember_rendered_resume_file
+
+# --- Batch settings ---
+RESUME_BATCH_WORKERS = int(os.getenv("RESUME_BATCH_WORKERS", str(os.cpu_count() or 2)))
+RESUME_BATCH_MAX_ITEMS = int(os.getenv("RESUME_BATCH_MAX_ITEMS", "500")) # Per API request
+RESUME_BATCH_START_METHOD = os.getenv("RESUME_BATCH_START_METHOD", os.getenv("RESUME_JOB_START_METHOD", "spawn"))
+MANIFEST_NAME = "manifest.json"
+
+_batch_executor = None
+_batch_executor_pid = None
+_batch_executor_lock = threading.Lock()
+
+def _get_batch_executor():
+    # Shared across API requests; created lazily, and again in a forked web worker
+    global _batch_executor, _batch_executor_pid
+    with _batch_executor_lock:
+        if _batch_executor is None or _batch_executor_pid != os.getpid():
+            context = multiprocessing.get_context(RESUME_BATCH_START_METHOD)
+            _batch_executor = ProcessPoolExecutor(max_workers=RESUME_BATCH_WORKERS, mp_context=context)
+            _batch_executor_pid = os.getpid()
+        return _batch_executor
+
+def _safe_name(data):
+    name = str(data.get('name') or 'user')
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name.replace(' ', '_'))[:60] or "user"
+
+def batch_entry_filename(index, data):
+    """Stable per-item file name inside a batch: 0007_resume_Jane_Doe.pdf."""
+    return f"{index:04d}_resume_{_safe_name(data)}.pdf"
+
+def _render_batch_item(index, data, output_path=None):
+    # Runs in a worker process. Returns a plain dict so results pickle cheaply.
+    try:
+        if output_path:
+            path = render_resume_pdf_file(data, output_path)
+            return {"index": index, "ok": bool(path), "path": path, "pdf": None,
+                    "error": None if path else "Failed to render resume PDF."}
+        pdf_bytes = render_resume_pdf_bytes(data)
+        return {"index": index, "ok": bool(pdf_bytes), "path": None, "pdf": pdf_bytes,
+                "error": None if pdf_bytes else "Failed to render resume PDF."}
+    except Exception as e:
+        return {"index": index, "ok": False, "path": None, "pdf": None, "error": f"Resume rendering failed: {e}"}
+
+def iter_batch_renders(payloads, output_dir=None, executor=None, max_in_flight=None):
+    """
+    Renders payloads in parallel and yields one result dict per item, in completion order:
+    {"index", "name", "filename", "ok", "pdf" (bytes, when rendering in memory), "path", "error", "cached"}.
+    With output_dir, PDFs are written there under content-addressed names and an identical
+    payload that was already rendered is reused. Invalid items are yielded as errors right away.
+    """
+    executor = executor or _get_batch_executor()
+    max_in_flight = max_in_flight or max(2, getattr(executor, "_max_workers", RESUME_BATCH_WORKERS) * 2)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    in_flight = {}
+    items = iter(enumerate(payloads))
+
+    def finish(result, data):
+        result["name"] = data.get('name', 'N/A') if isinstance(data, dict) else 'N/A'
+        if not result["ok"]:
+            result["filename"] = None
+        else:
+            result["filename"] = os.path.basename(result["path"]) if result.get("path") else batch_entry_filename(result["index"], data)
+        result.setdefault("cached", False)
+        if result.get("path") and result["ok"] and not result["cached"]:
+            remember_rendered_resume_file(result["path"])
+        return result
+
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < max_in_flight: # Bounded, so huge batches don't sit in memory
+            try:
+                index, data = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+            if not isinstance(data, dict) or not data:
+                yield finish({"index": index, "ok": False, "path": None, "pdf": None,
+                              "error": "Resume payload must be a non-empty JSON object."}, data)
+                continue
+            try:
+                data = normalize_resume_payload(data)
+                output_path = content_addressed_resume_path(data, output_dir) if output_dir else None
+            except Exception as e: # Malformed sections (e.g. "projects": [1]) fail this item only
+                yield finish({"index": index, "ok": False, "path": None, "pdf": None,
+                              "error": f"Invalid resume payload: {e}"}, data)
+                continue
+            if output_path and find_rendered_resume_file(output_path):
+                yield finish({"index": index, "ok": True, "path": output_path, "pdf": None, "error": None, "cached": True}, data)
+                continue
+            future = executor.submit(_render_batch_item, index, data, output_path)
+            in_flight[future] = (index, data)
+        if not in_flight:
+            return
+        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+        for future in done:
+            index, data = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e: # BrokenProcessPool if a worker died; the item is still reported
+                print(f"ERROR (Resume Batch): item {index} failed in worker: {e}")
+                result = {"index": index, "ok": False, "path": None, "pdf": None, "error": f"Resume rendering failed: {e}"}
+            yield finish(result, data)
+
+def _manifest_entry(result):
+    return {key: result.get(key) for key in ("index", "name", "filename", "ok", "error", "cached")}
+
+class _ZipStreamBuffer:
+    """Write-only sink for zipfile; zipfile falls back to data descriptors since it cannot seek."""
+    def __init__(self):
+        self._chunks = []
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    def flush(self):
+        pass
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+def iter_batch_zip_stream(payloads, executor=None):
+    """
+    Yields a ZIP archive chunk by chunk as resumes finish rendering, so the response starts
+    before the batch is done. Failed items are listed in manifest.json (written last).
+    """
+    buffer = _ZipStreamBuffer()
+    manifest = []
+    started = time.perf_counter()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive: # PDFs are already compressed
+        for result in iter_batch_renders(payloads, executor=executor):
+            if result["ok"]:
+                archive.writestr(result["filename"], result["pdf"])
+            manifest.append(_manifest_entry(result))
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+        manifest.sort(key=lambda entry: entry["index"])
+        archive.writestr(MANIFEST_NAME, json.dumps({
+            "total": len(manifest), "succeeded": sum(1 for entry in manifest if entry["ok"]),
+            "failed": sum(1 for entry in manifest if not entry["ok"]),
+            "elapsed_seconds": round(time.perf_counter() - started, 3), "items": manifest,
+        }, indent=2))
+    yield buffer.drain()
+
+def render_batch_to_directory(payloads, output_dir, executor=None):
+    """Writes one PDF per payload into output_dir; returns the manifest entries (with paths), sorted by index."""
+    results = []
+    for result in iter_batch_renders(payloads, output_dir=output_dir, executor=executor):
+        entry = _manifest_entry(result)
+        entry["path"] = result.get("path")
+        results.append(entry)
+    return sorted(results, key=lambda entry: entry["index"])
+
+def load_resume_payloads(path):
+    """Reads resume payloads from a JSON Lines file (or a JSON array)."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    payloads = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            payloads.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            print(f"WARNING (Resume Batch): line {line_number} is not valid JSON and will be reported as failed: {e}")
+            payloads.append(None)
+    return payloads
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many resumes in parallel from a JSONL file.")
+    parser.add_argument("input", help="JSON Lines file with one resume payload per line (or a JSON array)")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--zip", help="Write a single ZIP archive (with manifest.json) to this path")
+    output.add_argument("--out-dir", help="Write individual PDFs into this directory")
+    parser.add_argument("--workers", type=int, default=RESUME_BATCH_WORKERS)
+    args = parser.parse_args()
+
+    payloads = load_resume_payloads(args.input)
+    context = multiprocessing.get_context(RESUME_BATCH_START_METHOD)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as executor:
+        if args.zip:
+            temp_path = f"{args.zip}.tmp"
+            with open(temp_path, "wb") as f:
+                for chunk in iter_batch_zip_stream(payloads, executor=executor):
+                    f.write(chunk)
+            os.replace(temp_path, args.zip)
+            with zipfile.ZipFile(args.zip) as archive:
+                manifest = json.loads(archive.read(MANIFEST_NAME))["items"]
+        else:
+            manifest = render_batch_to_directory(payloads, args.out_dir, executor=executor)
+    elapsed = time.perf_counter() - started
+
+    failed = [entry for entry in manifest if not entry["ok"]]
+    for entry in failed:
+        print(f"FAILED item {entry['index']} ({entry['name']}): {entry['error']}")
+    rate = len(manifest) / elapsed if elapsed else 0.0
+    print(f"Rendered {len(manifest) - len(failed)}/{len(manifest)} resumes in {elapsed:.2f}s "
+          f"({rate:.1f} resumes/s, {rate / args.workers:.2f} resumes/s per worker) -> {args.zip or args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -1,78 +1,113 @@
 # /my_career_portal/resume_builder_logic.py
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Flowable
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor
-from reportlab.lib.enums import TA_LEFT, TA_JUSTIFY
 import os
-from dotenv import load_dotenv
+import io
+import time
+import json
+import hashlib
+import uuid
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cache_logic import TTLLRUCache, SingleFlight
+from env_logic import load_env
+from metrics_logic import record_stage, span
+from rate_limit_logic import aacquire_upstream, acquire_upstream
 
-load_dotenv()
+load_env()
 GOOGLE_API_KEY_RESUME_AI = os.getenv("GOOGLE_API_KEY")
 
-# --- Import Google Generative AI ---
+# --- Import Google Generative AI (on first AI summary request; the SDK takes ~1s to import) ---
 genai_for_resume = None
-try:
-    import google.generativeai as genai
-    if GOOGLE_API_KEY_RESUME_AI:
-        genai.configure(api_key=GOOGLE_API_KEY_RESUME_AI)
-        genai_for_resume = genai # Assign to the module alias we'll use
-    else:
-        print("WARNING (Resume AI): GOOGLE_API_KEY not set. AI summary feature disabled.")
-except ImportError:
-    print("WARNING (Resume AI): google-generativeai SDK not installed. AI summary feature disabled.")
-except Exception as e:
-    print(f"Error configuring Google AI for resume: {e}")
-
-# --- Theme Colors and HRFlowable (Copy from your original resume_builder.py) ---
-PRIMARY_COLOR = HexColor("#252b33")     
-SECONDARY_COLOR = HexColor("#007acc")  
-TEXT_COLOR = HexColor("#333333")        
-SUBTLE_TEXT_COLOR = HexColor("#555555") 
-BORDER_COLOR = HexColor("#cccccc")      
-ACCENT_TEXT_COLOR = HexColor("#4A90E2")
-
-class HRFlowable(Flowable):
-    def __init__(self, width, thickness=0.6, color=BORDER_COLOR):
-        Flowable.__init__(self)
-        self.width = width
-        self.thickness = thickness
-        self.color = color
-    def wrap(self, availWidth, availHeight):
-        self.width = min(self.width, availWidth)
-        return self.width, self.thickness
-    def draw(self):
-        self.canv.saveState()
-        self.canv.setStrokeColor(self.color)
-        self.canv.setLineWidth(self.thickness)
-        self.canv.line(0, self.thickness / 2.0, self.width, self.thickness / 2.0)
-        self.canv.restoreState()
+_genai_import_attempted = False
+_genai_import_lock = threading.Lock()
+
+def _get_genai_for_resume():
+    """The configured google.generativeai module, or None if the SDK or API key is missing."""
+    global genai_for_resume, _genai_import_attempted
+    with _genai_import_lock:
+        if _genai_import_attempted:
+            return genai_for_resume
+        _genai_import_attempted = True
+        if not GOOGLE_API_KEY_RESUME_AI: # No key: skip the import entirely
+            print("WARNING (Resume AI): GOOGLE_API_KEY not set. AI summary feature disabled.")
+            return None
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=GOOGLE_API_KEY_RESUME_AI)
+            genai_for_resume = genai # Assign to the module alias we'll use
+        except ImportError:
+            print("WARNING (Resume AI): google-generativeai SDK not installed. AI summary feature disabled.")
+        except Exception as e:
+            print(f"Error configuring Google AI for resume: {e}")
+        return genai_for_resume
+
+# --- Theme Colors (classic theme; see resume_theme_logic.py for all themes and HRFlowable) ---
+# Resolved on first access so that importing this module does not load reportlab.
+_CLASSIC_COLOR_NAMES = {
+    "PRIMARY_COLOR": "primary", "SECONDARY_COLOR": "secondary", "TEXT_COLOR": "text",
+    "SUBTLE_TEXT_COLOR": "subtle_text", "BORDER_COLOR": "border", "ACCENT_TEXT_COLOR": "accent_text",
+}
+
+def __getattr__(name):
+    if name in _CLASSIC_COLOR_NAMES:
+        from reportlab.lib.colors import HexColor
+        from resume_theme_logic import THEME_PALETTES
+        return HexColor(THEME_PALETTES["classic"][_CLASSIC_COLOR_NAMES[name]])
+    if name == "HRFlowable":
+        from resume_theme_logic import HRFlowable
+        return HRFlowable
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- Payload normalization ---
+def normalize_resume_payload(data):
+    """
+    Adapts the resume builder form payload to what generate_resume_pdf_from_data expects.
+    Mutates and returns `data`.
+    Ideal future improvement: Align frontend data structure with backend, or use Pydantic models
+    for explicit validation and transformation.
+    """
+    # 1. Project stack: frontend sends 'stack_str', PDF func needs 'stack' (list)
+    if 'projects' in data and isinstance(data['projects'], list):
+        for proj in data['projects']:
+            if 'stack_str' in proj and isinstance(proj['stack_str'], str):
+                proj['stack'] = [s.strip() for s in proj['stack_str'].split(',') if s.strip()]
+    
+    # 2. Skills: frontend sends 'skills_input' (comma-separated string), PDF func needs 'skills' (list)
+    if 'skills_input' in data and isinstance(data['skills_input'], str):
+        data['skills'] = [s.strip() for s in data['skills_input'].split(',') if s.strip()]
+    elif 'skills' not in data: # Ensure skills key exists even if empty
+        data['skills'] = []
+
+    # 3. Experience/Project descriptions: Frontend JS should already send these as lists of strings.
+    #    The PDF function expects `description` as a list of bullet points.
+    #    No transformation here if frontend handles it.
+
+    # 4. Achievements: PDF function expects `description_str` (newline-separated string).
+    #    Frontend JS might send description_list or description_str.
+    if 'achievements' in data and isinstance(data['achievements'], list):
+        for ach in data['achievements']:
+            if 'description_list' in ach and isinstance(ach['description_list'], list): # If JS sent a list
+                ach['description_str'] = "\n".join(ach['description_list'])
+            # If 'description_str' is already a string from frontend, it's fine.
+    return data
 
 # --- PDF Generation Function (Copied and adapted) ---
-def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
+def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf", theme_name=None):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.units import inch
+    from resume_theme_logic import get_resume_theme
+
     doc = SimpleDocTemplate(filename, pagesize=letter,
                             rightMargin=0.7*inch, leftMargin=0.7*inch,
                             topMargin=0.7*inch, bottomMargin=0.7*inch)
     story = []
-    
-    FONT_NAME = 'Helvetica'
-    FONT_NAME_BOLD = 'Helvetica-Bold'
-    FONT_NAME_ITALIC = 'Helvetica-Oblique'
-
-    styles = {}
-    styles['Name'] = ParagraphStyle('Name', fontName=FONT_NAME_BOLD, fontSize=26, leading=30,textColor=PRIMARY_COLOR, alignment=TA_LEFT, spaceBottom=0.08 * inch)
-    # ... (COPY ALL YOUR STYLES DEFINITIONS HERE from original generate_resume_pdf) ...
-    styles['ContactLine'] = ParagraphStyle('ContactLine', fontName=FONT_NAME, fontSize=9.5, leading=14,textColor=TEXT_COLOR, alignment=TA_LEFT, spaceBottom=0.03 * inch)
-    styles['SectionTitle'] = ParagraphStyle('SectionTitle', fontName=FONT_NAME_BOLD, fontSize=13, leading=16,textColor=PRIMARY_COLOR, spaceBefore=0.22 * inch, spaceAfter=0.04 * inch)
-    styles['Subheading'] = ParagraphStyle('Subheading', fontName=FONT_NAME_BOLD, fontSize=10.5, leading=14,textColor=SECONDARY_COLOR, spaceAfter=0.02 * inch)
-    styles['AchievementTitle'] = ParagraphStyle('AchievementTitle', fontName=FONT_NAME_BOLD, fontSize=10, leading=13,textColor=SECONDARY_COLOR, spaceAfter=0.01 * inch)
-    styles['MetaInfo'] = ParagraphStyle('MetaInfo', fontName=FONT_NAME, fontSize=9, leading=13,textColor=SUBTLE_TEXT_COLOR, spaceAfter=0.05 * inch)
-    styles['BodyText'] = ParagraphStyle('BodyText', fontName=FONT_NAME, fontSize=9.5, leading=14,textColor=TEXT_COLOR, spaceAfter=0.05*inch, alignment=TA_JUSTIFY, wordWrap='CJK')
-    styles['BulletPoint'] = ParagraphStyle('BulletPoint', parent=styles['BodyText'], bulletIndent=18, leftIndent=18,bulletText='• ', spaceAfter=0.03 * inch, alignment=TA_LEFT) # Added space after bullet
-    styles['SkillsText'] = ParagraphStyle('SkillsText', parent=styles['BodyText'], alignment=TA_LEFT, leading=15, fontSize=9.5)
-    styles['ProjectStack'] = ParagraphStyle('ProjectStack', fontName=FONT_NAME_ITALIC, fontSize=8.5,textColor=SUBTLE_TEXT_COLOR, leading=12, leftIndent=0,spaceBefore=0.02*inch, spaceAfter=0.04*inch)
-    styles['CertificateDescription'] = ParagraphStyle('CertificateDescription', parent=styles['BodyText'], fontSize=9, leading=12, alignment=TA_LEFT,leftIndent=0, spaceBefore=0.01*inch, spaceAfter=0.03*inch)
+    story_started = time.perf_counter()
+
+    # Styles, colors and section headers are prebuilt once per theme and shared across renders
+    theme = get_resume_theme(theme_name or data.get('theme'))
+    styles = theme.styles
+    accent_hex = theme.accent_hex
 
     # --- Content Population (COPY THE LOGIC FROM YOUR ORIGINAL generate_resume_pdf) ---
     # Example: Personal Details
@@ -84,11 +119,11 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
     if data.get('linkedin'):
         linkedin_url = data['linkedin']
         if not linkedin_url.startswith(('http://', 'https://')): linkedin_url = 'https://' + linkedin_url
-        contact_items.append(f'<a href="{linkedin_url}" color="{ACCENT_TEXT_COLOR.hexval()}">🔗 LinkedIn</a>')
+        contact_items.append(f'<a href="{linkedin_url}" color="{accent_hex}">🔗 LinkedIn</a>')
     if data.get('github'):
         github_url = data['github']
         if not github_url.startswith(('http://', 'https://')): github_url = 'https://' + github_url
-        contact_items.append(f'<a href="{github_url}" color="{ACCENT_TEXT_COLOR.hexval()}">🔗 GitHub</a>')
+        contact_items.append(f'<a href="{github_url}" color="{accent_hex}">🔗 GitHub</a>')
     if contact_items:
         max_items_per_line = 3
         if len(contact_items) > max_items_per_line:
@@ -101,16 +136,12 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
 
     # --- Profile Summary ---
     if data.get('summary'):
-        story.append(Paragraph("PROFILE SUMMARY", styles['SectionTitle']))
-        story.append(HRFlowable(doc.width))
-        story.append(Spacer(1, 0.1 * inch))
+        story.extend(theme.section_header("PROFILE SUMMARY", doc.width))
         story.append(Paragraph(data['summary'], styles['BodyText']))
 
     # --- Education ---
     if data.get('education'):
-        story.append(Paragraph("EDUCATION", styles['SectionTitle']))
-        story.append(HRFlowable(doc.width))
-        story.append(Spacer(1, 0.1 * inch))
+        story.extend(theme.section_header("EDUCATION", doc.width))
         for i, edu in enumerate(data.get('education', [])): # Ensure it's a list
             if edu.get('degree') and edu.get('institution'):
                 if i > 0: story.append(Spacer(1, 0.1*inch))
@@ -122,9 +153,7 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
     
     # --- Work Experience ---
     if data.get('experience'):
-        story.append(Paragraph("WORK EXPERIENCE", styles['SectionTitle']))
-        story.append(HRFlowable(doc.width))
-        story.append(Spacer(1, 0.1 * inch))
+        story.extend(theme.section_header("WORK EXPERIENCE", doc.width))
         for i, exp in enumerate(data.get('experience', [])):
             if exp.get('title') and exp.get('company'):
                 if i > 0: story.append(Spacer(1, 0.1*inch))
@@ -139,9 +168,7 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
     
     # --- Projects ---
     if data.get('projects'):
-        story.append(Paragraph("PROJECTS", styles['SectionTitle']))
-        story.append(HRFlowable(doc.width))
-        story.append(Spacer(1, 0.1 * inch))
+        story.extend(theme.section_header("PROJECTS", doc.width))
         for i, proj in enumerate(data.get('projects', [])):
             if proj.get('title'):
                 if i > 0: story.append(Spacer(1, 0.1*inch))
@@ -157,9 +184,7 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
     # --- Skills ---
     if data.get('skills'): # Expects data['skills'] to be a list
         header_text = data.get('skills_tools_header', "SKILLS").upper()
-        story.append(Paragraph(header_text, styles['SectionTitle']))
-        story.append(HRFlowable(doc.width))
-        story.append(Spacer(1, 0.1 * inch))
+        story.extend(theme.section_header(header_text, doc.width))
         if isinstance(data['skills'], list) and data['skills']:
             # Create a single paragraph with bullets for skills, more compact
             skills_paragraph_text = "   ".join([f"• {skill}" for skill in data['skills']])
@@ -171,9 +196,7 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
 
     # --- Certificates ---
     if data.get('certificates'):
-        story.append(Paragraph("CERTIFICATES", styles['SectionTitle']))
-        story.append(HRFlowable(doc.width))
-        story.append(Spacer(1, 0.1 * inch))
+        story.extend(theme.section_header("CERTIFICATES", doc.width))
         for i, cert in enumerate(data.get('certificates',[])):
             if cert.get('name'):
                 if i > 0: story.append(Spacer(1, 0.1*inch))
@@ -185,15 +208,13 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
                 if cert.get('description'): # This could be a URL or short text
                     desc_text = cert.get('description','')
                     if desc_text.startswith(('http://', 'https://')):
-                        story.append(Paragraph(f'<a href="{desc_text}" color="{ACCENT_TEXT_COLOR.hexval()}">View Certificate/Details</a>', styles['CertificateDescription']))
+                        story.append(Paragraph(f'<a href="{desc_text}" color="{accent_hex}">View Certificate/Details</a>', styles['CertificateDescription']))
                     elif desc_text.strip():
                         story.append(Paragraph(desc_text, styles['CertificateDescription']))
     
     # --- Achievements ---
     if data.get('achievements'):
-        story.append(Paragraph("ACHIEVEMENTS", styles['SectionTitle']))
-        story.append(HRFlowable(doc.width))
-        story.append(Spacer(1, 0.1 * inch))
+        story.extend(theme.section_header("ACHIEVEMENTS", doc.width))
         for i, ach in enumerate(data.get('achievements',[])):
             # description_str is expected to be newline separated, split it into points
             description_points = []
@@ -208,9 +229,11 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
                     story.append(Paragraph(ach.get('context_date',''), styles['MetaInfo']))
                 for point in description_points:
                     story.append(Paragraph(point, styles['BulletPoint']))
+    record_stage("resume_story_build", time.perf_counter() - story_started)
     try:
-        doc.build(story)
-        print(f"Resume PDF generated successfully: {filename}")
+        with span("resume_doc_build"):
+            doc.build(story)
+        print(f"Resume PDF generated successfully: {filename if isinstance(filename, str) else 'in-memory buffer'}")
         return filename
     except Exception as e:
         print(f"ERROR generating PDF for resume: {e}")
@@ -218,56 +241,380 @@ def generate_resume_pdf_from_data(data, filename="AI_Enhanced_Resume.pdf"):
         traceback.print_exc()
         return None
 
+def render_resume_pdf_bytes(data):
+    """Renders the resume into memory and returns the PDF bytes (None on failure); nothing touches disk."""
+    buffer = io.BytesIO()
+    if generate_resume_pdf_from_data(data, buffer) is None:
+        return None
+    return buffer.getvalue()
+
+def render_resume_pdf_file(data, output_path):
+    """Renders to a temp file and atomically moves it into place, so readers never see a partial PDF."""
+    temp_path = f"{output_path}.{uuid.uuid4().hex[:8]}.tmp"
+    if generate_resume_pdf_from_data(data, temp_path) is None:
+        if os.path.exists(temp_path): os.remove(temp_path)
+        return None
+    os.replace(temp_path, output_path)
+    return output_path
+
+# --- Content-addressed render cache ---
+# Identical (normalized) payloads render to identical PDFs, so repeat "Generate" clicks are served
+# from memory (inline mode) or from the already-written file (file mode) instead of re-rendering.
+RESUME_RENDER_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_RENDER_CACHE_MAX_ENTRIES", "128"))
+RESUME_RENDER_CACHE_TTL = float(os.getenv("RESUME_RENDER_CACHE_TTL", "3600"))
+resume_pdf_bytes_cache = TTLLRUCache("resume_pdf_bytes", RESUME_RENDER_CACHE_MAX_ENTRIES, RESUME_RENDER_CACHE_TTL)
+resume_pdf_file_cache = TTLLRUCache("resume_pdf_files", RESUME_RENDER_CACHE_MAX_ENTRIES * 8, RESUME_RENDER_CACHE_TTL)
+
+def resume_content_key(data):
+    """SHA-256 of the normalized payload (call normalize_resume_payload first)."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def render_resume_pdf_bytes_cached(data):
+    """Returns (pdf_bytes or None, cache_hit)."""
+    key = resume_content_key(data)
+    cached = resume_pdf_bytes_cache.get(key)
+    if cached is not None:
+        return cached, True
+    pdf_bytes = render_resume_pdf_bytes(data)
+    if pdf_bytes:
+        resume_pdf_bytes_cache.set(key, pdf_bytes)
+    return pdf_bytes, False
+
+def content_addressed_resume_path(data, directory):
+    """Deterministic output path for a payload: resume_<name>_<content hash>.pdf."""
+    safe_name = data.get('name', 'user').replace(' ', '_').replace('.', '').replace('/', '_').replace('\\', '_')
+    return os.path.join(directory, f"resume_{safe_name}_{resume_content_key(data)[:16]}.pdf")
+
+def find_rendered_resume_file(output_path):
+    """Returns output_path if an identical payload was already rendered there (and it still exists)."""
+    if resume_pdf_file_cache.get(output_path) is not None or os.path.exists(output_path):
+        if os.path.exists(output_path): # The sweeper may have removed it
+            os.utime(output_path) # Reset its age for the retention sweeper
+            return output_path
+        resume_pdf_file_cache.delete(output_path)
+    return None
+
+def remember_rendered_resume_file(output_path):
+    resume_pdf_file_cache.set(output_path, True)
+
+def sweep_generated_resumes(directory, max_age_seconds, max_total_bytes):
+    """
+    Retention for file-mode PDFs: deletes PDFs older than max_age_seconds, then the oldest
+    remaining ones until the directory holds at most max_total_bytes. Returns (files_deleted, bytes_freed).
+    """
+    try:
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return 0, 0
+    entries.sort() # Oldest first
+    now = time.time()
+    total_bytes = sum(size for _, size, _ in entries)
+    deleted, freed = 0, 0
+    for mtime, size, path in entries:
+        if now - mtime <= max_age_seconds and total_bytes <= max_total_bytes:
+            break
+        try:
+            os.remove(path)
+            deleted, freed, total_bytes = deleted + 1, freed + size, total_bytes - size
+        except OSError as e: # Already gone (another worker swept it) or in use
+            print(f"WARNING (Resume Sweeper): could not delete {path}: {e}")
+    if deleted:
+        print(f"Resume sweeper removed {deleted} PDFs ({freed / 1024:.0f} KB) from {directory}.")
+    return deleted, freed
+
 # --- AI Content Generation Function (Copied and adapted) ---
-def generate_ai_summary_for_resume(keywords, experience_highlights, api_key_override=None):
+AI_SUMMARY_MODEL_NAME = os.getenv("RESUME_AI_MODEL", "gemini-1.5-flash-latest") # Or your preferred model
+AI_SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("AI_SUMMARY_CACHE_MAX_ENTRIES", "1024"))
+AI_SUMMARY_CACHE_TTL = float(os.getenv("AI_SUMMARY_CACHE_TTL", str(7 * 24 * 3600)))
+AI_SUMMARY_BATCH_CONCURRENCY = int(os.getenv("AI_SUMMARY_BATCH_CONCURRENCY", "4"))
+AI_SUMMARY_MAX_RPM = float(os.getenv("AI_SUMMARY_MAX_RPM", "60")) # Requests per minute per process; 0 disables pacing
+# Part of AI_SUMMARY_MAX_RPM reserved for batch requests (at most half); single summaries get the rest, so a big
+# batch never queues an interactive request behind it
+AI_SUMMARY_BATCH_MAX_RPM = float(os.getenv("AI_SUMMARY_BATCH_MAX_RPM", str(AI_SUMMARY_MAX_RPM / 3)))
+# Seconds a batch request may spend on paced model calls; kept under gunicorn's worker timeout
+AI_SUMMARY_BATCH_TIME_BUDGET = float(os.getenv("AI_SUMMARY_BATCH_TIME_BUDGET", str(0.75 * float(os.getenv("GUNICORN_TIMEOUT", "120")))))
+AI_SUMMARY_MAX_RETRIES = int(os.getenv("AI_SUMMARY_MAX_RETRIES", "3")) # Retries after a rate-limit (429) response
+AI_SUMMARY_BACKOFF_SECONDS = float(os.getenv("AI_SUMMARY_BACKOFF_SECONDS", "2.0"))
+# Site-wide Gemini budget spent (rate_limit_logic): cached summaries are still served, this is not cached
+AI_SUMMARY_BUDGET_EXHAUSTED_MESSAGE = "Could not generate summary right now: the AI service is busy. Please try again later or write it manually."
+
+ai_summary_cache = TTLLRUCache("resume_ai_summaries", AI_SUMMARY_CACHE_MAX_ENTRIES, AI_SUMMARY_CACHE_TTL)
+_ai_summary_single_flight = SingleFlight("resume_ai_summaries")
+
+# Standard safety settings from your original code
+AI_SUMMARY_SAFETY_SETTINGS = [
+    {"category": c, "threshold": "BLOCK_MEDIUM_AND_ABOVE"} 
+    for c in ["HARM_CATEGORY_HARASSMENT", "HARM_CATEGORY_HATE_SPEECH", "HARM_CATEGORY_SEXUALLY_EXPLICIT", "HARM_CATEGORY_DANGEROUS_CONTENT"]
+]
+
+_summary_model = None
+_summary_generation_config = None
+_summary_model_lock = threading.Lock()
+
+def _get_summary_model():
+    """One GenerativeModel (and GenerationConfig) per process, reused by every summary request."""
+    global _summary_model, _summary_generation_config
+    with _summary_model_lock:
+        if _summary_model is None:
+            genai = _get_genai_for_resume()
+            _summary_generation_config = genai.types.GenerationConfig(temperature=0.7, max_output_tokens=250)
+            _summary_model = genai.GenerativeModel(model_name=AI_SUMMARY_MODEL_NAME)
+        return _summary_model, _summary_generation_config
+
+class _SummaryRateLimiter:
+    """Spaces model calls to at most max_rpm per minute and pauses everyone after a 429."""
+    def __init__(self, max_rpm):
+        self.interval = 60.0 / max_rpm if max_rpm > 0 else 0.0
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+        self.rate_limited = 0
+
+    def reserve(self) -> float:
+        """Claims the next call slot; returns how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_allowed)
+            self._next_allowed = start_at + self.interval
+            self.waited_seconds += start_at - now
+        return start_at - now
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def backlog(self) -> float:
+        """Seconds until the next free call slot (calls already reserved by other requests)."""
+        with self._lock:
+            return max(0.0, self._next_allowed - time.monotonic())
+
+    def backoff(self, seconds):
+        with self._lock:
+            self.rate_limited += 1
+            self._next_allowed = max(self._next_allowed, time.monotonic() + seconds)
+
+_batch_summary_rpm = min(AI_SUMMARY_BATCH_MAX_RPM, AI_SUMMARY_MAX_RPM / 2) if AI_SUMMARY_MAX_RPM > 0 else 0
+_summary_rate_limiter = _SummaryRateLimiter(AI_SUMMARY_MAX_RPM - _batch_summary_rpm)
+_batch_summary_rate_limiter = _SummaryRateLimiter(_batch_summary_rpm)
+
+def _is_rate_limit_error(error):
+    # google.api_core raises ResourceExhausted (HTTP 429) when the quota is hit
+    return type(error).__name__ in ("ResourceExhausted", "TooManyRequests") or "429" in str(error)
+
+def normalize_summary_inputs(keywords, experience_highlights):
+    """(sorted lowercase unique keywords, whitespace-normalized highlights): the summary cache key parts."""
+    if isinstance(keywords, str):
+        keywords = keywords.split(',')
+    normalized_keywords = sorted({" ".join(str(k).lower().split()) for k in (keywords or []) if str(k).strip()})
+    return normalized_keywords, " ".join(str(experience_highlights or "").split())
+
+def ai_summary_cache_key(keywords, experience_highlights):
+    normalized_keywords, normalized_highlights = normalize_summary_inputs(keywords, experience_highlights)
+    canonical = json.dumps([AI_SUMMARY_MODEL_NAME, normalized_keywords, normalized_highlights], ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _summary_unavailable_message(keywords, experience_highlights, api_key_override=None):
+    """User-facing reason the model cannot be called, or None when it can."""
     # Use genai_for_resume (which is the configured genai module alias)
     current_api_key = api_key_override if api_key_override else GOOGLE_API_KEY_RESUME_AI
-    if not genai_for_resume:
+    if not _get_genai_for_resume():
         return "AI features disabled: Google Generative AI SDK not available or not configured."
     if not current_api_key:
         return f"AI features disabled: Google API Key not provided. (Placeholder: Highly motivated individual with skills in {', '.join(keywords)} and experience in {experience_highlights}.)"
-    
+    # Ensure genai_for_resume is configured with the key if an override is passed
+    # This is a bit redundant if it's already configured at module load, but safe
+    if api_key_override and api_key_override != genai_for_resume.API_KEY: # Check if key is different
+         genai_for_resume.configure(api_key=api_key_override)
+    return None
+
+def _build_summary_prompt(keywords, experience_highlights):
+    prompt_parts = [
+        "Generate a professional and concise profile summary for a resume, strictly 2-4 sentences long.",
+        "Incorporate the following details:",
+        f"Key Skills: {', '.join(keywords) if keywords else 'Not specified'}.",
+        f"Experience Highlights or Career Goals: {experience_highlights if experience_highlights else 'Not specified'}.",
+        "The summary should be engaging and tailored for a resume. Avoid first-person pronouns like 'I' or 'My' unless absolutely natural and professional.",
+        "Focus on what the candidate brings to a potential employer.",
+        "Example: 'Dynamic and results-oriented Software Engineer with expertise in Python, Java, and cloud computing. Proven ability in developing scalable web applications and leading cross-functional teams. Seeking to leverage these skills to drive innovation at a forward-thinking company.'"
+    ]
+    return "\n".join(prompt_parts)
+
+def _interpret_summary_response(response):
+    """(text, ok) from a generate_content response."""
+    if response.parts:
+        return response.text.strip(), True
+    elif response.prompt_feedback and response.prompt_feedback.block_reason:
+         block_reason_msg = getattr(response.prompt_feedback, 'block_reason_message', str(response.prompt_feedback.block_reason))
+         print(f"Resume AI summary blocked: {block_reason_msg}")
+         return f"Content generation blocked by safety filters: {block_reason_msg}. Please revise your input.", False
+    else:
+        # Attempt to get more detailed error if available for candidate issues
+        try:
+            candidate_error = response.candidates[0].finish_reason if response.candidates else "Unknown"
+            if candidate_error != "STOP": # Check if not a normal stop
+                return f"Error generating summary (Model Finish Reason: {candidate_error}). Please try again or write manually.", False
+        except: pass # Ignore if candidates attribute is not as expected
+        print("Resume AI summary failed: No content returned for unknown reason.")
+        return "Error generating summary. Please write manually or try again.", False
+
+def _rate_limit_delay(error, attempt):
+    """Seconds to back off before retrying `error`, or None if it should not be retried."""
+    if not _is_rate_limit_error(error) or attempt >= AI_SUMMARY_MAX_RETRIES:
+        return None
+    delay = AI_SUMMARY_BACKOFF_SECONDS * (2 ** attempt)
+    print(f"Resume AI summary rate limited; retrying in {delay:.1f}s (attempt {attempt + 1}/{AI_SUMMARY_MAX_RETRIES}).")
+    _summary_rate_limiter.backoff(delay) # One quota behind both budgets
+    _batch_summary_rate_limiter.backoff(delay)
+    return delay
+
+def _generate_ai_summary(keywords, experience_highlights, api_key_override=None, rate_limiter=None):
+    """
+    Calls the model once (retrying on rate limits), paced by `rate_limiter` (default: the interactive
+    one). Returns (text, ok); ok=False texts are user-facing errors.
+    """
+    rate_limiter = rate_limiter or _summary_rate_limiter
     try:
-        # Ensure genai_for_resume is configured with the key if an override is passed
-        # This is a bit redundant if it's already configured at module load, but safe
-        if api_key_override and api_key_override != genai_for_resume.API_KEY: # Check if key is different
-             genai_for_resume.configure(api_key=api_key_override)
-
-        model = genai_for_resume.GenerativeModel(model_name="gemini-1.5-flash-latest") # Or your preferred model
-        prompt_parts = [
-            "Generate a professional and concise profile summary for a resume, strictly 2-4 sentences long.",
-            "Incorporate the following details:",
-            f"Key Skills: {', '.join(keywords) if keywords else 'Not specified'}.",
-            f"Experience Highlights or Career Goals: {experience_highlights if experience_highlights else 'Not specified'}.",
-            "The summary should be engaging and tailored for a resume. Avoid first-person pronouns like 'I' or 'My' unless absolutely natural and professional.",
-            "Focus on what the candidate brings to a potential employer.",
-            "Example: 'Dynamic and results-oriented Software Engineer with expertise in Python, Java, and cloud computing. Proven ability in developing scalable web applications and leading cross-functional teams. Seeking to leverage these skills to drive innovation at a forward-thinking company.'"
-        ]
-        prompt = "\n".join(prompt_parts)
-        # Standard safety settings from your original code
-        safety_settings=[
-            {"category": c, "threshold": "BLOCK_MEDIUM_AND_ABOVE"} 
-            for c in ["HARM_CATEGORY_HARASSMENT", "HARM_CATEGORY_HATE_SPEECH", "HARM_CATEGORY_SEXUALLY_EXPLICIT", "HARM_CATEGORY_DANGEROUS_CONTENT"]
-        ]
-        generation_config = genai_for_resume.types.GenerationConfig(temperature=0.7, max_output_tokens=250)
-        
-        response = model.generate_content(prompt, generation_config=generation_config, safety_settings=safety_settings)
-        
-        if response.parts:
-            return response.text.strip()
-        elif response.prompt_feedback and response.prompt_feedback.block_reason:
-             block_reason_msg = getattr(response.prompt_feedback, 'block_reason_message', str(response.prompt_feedback.block_reason))
-             print(f"Resume AI summary blocked: {block_reason_msg}")
-             return f"Content generation blocked by safety filters: {block_reason_msg}. Please revise your input."
-        else:
-            # Attempt to get more detailed error if available for candidate issues
+        unavailable = _summary_unavailable_message(keywords, experience_highlights, api_key_override)
+        if unavailable:
+            return unavailable, False
+        if not acquire_upstream("gemini"):
+            return AI_SUMMARY_BUDGET_EXHAUSTED_MESSAGE, False
+        model, generation_config = _get_summary_model()
+        prompt = _build_summary_prompt(keywords, experience_highlights)
+        attempt = 0
+        while True:
+            rate_limiter.acquire()
             try:
-                candidate_error = response.candidates[0].finish_reason if response.candidates else "Unknown"
-                if candidate_error != "STOP": # Check if not a normal stop
-                    return f"Error generating summary (Model Finish Reason: {candidate_error}). Please try again or write manually."
-            except: pass # Ignore if candidates attribute is not as expected
-            print("Resume AI summary failed: No content returned for unknown reason.")
-            return "Error generating summary. Please write manually or try again."
+                with span("llm_resume_summary"):
+                    response = model.generate_content(prompt, generation_config=generation_config, safety_settings=AI_SUMMARY_SAFETY_SETTINGS)
+                break
+            except Exception as e:
+                if _rate_limit_delay(e, attempt) is None:
+                    raise
+                attempt += 1
+        return _interpret_summary_response(response)
     except Exception as e:
         print(f"Resume AI summary generation failed: {e}")
-        return f"Error generating summary: {str(e)}. Please write manually."
\ No newline at end of file
+        return f"Error generating summary: {str(e)}. Please write manually.", False
+
+async def _agenerate_ai_summary(keywords, experience_highlights, api_key_override=None):
+    """Async _generate_ai_summary (generate_content_async); limiter waits are awaited, not slept."""
+    try:
+        unavailable = _summary_unavailable_message(keywords, experience_highlights, api_key_override)
+        if unavailable:
+            return unavailable, False
+        if not await aacquire_upstream("gemini"):
+            return AI_SUMMARY_BUDGET_EXHAUSTED_MESSAGE, False
+        model, generation_config = _get_summary_model()
+        prompt = _build_summary_prompt(keywords, experience_highlights)
+        attempt = 0
+        while True:
+            await asyncio.sleep(_summary_rate_limiter.reserve())
+            try:
+                with span("llm_resume_summary"):
+                    response = await model.generate_content_async(prompt, generation_config=generation_config, safety_settings=AI_SUMMARY_SAFETY_SETTINGS)
+                break
+            except Exception as e:
+                if _rate_limit_delay(e, attempt) is None:
+                    raise
+                attempt += 1
+        return _interpret_summary_response(response)
+    except Exception as e:
+        print(f"Resume AI summary generation failed: {e}")
+        return f"Error generating summary: {str(e)}. Please write manually.", False
+
+def generate_ai_summary_cached(keywords, experience_highlights, api_key_override=None, rate_limiter=None):
+    """
+    Returns (summary, cache_hit). Successful summaries are cached on the normalized inputs and
+    concurrent identical requests share one model call. Error messages are never cached, and a
+    caller-supplied API key bypasses the cache entirely.
+    """
+    if api_key_override:
+        return _generate_ai_summary(keywords, experience_highlights, api_key_override, rate_limiter)[0], False
+    key = ai_summary_cache_key(keywords, experience_highlights)
+    cached = ai_summary_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    def generate_and_cache():
+        summary, ok = _generate_ai_summary(keywords, experience_highlights, rate_limiter=rate_limiter)
+        if ok:
+            ai_summary_cache.set(key, summary)
+        return summary
+    return _ai_summary_single_flight.do(key, generate_and_cache), False
+
+async def agenerate_ai_summary_cached(keywords, experience_highlights, api_key_override=None):
+    """Async generate_ai_summary_cached; shares its cache (in-flight coalescing is per serving mode)."""
+    if api_key_override:
+        return (await _agenerate_ai_summary(keywords, experience_highlights, api_key_override))[0], False
+    key = ai_summary_cache_key(keywords, experience_highlights)
+    cached = ai_summary_cache.get(key)
+    if cached is not None:
+        return cached, True
+    summary, ok = await _agenerate_ai_summary(keywords, experience_highlights)
+    if ok:
+        ai_summary_cache.set(key, summary)
+    return summary, False
+
+def generate_ai_summary_for_resume(keywords, experience_highlights, api_key_override=None):
+    return generate_ai_summary_cached(keywords, experience_highlights, api_key_override)[0]
+
+class SummaryBatchTooLarge(Exception):
+    """Raised by generate_ai_summaries_batch when the uncached items cannot be paced within AI_SUMMARY_BATCH_TIME_BUDGET."""
+    def __init__(self, uncached, capacity):
+        super().__init__(f"{uncached} summaries to generate, but only {capacity} fit in one request right now.")
+        self.uncached = uncached
+        self.capacity = capacity
+
+def summary_batch_capacity():
+    """New summaries a batch request can get through the batch pacer within the time budget; None if unpaced."""
+    interval = _batch_summary_rate_limiter.interval
+    if interval <= 0:
+        return None
+    return max(0, int((AI_SUMMARY_BATCH_TIME_BUDGET - _batch_summary_rate_limiter.backlog()) / interval))
+
+def generate_ai_summaries_batch(items, max_concurrency=AI_SUMMARY_BATCH_CONCURRENCY):
+    """
+    Summaries for many resumes: items are dicts with 'keywords' and 'experience_highlights'.
+    Returns [{"summary", "cached"}] in input order. Identical inputs cost one model call, at most
+    max_concurrency calls run at once, and every call is paced by the batch rate limiter (its own
+    share of AI_SUMMARY_MAX_RPM, so interactive summaries do not wait behind a batch).
+    Raises SummaryBatchTooLarge, before any model call, if the distinct uncached items would not
+    finish within AI_SUMMARY_BATCH_TIME_BUDGET (which would get the worker killed mid-batch).
+    """
+    results = [None] * len(items)
+    uncached = {}
+    for i, item in enumerate(items):
+        cached = ai_summary_cache.get(ai_summary_cache_key(item.get('keywords', []), item.get('experience_highlights', "")))
+        if cached is not None:
+            results[i] = {"summary": cached, "cached": True}
+        else:
+            uncached[i] = item
+    distinct = len({ai_summary_cache_key(item.get('keywords', []), item.get('experience_highlights', "")) for item in uncached.values()})
+    capacity = summary_batch_capacity()
+    if capacity is not None and distinct > capacity:
+        raise SummaryBatchTooLarge(distinct, capacity)
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="resume-ai") as executor:
+        futures = {
+            executor.submit(generate_ai_summary_cached, item.get('keywords', []), item.get('experience_highlights', ""),
+                            rate_limiter=_batch_summary_rate_limiter): i
+            for i, item in uncached.items()
+        }
+        for future in as_completed(futures):
+            summary, cache_hit = future.result()
+            results[futures[future]] = {"summary": summary, "cached": cache_hit}
+    return results
+
+def get_ai_summary_stats():
+    return {
+        "model": AI_SUMMARY_MODEL_NAME, "max_rpm": AI_SUMMARY_MAX_RPM, "batch_max_rpm": _batch_summary_rpm,
+        "rate_limited": _summary_rate_limiter.rate_limited,
+        "rate_limit_wait_seconds": round(_summary_rate_limiter.waited_seconds, 3),
+        "batch_rate_limit_wait_seconds": round(_batch_summary_rate_limiter.waited_seconds, 3),
+    }
@@ -0,0 +1,150 @@
+# /my_career_portal/resume_job_queue_logic.py
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from cache_logic import get_sqlite_cache_store
+from resume_builder_logic import render_resume_pdf_file, remember_rendered_resume_file
+
+# --- Queue settings ---
+RESUME_JOB_WORKERS = int(os.getenv("RESUME_JOB_WORKERS", str(os.cpu_count() or 2)))
+RESUME_JOB_MAX_PENDING = int(os.getenv("RESUME_JOB_MAX_PENDING", "32")) # Queued + running jobs before 429
+RESUME_JOB_RETENTION_SECONDS = float(os.getenv("RESUME_JOB_RETENTION_SECONDS", "3600")) # How long finished job status is kept
+# "spawn" keeps renderer processes independent of the (multi-threaded) web worker that starts them.
+RESUME_JOB_START_METHOD = os.getenv("RESUME_JOB_START_METHOD", "spawn")
+# Job status shared by every web worker on the host, so a status poll may land on any of them; empty = this process only
+RESUME_JOB_SQLITE_PATH = os.getenv("RESUME_JOB_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "career_portal_resume_jobs.sqlite3"))
+_JOB_NAMESPACE = "resume_jobs"
+
+class ResumeJobQueueFull(Exception):
+    """Raised by ResumeJobQueue.submit when the bounded queue is at capacity."""
+
+class ResumeJobQueue:
+    """
+    Renders resume PDFs on a pool of worker processes so ReportLab layout runs outside the
+    request worker and is not serialized by the GIL. The process that submitted a job tracks it
+    in memory; its status is also written to a SQLite store so the other web workers can answer
+    polls for it (they see "queued" until the job finishes).
+    """
+    def __init__(self, max_workers=RESUME_JOB_WORKERS, max_pending=RESUME_JOB_MAX_PENDING,
+                 retention_seconds=RESUME_JOB_RETENTION_SECONDS, store_path=RESUME_JOB_SQLITE_PATH):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._executor = None
+        self._executor_pid = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.store = get_sqlite_cache_store(store_path)
+
+    def _publish(self, job_id: str, job: dict):
+        """Writes the job's public fields to the shared store (best effort: the owner still answers)."""
+        if self.store is None:
+            return
+        record = {key: job[key] for key in ("status", "created_at", "finished_at", "output_path", "error")}
+        try:
+            self.store.set(_JOB_NAMESPACE, job_id, record, (job["finished_at"] or job["created_at"]) + self.retention_seconds)
+        except sqlite3.Error as e:
+            print(f"WARNING (Resume Jobs): could not publish job {job_id} status: {e}")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Caller holds self._lock. The pool is created lazily, and again in a forked web worker.
+        if self._executor is None or self._executor_pid != os.getpid():
+            context = multiprocessing.get_context(RESUME_JOB_START_METHOD)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _prune_finished(self):
+        # Caller holds self._lock
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+            del self._jobs[job_id]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["finished_at"] is None)
+
+    def submit(self, data: dict, output_path: str) -> str:
+        """Enqueues a render of already-normalized resume data; returns the job id."""
+        with self._lock:
+            self._prune_finished()
+            if sum(1 for job in self._jobs.values() if job["finished_at"] is None) >= self.max_pending:
+                self.rejected += 1
+                raise ResumeJobQueueFull(f"Resume job queue is full ({self.max_pending} pending jobs).")
+            job_id = uuid.uuid4().hex
+            job = {"status": "queued", "created_at": time.time(), "finished_at": None,
+                   "output_path": output_path, "error": None, "future": None}
+            self._jobs[job_id] = job
+            future = self._get_executor().submit(render_resume_pdf_file, data, output_path)
+            job["future"] = future
+        self._publish(job_id, job)
+        future.add_done_callback(lambda f, job_id=job_id, job=job: self._on_done(job_id, job, f))
+        return job_id
+
+    def record_finished(self, output_path: str) -> str:
+        """A job that is already done (the PDF exists), so async callers get a job id either way."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        job = {"status": "done", "created_at": now, "finished_at": now,
+               "output_path": output_path, "error": None, "future": None}
+        with self._lock:
+            self._prune_finished()
+            self._jobs[job_id] = job
+        self._publish(job_id, job)
+        return job_id
+
+    def _on_done(self, job_id: str, job: dict, future):
+        with self._lock:
+            job["finished_at"] = time.time()
+            try:
+                result_path = future.result()
+                if result_path and os.path.exists(result_path):
+                    job["status"] = "done"
+                    remember_rendered_resume_file(result_path)
+                else:
+                    job["status"], job["error"] = "failed", "Failed to generate resume PDF. Check server logs for details."
+            except Exception as e: # Includes BrokenProcessPool if a renderer process died
+                job["status"], job["error"] = "failed", f"Resume rendering failed: {e}"
+                print(f"ERROR (Resume Jobs): job failed: {e}")
+        self._publish(job_id, job)
+
+    def status(self, job_id: str):
+        """Public view of a job (status, timings, output_path, error) or None if unknown/expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return self._shared_status(job_id)
+            status = job["status"]
+            if status == "queued" and job["future"] is not None and job["future"].running():
+                status = "running"
+            return {
+                "job_id": job_id, "status": status, "created_at": job["created_at"],
+                "finished_at": job["finished_at"], "output_path": job["output_path"], "error": job["error"],
+            }
+
+    def _shared_status(self, job_id: str):
+        # A job submitted by another web worker
+        if self.store is None:
+            return None
+        try:
+            stored = self.store.get(_JOB_NAMESPACE, job_id)
+        except sqlite3.Error as e:
+            print(f"WARNING (Resume Jobs): could not read job {job_id} status: {e}")
+            return None
+        return {"job_id": job_id, **stored[0]} if stored else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {"workers": self.max_workers, "max_pending": self.max_pending, "rejected": self.rejected, "jobs": counts}
+
+resume_job_queue = ResumeJobQueue()
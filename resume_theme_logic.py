@@ -0,0 +1,100 @@
+# /my_career_portal/resume_theme_logic.py
+import copy
+import functools
+import os
+
+from reportlab.platypus import Paragraph, Spacer, Flowable
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_LEFT, TA_JUSTIFY
+
+DEFAULT_THEME_NAME = os.getenv("RESUME_DEFAULT_THEME", "classic")
+
+# --- Theme palettes ---
+THEME_PALETTES = {
+    "classic": {"primary": "#252b33", "secondary": "#007acc", "text": "#333333", "subtle_text": "#555555", "border": "#cccccc", "accent_text": "#4A90E2"},
+    "modern":  {"primary": "#1b3a4b", "secondary": "#0f9d8a", "text": "#2f2f2f", "subtle_text": "#5f6b73", "border": "#b9d7d2", "accent_text": "#0f9d8a"},
+    "minimal": {"primary": "#111111", "secondary": "#444444", "text": "#222222", "subtle_text": "#666666", "border": "#dddddd", "accent_text": "#333333"},
+}
+
+class HRFlowable(Flowable):
+    def __init__(self, width, thickness=0.6, color=HexColor(THEME_PALETTES["classic"]["border"])):
+        Flowable.__init__(self)
+        self.width = width
+        self.thickness = thickness
+        self.color = color
+    def wrap(self, availWidth, availHeight):
+        self.width = min(self.width, availWidth)
+        return self.width, self.thickness
+    def draw(self):
+        self.canv.saveState()
+        self.canv.setStrokeColor(self.color)
+        self.canv.setLineWidth(self.thickness)
+        self.canv.line(0, self.thickness / 2.0, self.width, self.thickness / 2.0)
+        self.canv.restoreState()
+
+class ResumeTheme:
+    """
+    Colors, paragraph styles and section-header templates for one theme, built once and shared by
+    every render. Styles are read-only during a build, so sharing them is safe. Flowables are not
+    (ReportLab stores the canvas on them while drawing), so section_header() hands out shallow copies
+    of header paragraphs that were parsed once, rather than the shared instances themselves.
+    """
+    FONT_NAME = 'Helvetica'
+    FONT_NAME_BOLD = 'Helvetica-Bold'
+    FONT_NAME_ITALIC = 'Helvetica-Oblique'
+    # The builder's fixed section titles; other titles (the user-supplied skills header) are never cached
+    SECTION_TITLES = frozenset({"PROFILE SUMMARY", "EDUCATION", "WORK EXPERIENCE", "PROJECTS", "SKILLS", "CERTIFICATES", "ACHIEVEMENTS"})
+
+    def __init__(self, name, palette):
+        self.name = name
+        self.primary = HexColor(palette["primary"])
+        self.secondary = HexColor(palette["secondary"])
+        self.text = HexColor(palette["text"])
+        self.subtle_text = HexColor(palette["subtle_text"])
+        self.border = HexColor(palette["border"])
+        self.accent_text = HexColor(palette["accent_text"])
+        self.accent_hex = self.accent_text.hexval() # Used in <a color="..."> markup on every link
+        self.styles = self._build_styles()
+        self._header_templates = {}
+
+    def _build_styles(self):
+        FONT_NAME, FONT_NAME_BOLD, FONT_NAME_ITALIC = self.FONT_NAME, self.FONT_NAME_BOLD, self.FONT_NAME_ITALIC
+        styles = {}
+        styles['Name'] = ParagraphStyle('Name', fontName=FONT_NAME_BOLD, fontSize=26, leading=30,textColor=self.primary, alignment=TA_LEFT, spaceBottom=0.08 * inch)
+        styles['ContactLine'] = ParagraphStyle('ContactLine', fontName=FONT_NAME, fontSize=9.5, leading=14,textColor=self.text, alignment=TA_LEFT, spaceBottom=0.03 * inch)
+        styles['SectionTitle'] = ParagraphStyle('SectionTitle', fontName=FONT_NAME_BOLD, fontSize=13, leading=16,textColor=self.primary, spaceBefore=0.22 * inch, spaceAfter=0.04 * inch)
+        styles['Subheading'] = ParagraphStyle('Subheading', fontName=FONT_NAME_BOLD, fontSize=10.5, leading=14,textColor=self.secondary, spaceAfter=0.02 * inch)
+        styles['AchievementTitle'] = ParagraphStyle('AchievementTitle', fontName=FONT_NAME_BOLD, fontSize=10, leading=13,textColor=self.secondary, spaceAfter=0.01 * inch)
+        styles['MetaInfo'] = ParagraphStyle('MetaInfo', fontName=FONT_NAME, fontSize=9, leading=13,textColor=self.subtle_text, spaceAfter=0.05 * inch)
+        styles['BodyText'] = ParagraphStyle('BodyText', fontName=FONT_NAME, fontSize=9.5, leading=14,textColor=self.text, spaceAfter=0.05*inch, alignment=TA_JUSTIFY, wordWrap='CJK')
+        styles['BulletPoint'] = ParagraphStyle('BulletPoint', parent=styles['BodyText'], bulletIndent=18, leftIndent=18,bulletText='• ', spaceAfter=0.03 * inch, alignment=TA_LEFT) # Added space after bullet
+        styles['SkillsText'] = ParagraphStyle('SkillsText', parent=styles['BodyText'], alignment=TA_LEFT, leading=15, fontSize=9.5)
+        styles['ProjectStack'] = ParagraphStyle('ProjectStack', fontName=FONT_NAME_ITALIC, fontSize=8.5,textColor=self.subtle_text, leading=12, leftIndent=0,spaceBefore=0.02*inch, spaceAfter=0.04*inch)
+        styles['CertificateDescription'] = ParagraphStyle('CertificateDescription', parent=styles['BodyText'], fontSize=9, leading=12, alignment=TA_LEFT,leftIndent=0, spaceBefore=0.01*inch, spaceAfter=0.03*inch)
+        return styles
+
+    def section_header(self, title, width):
+        """[title Paragraph, rule, spacer] for a section; fixed titles are parsed only once per theme."""
+        if title not in self.SECTION_TITLES:
+            return [Paragraph(title, self.styles['SectionTitle']), HRFlowable(width, color=self.border), Spacer(1, 0.1 * inch)]
+        template = self._header_templates.get(title)
+        if template is None:
+            template = self._header_templates[title] = Paragraph(title, self.styles['SectionTitle'])
+        return [copy.copy(template), HRFlowable(width, color=self.border), Spacer(1, 0.1 * inch)]
+
+@functools.lru_cache(maxsize=None)
+def _build_theme(name):
+    return ResumeTheme(name, THEME_PALETTES[name])
+
+def get_resume_theme(name=None):
+    """Shared ResumeTheme by name; unknown names fall back to the default theme."""
+    name = (name or DEFAULT_THEME_NAME).lower()
+    if name not in THEME_PALETTES:
+        print(f"WARNING (Resume Themes): unknown theme '{name}', using '{DEFAULT_THEME_NAME}'.")
+        name = DEFAULT_THEME_NAME if DEFAULT_THEME_NAME in THEME_PALETTES else "classic"
+    return _build_theme(name)
+
+def available_resume_themes():
+    return sorted(THEME_PALETTES)
@@ -0,0 +1,220 @@
+# /my_career_portal/vector_index_logic.py
+"""
+Lightweight alternative to Chroma for the chatbot retriever: a memory-mapped NumPy matrix of
+normalized embeddings with brute-force or IVF (inverted file, k-means lists) cosine search.
+Only numpy is needed at query time, and the OS pages the matrix in on demand, so startup is a
+few file opens and forked workers share the same pages.
+
+Layout of an index directory:
+    meta.json           dim, count, embedding model, IVF settings
+    embeddings.npy      float32 (count, dim), rows L2-normalized
+    doc_offsets.npy     int64 (count + 1,) byte offsets into documents.jsonl
+    documents.jsonl     {"text", "metadata"} per row
+    ivf_centroids.npy   float32 (nlist, dim)               (IVF only)
+    ivf_order.npy       int64 (count,) row ids grouped by list (IVF only)
+    ivf_offsets.npy     int64 (nlist + 1,) list boundaries  (IVF only)
+
+    python vector_index_logic.py export-chroma --db chroma_db --out vector_index --ivf auto
+    python vector_index_logic.py stats --index vector_index
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Any, List
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_NPROBE = int(os.getenv("CHATBOT_VECTOR_INDEX_NPROBE", "8")) # IVF lists scanned per query
+IVF_TRAIN_ITERATIONS = 15
+IVF_TRAIN_SAMPLE = 50000 # Rows used to fit the k-means centroids
+
+def _normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def _top_k(scores, k):
+    """Indices of the k largest scores, best first."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+def _train_ivf(vectors, nlist, seed=0):
+    """Spherical k-means on a sample; returns (centroids, order, offsets) for the inverted lists."""
+    rng = np.random.default_rng(seed)
+    sample = vectors if len(vectors) <= IVF_TRAIN_SAMPLE else vectors[rng.choice(len(vectors), IVF_TRAIN_SAMPLE, replace=False)]
+    centroids = np.array(sample[rng.choice(len(sample), nlist, replace=False)], dtype=np.float32)
+    for _ in range(IVF_TRAIN_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = sample[assignment == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = _normalize_rows(centroids)
+    assignment = np.concatenate([np.argmax(vectors[start:start + 8192] @ centroids.T, axis=1)
+                                 for start in range(0, len(vectors), 8192)])
+    order = np.argsort(assignment, kind="stable").astype(np.int64)
+    offsets = np.searchsorted(assignment[order], np.arange(nlist + 1)).astype(np.int64)
+    return centroids, order, offsets
+
+def build_vector_index(path, vectors, texts, metadatas=None, embedding_model=None, ivf_lists=0):
+    """
+    Writes an index directory from embeddings and their texts. ivf_lists=0 builds a brute-force
+    index, "auto" picks ~sqrt(count) lists. The directory is replaced atomically.
+    """
+    vectors = _normalize_rows(vectors)
+    count, dim = vectors.shape if vectors.ndim == 2 else (0, 0)
+    metadatas = metadatas or [{} for _ in range(count)]
+    if ivf_lists == "auto":
+        ivf_lists = int(np.sqrt(count)) if count >= 4096 else 0
+    ivf_lists = min(int(ivf_lists or 0), count)
+
+    temp_path = f"{path.rstrip(os.sep)}.building"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+    np.save(os.path.join(temp_path, "embeddings.npy"), vectors)
+    offsets = [0]
+    with open(os.path.join(temp_path, "documents.jsonl"), "wb") as f:
+        for text, metadata in zip(texts, metadatas):
+            f.write(json.dumps({"text": text, "metadata": metadata or {}}, ensure_ascii=False).encode("utf-8") + b"\n")
+            offsets.append(f.tell())
+    np.save(os.path.join(temp_path, "doc_offsets.npy"), np.array(offsets, dtype=np.int64))
+    if ivf_lists:
+        centroids, order, list_offsets = _train_ivf(vectors, ivf_lists)
+        np.save(os.path.join(temp_path, "ivf_centroids.npy"), centroids)
+        np.save(os.path.join(temp_path, "ivf_order.npy"), order)
+        np.save(os.path.join(temp_path, "ivf_offsets.npy"), list_offsets)
+    with open(os.path.join(temp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"dim": int(dim), "count": int(count), "embedding_model": embedding_model,
+                   "ivf_lists": ivf_lists, "built_at": time.time()}, f)
+
+    old_path = f"{path.rstrip(os.sep)}.old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(temp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+class NumpyVectorIndex:
+    """Read-only, memory-mapped index. Safe to share between threads."""
+    def __init__(self, path: str, embedding_function=None, nprobe: int = VECTOR_INDEX_NPROBE):
+        self.path = path
+        self.embedding_function = embedding_function # Used by as_retriever(), like Chroma's
+        self.nprobe = nprobe
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        self.doc_offsets = np.load(os.path.join(path, "doc_offsets.npy"), mmap_mode="r")
+        self.ivf_centroids = self.ivf_order = self.ivf_offsets = None
+        if self.meta.get("ivf_lists"):
+            self.ivf_centroids = np.load(os.path.join(path, "ivf_centroids.npy"))
+            self.ivf_order = np.load(os.path.join(path, "ivf_order.npy"), mmap_mode="r")
+            self.ivf_offsets = np.load(os.path.join(path, "ivf_offsets.npy"))
+        self._documents_path = os.path.join(path, "documents.jsonl")
+        self._local = threading.local()
+
+    def __len__(self):
+        return int(self.meta["count"])
+
+    def fingerprint(self) -> str:
+        return f"numpy:{self.meta['count']}:{self.meta.get('built_at')}"
+
+    def search(self, query_vector, k: int = 3, nprobe: int = None):
+        """[(row, cosine similarity)] for the k nearest rows, best first."""
+        if not len(self):
+            return []
+        query = _normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        if self.ivf_centroids is None:
+            scores = self.embeddings @ query
+            rows = _top_k(scores, k)
+            return [(int(row), float(scores[row])) for row in rows]
+        lists = _top_k(self.ivf_centroids @ query, nprobe or self.nprobe)
+        candidates = np.concatenate([self.ivf_order[self.ivf_offsets[c]:self.ivf_offsets[c + 1]] for c in lists])
+        if not len(candidates):
+            return []
+        candidates.sort() # Sequential reads from the memory map
+        scores = self.embeddings[candidates] @ query
+        best = _top_k(scores, k)
+        return [(int(candidates[i]), float(scores[i])) for i in best]
+
+    def get_document(self, row: int) -> Document:
+        handle = getattr(self._local, "handle", None)
+        if handle is None:
+            handle = self._local.handle = open(self._documents_path, "rb")
+        start, end = int(self.doc_offsets[row]), int(self.doc_offsets[row + 1])
+        handle.seek(start)
+        record = json.loads(handle.read(end - start))
+        return Document(page_content=record["text"], metadata=record.get("metadata") or {})
+
+    def as_retriever(self, search_kwargs=None):
+        """Same call shape as a langchain VectorStore, so the chatbot chain code does not change."""
+        search_kwargs = search_kwargs or {}
+        return NumpyVectorRetriever(index=self, embeddings=self.embedding_function, k=search_kwargs.get("k", 4),
+                                    nprobe=search_kwargs.get("nprobe", self.nprobe))
+
+class NumpyVectorRetriever(BaseRetriever):
+    """langchain retriever over a NumpyVectorIndex (similarity search, top k)."""
+    index: Any
+    embeddings: Any
+    k: int = 4
+    nprobe: int = VECTOR_INDEX_NPROBE
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        query_vector = self.embeddings.embed_query(query)
+        return [self.index.get_document(row) for row, _score in self.index.search(query_vector, self.k, self.nprobe)]
+
+def export_chroma_collection(collection, path, embedding_model=None, ivf_lists="auto", page_size=5000):
+    """Copies ids/embeddings/documents/metadata out of a Chroma collection into a NumPy index."""
+    vectors, texts, metadatas = [], [], []
+    total = collection.count()
+    for offset in range(0, total, page_size):
+        page = collection.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+        vectors.extend(page["embeddings"])
+        texts.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+    return build_vector_index(path, np.array(vectors, dtype=np.float32).reshape(len(texts), -1), texts, metadatas,
+                              embedding_model=embedding_model, ivf_lists=ivf_lists)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the NumPy vector index used by the chatbot.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export-chroma", help="Build the index from the chatbot's Chroma DB")
+    export_parser.add_argument("--db", default=None, help="Chroma persist directory (default: the chatbot's)")
+    export_parser.add_argument("--out", default=os.getenv("CHATBOT_VECTOR_INDEX_PATH", "vector_index"))
+    export_parser.add_argument("--ivf", default="auto", help="Number of IVF lists, 0 for brute force, or 'auto'")
+    stats_parser = subparsers.add_parser("stats", help="Print index size and settings")
+    stats_parser.add_argument("--index", default=os.getenv("CHATBOT_VECTOR_INDEX_PATH", "vector_index"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    if args.command == "export-chroma":
+        from career_ai_chatbot_logic import CHROMA_DB_PATH, EMBEDDING_MODEL_NAME
+        from chatbot_ingest_logic import open_chroma_collection
+        started = time.perf_counter()
+        collection = open_chroma_collection(args.db or CHROMA_DB_PATH, None)
+        ivf = args.ivf if args.ivf == "auto" else int(args.ivf)
+        export_chroma_collection(collection, args.out, embedding_model=EMBEDDING_MODEL_NAME, ivf_lists=ivf)
+        index = NumpyVectorIndex(args.out)
+        print(f"Exported {len(index)} chunks to {args.out} (ivf_lists={index.meta['ivf_lists']}) "
+              f"in {time.perf_counter() - started:.2f}s.")
+    else:
+        index = NumpyVectorIndex(args.index)
+        size_mb = sum(os.path.getsize(os.path.join(args.index, name)) for name in os.listdir(args.index)) / (1024 * 1024)
+        print(f"{len(index)} chunks, dim {index.meta['dim']}, ivf_lists {index.meta['ivf_lists']}, "
+              f"model {index.meta.get('embedding_model')}, {size_mb:.1f} MB on disk")
+
+if __name__ == "__main__":
+    main()